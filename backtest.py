@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+backtest.py
+
+▲ Što radi?
+    • učitava završene utakmice zadanih sezona (i liga) iz  fixtures  u
+      NumPy kolone – jedan upit, bez ijednog upstream poziva; ishod je
+      rezultat posle 90 minuta (ft_home / ft_away, inače home/away_goals)
+    • zaključne kvote 1 / X / 2 (Match Winner, bet_id 1): zadnja cijena iz
+      odds_history prije početka meča, inače zadnja poznata iz  odds;
+      prosjek kladionica ili jedna zadana kladionica
+    • vrti modele iz  smartbets_API.backtest  (points = pravilo Predictor-a,
+      home, market) i ispisuje pogodak, ROI i log-loss
+
+    python backtest.py 2023 2024 [--league 39 140] [--bookmaker 8] [--model points market]
+
+▲ Zahtjevi:  DATABASE_URL, numpy
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from db_init import engine
+from smartbets_API.backtest import MODELS, FixtureArrays, evaluate, regulation_goals
+from team_form import FINISHED
+
+MATCH_WINNER = 1
+SELECTIONS = {"Home": 0, "Draw": 1, "Away": 2}
+
+FIXTURES_SQL = """
+SELECT id, league_id, season, timestamp, home_id, away_id, home_goals, away_goals,
+       ft_home, ft_away
+  FROM public.fixtures
+ WHERE season = ANY(:seasons)
+   AND status_short = ANY(:finished)
+   AND COALESCE(ft_home, home_goals) IS NOT NULL
+   AND COALESCE(ft_away, away_goals) IS NOT NULL
+   AND timestamp IS NOT NULL
+   {league_filter}
+"""
+
+CLOSING_ODDS_SQL = """
+SELECT o.fixture_id, o.selection, avg(COALESCE(h.odd, o.odd)) AS odd
+  FROM public.odds o
+  JOIN public.fixtures f ON f.id = o.fixture_id
+  LEFT JOIN LATERAL (
+        SELECT odd FROM public.odds_history
+         WHERE line_id = o.id AND ts <= f.date_utc
+         ORDER BY ts DESC LIMIT 1
+  ) h ON TRUE
+ WHERE o.bet_id = :bet
+   AND o.selection = ANY(:selections)
+   AND f.season = ANY(:seasons)
+   AND f.status_short = ANY(:finished)
+   {league_filter}
+   {bookmaker_filter}
+ GROUP BY o.fixture_id, o.selection
+"""
+
+
+def load_arrays(seasons: Sequence[int], leagues: Optional[Sequence[int]] = None,
+                bookmaker: Optional[int] = None) -> FixtureArrays:
+    params = {"seasons": list(seasons), "finished": list(FINISHED), "bet": MATCH_WINNER,
+              "selections": list(SELECTIONS), "leagues": list(leagues or []),
+              "bookmaker": bookmaker}
+    league_filter = "AND league_id = ANY(:leagues)" if leagues else ""
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(FIXTURES_SQL.format(league_filter=league_filter)), params).all()
+        odds_rows = conn.execute(text(CLOSING_ODDS_SQL.format(
+            league_filter=league_filter.replace("league_id", "f.league_id"),
+            bookmaker_filter="AND o.bookmaker_id = :bookmaker" if bookmaker is not None else "",
+        )), params).all()
+
+    # NULL → NaN: ft_* postoji tek od kad ga upstream javlja
+    raw = np.array(rows, dtype=np.float64).reshape(-1, 10)
+    cols = raw[:, :6].astype(np.int64)
+    home_goals = regulation_goals(raw[:, 8], raw[:, 6]).astype(np.int64)
+    away_goals = regulation_goals(raw[:, 9], raw[:, 7]).astype(np.int64)
+    fixture_id = cols[:, 0]
+
+    # kvote → (n, 3) preko pozicije fixture-a u sortiranim id-evima
+    odds = np.full((len(cols), 3), np.nan)
+    if odds_rows and len(cols):
+        order = np.argsort(fixture_id)
+        ids = np.array([r.fixture_id for r in odds_rows], dtype=np.int64)
+        sel = np.array([SELECTIONS[r.selection] for r in odds_rows])
+        price = np.array([r.odd for r in odds_rows], dtype=float)
+        pos = np.searchsorted(fixture_id[order], ids)
+        pos = np.clip(pos, 0, len(order) - 1)
+        known = fixture_id[order][pos] == ids
+        odds[order[pos[known]], sel[known]] = price[known]
+
+    return FixtureArrays(fixture_id, cols[:, 1], cols[:, 2], cols[:, 3], cols[:, 4],
+                         cols[:, 5], home_goals, away_goals, odds)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Backtest modela nad završenim utakmicama")
+    parser.add_argument("seasons", type=int, nargs="+")
+    parser.add_argument("--league", type=int, nargs="*", default=None)
+    parser.add_argument("--bookmaker", type=int, default=None)
+    parser.add_argument("--model", nargs="*", default=list(MODELS), choices=list(MODELS))
+    parser.add_argument("--by-league", action="store_true")
+    args = parser.parse_args(argv[1:])
+
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+
+    started = time.perf_counter()
+    arrays = load_arrays(args.seasons, args.league, args.bookmaker)
+    loaded = time.perf_counter()
+    priced = int(np.isfinite(arrays.odds).all(axis=1).sum())
+    print(f"• {len(arrays)} utakmica ({priced} s kvotama 1X2), učitano za {loaded - started:.2f} s")
+    if not len(arrays):
+        return
+
+    print(f"  {'model':<8} {'pogodak':>8} {'okladâ':>7} {'ROI':>8} {'log-loss':>9}")
+    for name in args.model:
+        report = evaluate(MODELS[name], arrays, by_league=args.by_league)
+        t = report["total"]
+        roi = f"{t['roi']:+.2%}" if t["roi"] is not None else "–"
+        print(f"  {name:<8} {t['hit_rate']:>8.2%} {t['bets']:>7} {roi:>8} {t['log_loss']:>9.4f}")
+        for league, m in report.get("leagues", {}).items():
+            roi = f"{m['roi']:+.2%}" if m["roi"] is not None else "–"
+            print(f"    liga {league:<6} {m['hit_rate']:>6.2%} {m['bets']:>7} {roi:>8} {m['log_loss']:>9.4f}")
+    print(f"• modeli: {time.perf_counter() - loaded:.3f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+benchmarks/fixture_queries.py
+
+▲ Mjeri tipične upite nad  fixtures / odds  s indeksima iz db_init.py
+  ("after") i bez njih ("before"), oboje u istoj transakciji:
+    • svi mečevi jednog dana               (read_through /fixtures)
+    • liga + sezona po datumu              (standings / forma)
+    • zadnjih 10 mečeva jednog tima        (home_id ILI away_id)
+    • mečevi u tijeku                      (status_short)
+    • kvote jednog meča                    (uq_odds_unique_line)
+
+▲ "before" se mjeri unutar transakcije u kojoj su indeksi obrisani, a na
+  kraju se radi ROLLBACK – šema ostaje netaknuta.  DROP INDEX drži
+  ekskluzivnu bravu nad tablicom dok mjerenje traje, pa se pokreće nad
+  testnom bazom ili kopijom, ne nad produkcijom u špici.
+
+    python benchmarks/fixture_queries.py [ponavljanja=20]
+
+▲ Prvo napuni bazu:  python fixtures_loader.py 2025-08-01 2025-08-31
+"""
+
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+
+from db_init import engine, ensure_indexes, fixtures, odds  # noqa: E402
+
+QUERIES: List[Tuple[str, str]] = [
+    ("dan",            "SELECT * FROM public.fixtures"
+                       " WHERE date_utc >= :day AND date_utc < :day + interval '1 day'"),
+    ("liga/sezona",    "SELECT * FROM public.fixtures"
+                       " WHERE league_id = :league AND season = :season ORDER BY date_utc"),
+    ("tim, zadnjih 10", "SELECT * FROM public.fixtures WHERE home_id = :team OR away_id = :team"
+                       " ORDER BY date_utc DESC LIMIT 10"),
+    ("u tijeku",       "SELECT * FROM public.fixtures"
+                       " WHERE status_short IN ('1H', 'HT', '2H', 'ET', 'BT', 'P')"),
+    ("kvote meča",     "SELECT * FROM public.odds WHERE fixture_id = :fixture"),
+]
+
+# indeksi koje ovaj benchmark vrednuje (UNIQUE ograničenje na odds ostaje)
+INDEXES = [idx.name for table in (fixtures, odds) for idx in table.indexes]
+
+
+def sample_params(conn: Connection) -> Dict[str, Any]:
+    row = conn.execute(text(
+        "SELECT id, date_trunc('day', date_utc) AS day, league_id, season, home_id"
+        " FROM public.fixtures WHERE date_utc IS NOT NULL AND home_id IS NOT NULL"
+        " ORDER BY date_utc DESC LIMIT 1"
+    )).first()
+    if row is None:
+        raise SystemExit("fixtures je prazna – prvo pokreni fixtures_loader.py")
+    return {"fixture": row.id, "day": row.day, "league": row.league_id,
+            "season": row.season, "team": row.home_id}
+
+
+def plan(conn: Connection, sql: str, params: Dict[str, Any]) -> str:
+    """Čvor koji čita tablicu: Seq Scan / Index Scan / Bitmap Heap Scan…"""
+    lines = conn.execute(text("EXPLAIN " + sql), params).scalars().all()
+    for line in lines:
+        for node in ("Seq Scan", "Index Only Scan", "Index Scan", "Bitmap Heap Scan"):
+            if node in line:
+                return node
+    return lines[0].strip() if lines else "?"
+
+
+def measure(conn: Connection, params: Dict[str, Any], repeats: int) -> Dict[str, Tuple[float, str]]:
+    results = {}
+    for label, sql in QUERIES:
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            conn.execute(text(sql), params).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[label] = (statistics.median(timings), plan(conn, sql, params))
+    return results
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    repeats = int(argv[1]) if len(argv) > 1 else 20
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            count = conn.execute(text("SELECT count(*) FROM public.fixtures")).scalar()
+            params = sample_params(conn)
+            print(f"• {count} fixtura, {repeats} ponavljanja po upitu, parametri: {params}")
+            ensure_indexes(conn)                        # baza kreirana prije ovih indeksa
+            after = measure(conn, params, repeats)
+            for name in INDEXES:
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS public."{name}"')
+            before = measure(conn, params, repeats)
+        finally:
+            trans.rollback()                            # šema je kao prije pokretanja
+
+    print(f"  {'upit':<16} {'before ms':>10} {'after ms':>10} {'ubrzanje':>9}   plan (before → after)")
+    for label, _ in QUERIES:
+        (b_ms, b_plan), (a_ms, a_plan) = before[label], after[label]
+        speedup = b_ms / a_ms if a_ms else float("inf")
+        print(f"  {label:<16} {b_ms:>10.2f} {a_ms:>10.2f} {speedup:>8.1f}×   {b_plan} → {a_plan}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
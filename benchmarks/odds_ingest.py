@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+benchmarks/odds_ingest.py
+
+▲ Uspoređuje dva načina upisa kvota u tablicu  odds  (oba pišu i promjene
+  u  odds_history, pa rade isti posao):
+    • upsert  – višeredni INSERT … ON CONFLICT u blokovima (stil  save_fixtures)
+                + istorija iz RETURNING-a istog bloka
+    • copy    – COPY u staging tablicu + jedan set-based merge (odds_loader.py)
+
+▲ Generira sintetičke fixture, kladionice i oklade (id ≥ 900 000 000) i
+  kvote za njih, mjeri prvi upis i ponovni upis (update putanja), ispisuje
+  redova/s i na kraju sve sintetičke redove briše – i kvote, istoriju,
+  fixture, kladionice i oklade.
+
+    python benchmarks/odds_ingest.py [broj_fixtura=2000] [kladionica=10]
+
+▲ Pokreće se nad testnom bazom – DATABASE_URL.
+"""
+
+import os
+import random
+import sys
+import time
+import datetime as dt
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, literal, select  # noqa: E402
+from sqlalchemy.dialects.postgresql import insert as pg_insert  # noqa: E402
+
+from db_init import engine, bets, bookmakers, fixtures, odds, odds_history  # noqa: E402
+from db_maintenance import ensure_partition  # noqa: E402
+from odds_loader import OddsLine, copy_merge_odds  # noqa: E402
+
+BASE_ID = 900_000_000
+CHUNK   = 1000
+MARKETS = {
+    1:  ("Match Winner", ["Home", "Draw", "Away"]),
+    5:  ("Goals Over/Under", [f"{side} {line}" for line in ("0.5", "1.5", "2.5", "3.5", "4.5")
+                              for side in ("Over", "Under")]),
+    8:  ("Both Teams Score", ["Yes", "No"]),
+    12: ("Double Chance", ["Home/Draw", "Home/Away", "Draw/Away"]),
+}
+
+
+def synthetic_lines(n_fixtures: int, n_bookmakers: int) -> List[OddsLine]:
+    rnd = random.Random(42)
+    return [
+        (BASE_ID + f, BASE_ID + b, f"bench-{b}", BASE_ID + bet_id, name, sel,
+         round(rnd.uniform(1.05, 12.0), 2))
+        for f in range(n_fixtures)
+        for b in range(n_bookmakers)
+        for bet_id, (name, selections) in MARKETS.items()
+        for sel in selections
+    ]
+
+
+def upsert_style(lines: List[OddsLine]) -> None:
+    """
+    Ono što bi  save_fixtures  pristup dao za kvote.  Istorija kao u MERGE_SQL:
+    upsert u CTE-u, a glavni upit (vidi staru cenu) dopisuje promijenjene linije.
+    """
+    now = dt.datetime.utcnow()
+    with engine.begin() as conn:
+        bms = {line[1]: line[2] for line in lines}
+        bts = {line[3]: line[4] for line in lines}
+        conn.execute(pg_insert(bookmakers).values([{"id": k, "name": v} for k, v in bms.items()])
+                     .on_conflict_do_nothing(index_elements=["id"]))
+        conn.execute(pg_insert(bets).values([{"id": k, "name": v} for k, v in bts.items()])
+                     .on_conflict_do_nothing(index_elements=["id"]))
+        for i in range(0, len(lines), CHUNK):
+            rows = [{"fixture_id": line[0], "bookmaker_id": line[1], "bet_id": line[3],
+                     "selection": line[5], "odd": line[6], "ts_fetched": now}
+                    for line in lines[i:i + CHUNK]]
+            stmt = pg_insert(odds).values(rows)
+            merged = stmt.on_conflict_do_update(
+                constraint="uq_odds_unique_line",
+                set_={"odd": stmt.excluded.odd, "ts_fetched": stmt.excluded.ts_fetched},
+            ).returning(odds.c.id, odds.c.odd).cte("merged")
+            conn.execute(insert(odds_history).from_select(
+                ["line_id", "ts", "odd"],
+                select(merged.c.id, literal(now), merged.c.odd)
+                .select_from(merged.outerjoin(odds, odds.c.id == merged.c.id))
+                .where(odds.c.odd.is_distinct_from(merged.c.odd)),
+            ))
+
+
+def setup(n_fixtures: int) -> None:
+    with engine.begin() as conn:
+        ensure_partition(conn, "odds_history", dt.datetime.utcnow().date())
+        conn.execute(pg_insert(fixtures).values(
+            [{"id": BASE_ID + f, "season": 2000} for f in range(n_fixtures)]
+        ).on_conflict_do_nothing(index_elements=["id"]))
+
+
+def clear_odds(conn) -> None:
+    """odds_history nema FK (particionisana, append-only) → briše se ručno, prije odds."""
+    conn.execute(delete(odds_history).where(
+        odds_history.c.line_id.in_(select(odds.c.id).where(odds.c.fixture_id >= BASE_ID))))
+    conn.execute(delete(odds).where(odds.c.fixture_id >= BASE_ID))
+
+
+def teardown() -> None:
+    with engine.begin() as conn:
+        clear_odds(conn)
+        conn.execute(delete(fixtures).where(fixtures.c.id >= BASE_ID))
+        conn.execute(delete(bookmakers).where(bookmakers.c.id >= BASE_ID))
+        conn.execute(delete(bets).where(bets.c.id >= BASE_ID))
+
+
+def timed(label: str, fn, lines: List[OddsLine]) -> float:
+    started = time.perf_counter()
+    fn(lines)
+    elapsed = time.perf_counter() - started
+    rate = len(lines) / elapsed
+    print(f"  {label:<18} {len(lines):>9} redova  {elapsed:8.2f} s  {rate:>12,.0f} redova/s")
+    return rate
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    n_fixtures   = int(argv[1]) if len(argv) > 1 else 2000
+    n_bookmakers = int(argv[2]) if len(argv) > 2 else 10
+    lines = synthetic_lines(n_fixtures, n_bookmakers)
+    print(f"• {n_fixtures} fixtura × {n_bookmakers} kladionica = {len(lines)} kvota")
+
+    try:
+        teardown()
+        setup(n_fixtures)
+        results = {}
+        for name, fn in (("upsert", upsert_style), ("copy", copy_merge_odds)):
+            with engine.begin() as conn:
+                clear_odds(conn)
+            results[name] = (timed(f"{name} / insert", fn, lines),
+                             timed(f"{name} / update", fn, lines))
+        with engine.connect() as conn:
+            stored = len(conn.execute(select(odds.c.id).where(odds.c.fixture_id >= BASE_ID)).all())
+        print(f"• u bazi: {stored} redova")
+        for phase, i in (("insert", 0), ("update", 1)):
+            print(f"• copy / upsert ({phase}): {results['copy'][i] / results['upsert'][i]:.1f}×")
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,159 @@
+"""
+db_async.py
+───────────
+Jedan deljeni async engine (SQLAlchemy + asyncpg) za celu FastAPI aplikaciju.
+
+• kreira se u lifespan-u (init_engine / close_engine), kao HTTP klijent
+• ruteri dobijaju konekciju kroz dependency  Depends(get_conn)  ili
+  Depends(get_optional_conn) kad ruta radi i bez baze
+• postojeće sinhrone funkcije (Core upiti nad Connection) se pozivaju sa
+  await conn.run_sync(fn, …) – bez thread pool-a, bez blokiranja event loop-a
+• pool_stats(): zauzete / slobodne konekcije, overflow, vreme čekanja na
+  konekciju – za /metrics/db i dimenzionisanje pool-a pod opterećenjem
+• run_sync(fn, …): isto za kod van ruta (read-through, store-ovi,
+  value bets); skripte bez lifespan-a (engine nije inicijalizovan) padaju
+  nazad na sinhroni engine iz db_init.py u thread pool-u
+• skripte (loaderi, db_maintenance…) i dalje koriste sinhroni engine iz db_init.py
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from fastapi import HTTPException
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+import db_init
+from db_init import DB_URL
+
+POOL_SIZE     = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW  = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT  = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE  = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+T = TypeVar("T")
+
+_engine: Optional[AsyncEngine] = None
+_stats: Dict[str, float] = {
+    "checkouts":     0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms":   0.0,
+    "timeouts":      0,
+}
+
+
+def async_url(url: str) -> str:
+    """postgres(ql)://… → postgresql+asyncpg://…  (asyncpg zove sslmode "ssl")."""
+    parts = urlsplit(url)
+    scheme = "postgresql+asyncpg"
+    query = [("ssl" if k == "sslmode" else k, v) for k, v in parse_qsl(parts.query)]
+    return urlunsplit((scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+async def init_engine() -> Optional[AsyncEngine]:
+    """Poziva se jednom iz lifespan-a; bez DATABASE_URL engine ostaje None."""
+    global _engine
+    if _engine is None and DB_URL:
+        _engine = create_async_engine(
+            async_url(DB_URL),
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+    return _engine
+
+
+async def close_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+
+
+def get_engine() -> Optional[AsyncEngine]:
+    return _engine
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[AsyncConnection]:
+    """Konekcija iz pool-a uz merenje čekanja (i za kod van ruta)."""
+    if _engine is None:
+        raise HTTPException(status_code=503, detail="DATABASE_URL nije postavljen")
+    started = time.perf_counter()
+    try:
+        conn = await _engine.connect()
+    except PoolTimeout:                                 # pool pun duže od DB_POOL_TIMEOUT
+        _stats["timeouts"] += 1
+        raise HTTPException(status_code=503, detail="Baza je preopterećena, pokušaj ponovo")
+    waited = (time.perf_counter() - started) * 1000
+    _stats["checkouts"] += 1
+    _stats["wait_total_ms"] += waited
+    _stats["wait_max_ms"] = max(_stats["wait_max_ms"], waited)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+def _run_blocking(fn: Callable[..., T], args: Tuple[Any, ...], begin: bool) -> T:
+    engine = db_init.engine
+    if engine is None:
+        raise HTTPException(status_code=503, detail="DATABASE_URL nije postavljen")
+    with (engine.begin() if begin else engine.connect()) as conn:
+        return fn(conn, *args)
+
+
+async def run_sync(fn: Callable[..., T], *args: Any, begin: bool = False) -> T:
+    """
+    fn(conn, *args) – sinhrona Core funkcija – nad konekcijom deljenog async
+    engine-a; begin=True je u transakciji (commit na kraju).  Bez lifespan-a
+    (skripte) ide na sinhroni engine u thread-u.
+    """
+    if _engine is None:
+        return await asyncio.to_thread(_run_blocking, fn, args, begin)
+    async with connection() as conn:
+        if begin:
+            async with conn.begin():
+                return await conn.run_sync(fn, *args)
+        return await conn.run_sync(fn, *args)
+
+
+async def get_conn() -> AsyncIterator[AsyncConnection]:
+    """Dependency za rute kojima je baza obavezna (503 bez DATABASE_URL)."""
+    async with connection() as conn:
+        yield conn
+
+
+async def get_optional_conn() -> AsyncIterator[Optional[AsyncConnection]]:
+    """Dependency za rute koje bez baze padaju nazad na upstream."""
+    if _engine is None:
+        yield None
+        return
+    async with connection() as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    if _engine is None:
+        return {"enabled": False}
+    pool: Any = _engine.pool
+    checkouts = int(_stats["checkouts"])
+    return {
+        "enabled":       True,
+        "size":          pool.size(),
+        "checked_out":   pool.checkedout(),
+        "checked_in":    pool.checkedin(),
+        "overflow":      pool.overflow(),
+        "max_overflow":  MAX_OVERFLOW,
+        "timeout_s":     POOL_TIMEOUT,
+        "checkouts":     checkouts,
+        "wait_avg_ms":   round(_stats["wait_total_ms"] / checkouts, 3) if checkouts else None,
+        "wait_max_ms":   round(_stats["wait_max_ms"], 3),
+        "timeouts":      int(_stats["timeouts"]),
+    }
@@ -5,20 +5,21 @@ db_init.py
 • obuhvata: države, lige, sezone, timove, stadione, igrače (osnovno),
   mečeve (fixtures), događaje, statistiku, kvote, predikcije, tabele/standings
 • čita konekcioni string iz env varijable  DATABASE_URL
+  (bez nje je engine None – API radi, ali bez perzistencije)
 """
 
 import os, datetime
 from sqlalchemy import (
     create_engine, MetaData, Table, Column,
     Integer, String, Date, DateTime, Boolean, Float, JSON,
-    ForeignKey, UniqueConstraint, Index
+    ForeignKey, UniqueConstraint, Index, func, REAL
 )
 from dotenv import load_dotenv
 
 load_dotenv()
-DB_URL = os.environ["DATABASE_URL"]
+DB_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DB_URL, echo=False)
+engine = create_engine(DB_URL, echo=False, pool_pre_ping=True) if DB_URL else None
 meta   = MetaData(schema="public")
 
 
@@ -70,6 +71,13 @@ teams = Table(
     Index("idx_teams_name", "name")
 )
 
+league_teams = Table(
+    "league_teams", meta,                                 # koji timovi igraju ligu u sezoni
+    Column("league_id", Integer, ForeignKey("leagues.id"), primary_key=True),
+    Column("season",    Integer,                          primary_key=True),
+    Column("team_id",   Integer, ForeignKey("teams.id"),   primary_key=True),
+)
+
 players = Table(
     "players", meta,
     Column("id",        Integer, primary_key=True),
@@ -110,9 +118,21 @@ fixtures = Table(
     Column("pen_home",    Integer),
     Column("pen_away",    Integer),
 
-    UniqueConstraint("id", name="uq_fixtures_id")
+    UniqueConstraint("id", name="uq_fixtures_id"),
+    # upiti po datumu, ligi/sezoni, timu i statusu (vidi benchmarks/fixture_queries.py)
+    Index("idx_fixtures_date",          "date_utc"),
+    Index("idx_fixtures_league_season", "league_id", "season", "date_utc"),
+    Index("idx_fixtures_home_date",     "home_id", "date_utc"),
+    Index("idx_fixtures_away_date",     "away_id", "date_utc"),
+    Index("idx_fixtures_status_date",   "status_short", "date_utc"),
 )
 
+# head-to-head: neuređen par timova → isti ključ bez obzira ko je domaćin
+Index("idx_fixtures_pair",
+      func.least(fixtures.c.home_id, fixtures.c.away_id),
+      func.greatest(fixtures.c.home_id, fixtures.c.away_id),
+      fixtures.c.date_utc)
+
 fixture_statistics = Table(
     "fixture_statistics", meta,
     Column("fixture_id", Integer, ForeignKey("fixtures.id", ondelete="CASCADE"), primary_key=True),
@@ -133,13 +153,16 @@ fixture_events = Table(
     Column("comments",   String(128)),
     Column("elapsed",    Integer),
     Column("extra",      Integer),
+    Index("idx_fixture_events_fixture", "fixture_id"),       # ON DELETE CASCADE bez seq scan-a
 )
 
+# zastarelo: H2H se sada izvodi iz fixtures (read_through.head2head, idx_fixtures_pair)
 head2head = Table(
     "head2head", meta,
     Column("id",         Integer, primary_key=True, autoincrement=True),
     Column("fixture_id", Integer, ForeignKey("fixtures.id", ondelete="CASCADE")),
-    Column("data",       JSON)  # sirovi H2H JSON (fleksibilno)
+    Column("data",       JSON),  # sirovi H2H JSON (fleksibilno)
+    Index("idx_head2head_fixture", "fixture_id"),
 )
 
 # ──────────────────────────── 3. ODDS & BETS ─────────────────────────────────────
@@ -166,7 +189,20 @@ odds = Table(
     Column("ts_fetched",   DateTime, default=datetime.datetime.utcnow),
 
     UniqueConstraint("fixture_id", "bookmaker_id", "bet_id", "selection",
-                     name="uq_odds_unique_line")
+                     name="uq_odds_unique_line"),                # pokriva i upite po fixture_id
+    Index("idx_odds_ts_fetched", "ts_fetched"),
+)
+
+# append-only istorija cena: red samo kada se kvota linije promeni (odds_loader.py);
+# mesečne particije po ts (db_maintenance.py), BRIN jer ts raste sa upisom
+odds_history = Table(
+    "odds_history", meta,
+    Column("line_id", Integer,  nullable=False),      # odds.id = (fixture, kladionica, oklada, selekcija)
+    Column("ts",      DateTime, nullable=False),
+    Column("odd",     REAL,     nullable=False),
+    Index("idx_odds_history_line_ts", "line_id", "ts"),
+    Index("idx_odds_history_ts", "ts", postgresql_using="brin"),
+    postgresql_partition_by="RANGE (ts)",
 )
 
 # ────────────────────────── 4. PREDICTIONS & RESULTS ─────────────────────────────
@@ -174,6 +210,8 @@ predictions = Table(
     "predictions", meta,
     Column("fixture_id",  Integer, ForeignKey("fixtures.id", ondelete="CASCADE"), primary_key=True),
     Column("model",       String(32),  primary_key=True),   # eg. btts_combo / predictor
+    Column("version",     String(16)),                      # verzija modela koja je dala payload
+    Column("inputs_hash", String(64)),                      # sha256 ulaza modela (poeni, Elo, kvote…)
     Column("payload",     JSON),                            # raw output modela
     Column("generated_at",DateTime, default=datetime.datetime.utcnow),
     Column("hit",         Boolean),                         # NULL dok se meč ne završi
@@ -198,8 +236,55 @@ standings = Table(
     Column("form",      String(32)),
 )
 
-# ─────────────────────────── 6. CREATE ALL TABLES ────────────────────────────────
+# forma tima po (liga, sezona) izvedena iz završenih fixtures (team_form.py);
+# home_* / away_* su podela po terenu, zbir daje ukupno
+FORM_STATS = ("played", "wins", "draws", "losses", "goals_for", "goals_against",
+              "clean_sheets", "failed_to_score", "btts")
+
+team_form = Table(
+    "team_form", meta,
+    Column("team_id",   Integer, ForeignKey("teams.id"),   primary_key=True),
+    Column("league_id", Integer, ForeignKey("leagues.id"), primary_key=True),
+    Column("season",    Integer,                           primary_key=True),
+    *[Column(f"{side}_{stat}", Integer, nullable=False, default=0)
+      for side in ("home", "away") for stat in FORM_STATS],
+    Column("form",           String(16)),                  # zadnjih N ishoda, najnoviji poslednji
+    Column("last_match_at",  DateTime),
+    Column("updated_at",     DateTime, default=datetime.datetime.utcnow),
+)
+
+# ─────────────────────────── 6. SYNC STATE ───────────────────────────────────────
+# kada je koji "opseg" podataka zadnji put povučen sa API-ja (read_through.py);
+# npr. ("fixtures", "date=2025-08-16"), ("standings", "league=39;season=2025")
+sync_state = Table(
+    "sync_state", meta,
+    Column("entity",     String(32),  primary_key=True),
+    Column("scope",      String(128), primary_key=True),
+    Column("fetched_at", DateTime, nullable=False),
+)
+
+# ─────────────────────────── 7. CREATE ALL TABLES ────────────────────────────────
+# create_all ne menja postojeće tabele – kolone dodate kasnije idu ovde
+UPGRADES = [
+    "ALTER TABLE public.predictions ADD COLUMN IF NOT EXISTS version VARCHAR(16)",
+    "ALTER TABLE public.predictions ADD COLUMN IF NOT EXISTS inputs_hash VARCHAR(64)",
+]
+
+
+def ensure_indexes(conn) -> None:
+    """create_all ne dodaje indekse na tabele koje već postoje – ovo ih dodaje."""
+    for table in meta.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 if __name__ == "__main__":
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
     print("• Kreiram šemu…")
     meta.create_all(engine, checkfirst=True)
+    with engine.begin() as conn:
+        for ddl in UPGRADES:
+            conn.exec_driver_sql(ddl)
+        ensure_indexes(conn)
     print("✔  Sve tabele su kreirane/već postoje.")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+db_maintenance.py
+─────────────────
+Održavanje šeme, za dnevni Cron job:
+
+• indeksi iz db_init.py na već postojećim tabelama (ensure_indexes)
+• mesečne particije: svaka RANGE-particionisana tabela u šemi public
+  (odds_history) dobija particije od tekućeg meseca do
+  PARTITION_MONTHS_AHEAD meseci unapred
+• retencija (RETENTION_MONTHS, bez nje se ništa ne briše):
+    – particije starije od granice se brišu celim DROP TABLE-om
+    – fixtures starije od granice se brišu u serijama (kvote, predikcije,
+      statistika i događaji idu za njima preko ON DELETE CASCADE)
+
+fixtures i odds nisu particionisane: na fixtures.id pokazuju strani ključevi
+iz pet tabela, a Postgres traži da ključ particije bude deo svakog
+jedinstvenog ključa – id bi prestao da bude jedinstven sam za sebe.
+
+    python db_maintenance.py [retention_months]
+"""
+
+import datetime as dt
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from db_init import engine, ensure_indexes, fixtures as fixtures_t
+
+MONTHS_AHEAD   = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+RETENTION      = os.getenv("RETENTION_MONTHS")
+PURGE_BATCH    = int(os.getenv("RETENTION_PURGE_BATCH", "1000"))
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def month_start(day: dt.date) -> dt.date:
+    return dt.date(day.year, day.month, 1)              # i za datetime (npr. ts upisa)
+
+
+def add_months(day: dt.date, months: int) -> dt.date:
+    index = day.year * 12 + day.month - 1 + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: dt.date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partitioned_tables(conn: Connection) -> List[str]:
+    """Sve RANGE-particionisane tabele u šemi public."""
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_partitioned_table p"
+        " JOIN pg_class c ON c.oid = p.partrelid"
+        " JOIN pg_namespace n ON n.oid = c.relnamespace"
+        " WHERE n.nspname = 'public' AND p.partstrat = 'r'"
+        " ORDER BY c.relname"
+    )).scalars())
+
+
+def partitions(conn: Connection, table: str) -> List[Tuple[str, dt.date, dt.date]]:
+    """(ime, od, do) za svaku particiju tabele, po redu."""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i"
+        " JOIN pg_class c ON c.oid = i.inhrelid"
+        " JOIN pg_class p ON p.oid = i.inhparent"
+        " JOIN pg_namespace n ON n.oid = p.relnamespace"
+        " WHERE n.nspname = 'public' AND p.relname = :table"
+    ), {"table": table}).all()
+    found = []
+    for name, bound in rows:
+        match = _BOUNDS.search(bound or "")
+        if match:                                   # DEFAULT particija nema granice
+            found.append((name,
+                          dt.date.fromisoformat(match.group(1)[:10]),
+                          dt.date.fromisoformat(match.group(2)[:10])))
+    return sorted(found, key=lambda p: p[1])
+
+
+def partition_ddl(table: str, month: dt.date) -> Tuple[str, str]:
+    """(ime, CREATE TABLE … PARTITION OF) za mesec u kome je  month."""
+    start = month_start(month)
+    name = partition_name(table, start)
+    return name, (
+        f'CREATE TABLE IF NOT EXISTS public."{name}" PARTITION OF public."{table}"'
+        f" FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+
+def ensure_partition(conn: Connection, table: str, month: dt.date) -> str:
+    """Particija za mesec u kome je  month  (idempotentno, DDL samo ako je nema)."""
+    name, ddl = partition_ddl(table, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": f"public.{name}"}).scalar() is None:
+        conn.exec_driver_sql(ddl)
+    return name
+
+
+def ensure_partitions(conn: Connection, table: str, ahead: int = MONTHS_AHEAD,
+                      start: Optional[dt.date] = None) -> List[str]:
+    """Particije od  start  (default: tekući mesec) do  ahead  meseci unapred."""
+    today = dt.datetime.utcnow().date()
+    month = month_start(start or today)
+    last = add_months(month_start(today), ahead)
+    created = []
+    while month <= last:
+        created.append(ensure_partition(conn, table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(conn: Connection, table: str, cutoff: dt.date) -> List[str]:
+    """Briše particije čija je gornja granica ≤ cutoff – trenutno, bez VACUUM-a."""
+    dropped = []
+    for name, _, upper in partitions(conn, table):
+        if upper <= cutoff:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS public."{name}"')
+            dropped.append(name)
+    return dropped
+
+
+def purge_fixtures_before(cutoff: dt.date, batch: int = PURGE_BATCH) -> int:
+    """
+    Briše fixtures sa date_utc < cutoff u serijama od  batch  redova, svaka
+    serija u svojoj transakciji – kratke brave, loader i ruteri rade dalje.
+    """
+    limit = dt.datetime.combine(cutoff, dt.time())
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            ids = list(conn.execute(
+                select(fixtures_t.c.id).where(fixtures_t.c.date_utc < limit).limit(batch)
+            ).scalars())
+            if not ids:
+                return total
+            conn.execute(fixtures_t.delete().where(fixtures_t.c.id.in_(ids)))
+        total += len(ids)
+
+
+def run(retention_months: Optional[int] = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"created": [], "dropped": [], "purged_fixtures": 0}
+    with engine.begin() as conn:
+        ensure_indexes(conn)
+        tables = partitioned_tables(conn)
+        for table in tables:
+            report["created"] += ensure_partitions(conn, table)
+
+    if retention_months:
+        cutoff = add_months(month_start(dt.datetime.utcnow().date()), -retention_months)
+        report["cutoff"] = cutoff.isoformat()
+        with engine.begin() as conn:
+            for table in tables:
+                report["dropped"] += drop_partitions_before(conn, table, cutoff)
+        report["purged_fixtures"] = purge_fixtures_before(cutoff)
+
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    return report
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    months = argv[1] if len(argv) > 1 else RETENTION
+    report = run(int(months) if months else None)
+    print(f"✓ particije: {len(report['created'])} osigurano, {len(report['dropped'])} obrisano")
+    if "cutoff" in report:
+        print(f"✓ retencija do {report['cutoff']}: obrisano {report['purged_fixtures']} fixtura")
+    print(f"  ({report['seconds']} s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+"""
+elo_ratings.py
+──────────────
+Elo rejting (smartbets_API/elo.py) uz Postgres i snapshot na disku.
+
+• record_fixtures(): posle commit-a loader (jednom, na kraju load_range) i
+  live sync predaju seriju – završeni mečevi se primenjuju odmah, bez
+  upita, i snapshot se upisuje
+• ishod je rezultat posle 90 minuta (score.fulltime / ft_*, konačan samo
+  gde ga nema) – isto kao backtest i Poisson model
+• catch_up(): jedan prolaz kroz  fixtures  (server-side kursor, redom po
+  timestamp-u) od  last_ts − ELO_CATCHUP_SLACK_DAYS; prazan snapshot =
+  cela istorija.  Primenjeni mečevi se preskaču po id-u
+• get_ratings(): za API – učitava snapshot, a novi (od loadera) preuzima
+  najviše jednom u ELO_RELOAD_SECONDS; lookup po timu je O(1)
+• loader, live sync i API su različiti procesi: upis ide pod fcntl lock-om
+  uz prethodno učitavanje novijeg snapshot-a, pa se promene ne gaze
+• serija koja nije primenjena (greška pri upisu) ostavlja marker
+  <snapshot>.stale – sledeći record_fixtures umesto nje radi catch-up iz baze
+
+    python elo_ratings.py              # catch-up (cron / posle backfill-a)
+    python elo_ratings.py rebuild      # od nule, hronološki
+"""
+
+import fcntl
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from db_init import engine
+from smartbets_API.elo import EloRatings
+from team_form import FINISHED
+
+SNAPSHOT       = os.getenv("ELO_SNAPSHOT", "/tmp/elo_ratings.npz")
+RELOAD_SECONDS = int(os.getenv("ELO_RELOAD_SECONDS", "30"))
+CATCHUP_SLACK  = int(os.getenv("ELO_CATCHUP_SLACK_DAYS", "3")) * 86400
+CATCHUP_CHUNK  = 20000
+STALE          = f"{SNAPSHOT}.stale"
+
+logger = logging.getLogger(__name__)
+
+CATCHUP_SQL = text("""
+SELECT id, timestamp, home_id, away_id,
+       COALESCE(ft_home, home_goals), COALESCE(ft_away, away_goals)
+  FROM public.fixtures
+ WHERE status_short = ANY(:finished)
+   AND timestamp >= :since
+   AND COALESCE(ft_home, home_goals) IS NOT NULL
+   AND COALESCE(ft_away, away_goals) IS NOT NULL
+   AND home_id IS NOT NULL AND away_id IS NOT NULL
+ ORDER BY timestamp, id
+""")
+
+_lock = threading.Lock()
+_ratings: Optional[EloRatings] = None
+_mtime = 0.0
+_checked = 0.0
+
+
+def _snapshot_mtime() -> float:
+    try:
+        return os.stat(SNAPSHOT).st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _reload_if_newer() -> EloRatings:
+    """Poziva se pod _lock-om."""
+    global _ratings, _mtime
+    mtime = _snapshot_mtime()
+    if _ratings is None or mtime > _mtime:
+        _ratings = EloRatings.load(SNAPSHOT) if mtime else EloRatings()
+        _mtime = mtime
+    return _ratings
+
+
+def _save(ratings: EloRatings) -> None:
+    global _mtime
+    os.makedirs(os.path.dirname(SNAPSHOT) or ".", exist_ok=True)
+    ratings.save(SNAPSHOT)
+    _mtime = _snapshot_mtime()
+
+
+@contextmanager
+def _writing() -> Iterator[EloRatings]:
+    """Jedan pisac u procesu (thread lock) i među procesima (flock)."""
+    with _lock:
+        os.makedirs(os.path.dirname(SNAPSHOT) or ".", exist_ok=True)
+        with open(f"{SNAPSHOT}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield _reload_if_newer()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _columns(rows: Sequence[Any]) -> np.ndarray:
+    return np.array(rows, dtype=np.int64).reshape(-1, 6)
+
+
+def mark_stale() -> None:
+    """Snapshot je propustio seriju – sledeći record_fixtures radi catch-up."""
+    try:
+        os.makedirs(os.path.dirname(STALE) or ".", exist_ok=True)
+        with open(STALE, "a"):
+            pass
+    except OSError as exc:
+        logger.warning(f"Elo marker {STALE} nije upisan: {exc}")
+
+
+def result_row(raw: Dict[str, Any]) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """
+    Završen meč u upstream obliku → (id, timestamp, domaćin, gost, golovi
+    posle 90 minuta); None za nezavršen ili nepotpun.  Golovi su
+    score.fulltime, a  goals  samo gde ga nema – produžeci ne ulaze u Elo.
+    """
+    fixture = raw.get("fixture") or {}
+    if (fixture.get("status") or {}).get("short") not in FINISHED:
+        return None
+    teams, goals = raw.get("teams") or {}, raw.get("goals") or {}
+    ft = (raw.get("score") or {}).get("fulltime") or {}
+    home = ft.get("home") if ft.get("home") is not None else goals.get("home")
+    away = ft.get("away") if ft.get("away") is not None else goals.get("away")
+    row = (fixture.get("id"), fixture.get("timestamp"),
+           (teams.get("home") or {}).get("id"), (teams.get("away") or {}).get("id"),
+           home, away)
+    return None if None in row else row
+
+
+def record_fixtures(raws: Sequence[Dict[str, Any]]) -> int:
+    """
+    Završeni mečevi iz serije loadera (upstream oblik) → rejting + snapshot.
+    Primenjuju se redom po (timestamp, id) unutar serije.  Ako je snapshot
+    označen kao zastareo (mark_stale), radi se catch-up iz baze.
+    """
+    if os.path.exists(STALE):
+        return catch_up()
+    rows = [row for row in map(result_row, raws) if row is not None]
+    if not rows:
+        return 0
+    c = _columns(rows)
+    with _writing() as ratings:
+        applied = ratings.update_many(c[:, 0], c[:, 1], c[:, 2], c[:, 3], c[:, 4], c[:, 5])
+        if applied:
+            _save(ratings)
+    return applied
+
+
+def catch_up(rebuild: bool = False) -> int:
+    """Jedan prolaz kroz fixtures; vraća broj novih mečeva."""
+    global _ratings
+    applied = 0
+    with _writing() as ratings:
+        if rebuild:
+            ratings = _ratings = EloRatings()
+        since = max(ratings.last_ts - CATCHUP_SLACK, 0) if ratings.last_ts else 0
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=CATCHUP_CHUNK) \
+                .execute(CATCHUP_SQL, {"finished": list(FINISHED), "since": since})
+            for rows in result.partitions(CATCHUP_CHUNK):
+                c = _columns(rows)
+                applied += ratings.update_many(c[:, 0], c[:, 1], c[:, 2], c[:, 3], c[:, 4], c[:, 5])
+        if applied or rebuild:
+            _save(ratings)
+        if os.path.exists(STALE):
+            os.remove(STALE)
+    return applied
+
+
+def get_ratings() -> Optional[EloRatings]:
+    """Rejting za Predictor; None dok snapshot ne postoji (python elo_ratings.py)."""
+    global _checked
+    now = time.monotonic()
+    if _ratings is None or now - _checked >= RELOAD_SECONDS:
+        with _lock:
+            _checked = now
+            ratings = _reload_if_newer()
+    else:
+        ratings = _ratings
+    return ratings if len(ratings) else None
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    rebuild = len(argv) > 1 and argv[1] == "rebuild"
+    started = time.perf_counter()
+    applied = catch_up(rebuild)
+    ratings = _ratings
+    print(f"✓ elo: {applied} novih mečeva, {len(ratings)} timova → {SNAPSHOT} "
+          f"({time.perf_counter() - started:.2f} s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
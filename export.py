@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+export.py
+
+▲ Što radi?
+    • izvozi  fixtures / fixture_statistics / odds  jedne sezone (opciono
+      jedne lige) u kolonarni format: Parquet (default) ili Arrow IPC
+    • redovi se čitaju server-side kursorom u blokovima od EXPORT_CHUNK_ROWS,
+      svaki blok postaje jedan RecordBatch (u Parquet-u jedna row group) –
+      memorija je ista za jedan dan i za cijelu sezonu
+    • isti generator koristi i ruta  GET /export/{table}  (routers/export.py)
+
+    python export.py fixtures 2024 [liga]
+    python export.py all 2024 39            # sve tri tablice
+
+▲ Zahtjevi:
+    • DATABASE_URL
+    • pyarrow  (u requirements.txt) – uvozi se lenjo, pa API bez njega i dalje radi
+"""
+
+import io
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, REAL, select
+from sqlalchemy.sql import Select
+
+from db_init import engine, fixture_statistics, fixtures, odds
+
+CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+FORMATS    = {"parquet": ".parquet", "arrow": ".arrow"}
+MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow":   "application/vnd.apache.arrow.stream",
+}
+TABLES = ("fixtures", "fixture_statistics", "odds")
+
+
+def _arrow() -> Tuple[Any, Any]:
+    """pyarrow je opcion – uvozi se tek kad zatreba."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Izvoz traži pyarrow:  pip install pyarrow") from exc
+    return pa, pq
+
+
+def arrow_available() -> bool:
+    try:
+        _arrow()
+    except RuntimeError:
+        return False
+    return True
+
+
+def export_query(table: str, season: int, league: Optional[int] = None) -> Select:
+    """SELECT jedne sezone (i lige), sortiran po fixture-u zbog kompresije i ponovljivosti."""
+    if table == "fixtures":
+        stmt = select(fixtures).order_by(fixtures.c.id)
+    elif table == "fixture_statistics":
+        stmt = (select(fixture_statistics)
+                .join(fixtures, fixtures.c.id == fixture_statistics.c.fixture_id)
+                .order_by(fixture_statistics.c.fixture_id, fixture_statistics.c.team_id))
+    elif table == "odds":
+        stmt = (select(odds)
+                .join(fixtures, fixtures.c.id == odds.c.fixture_id)
+                .order_by(odds.c.fixture_id, odds.c.bookmaker_id, odds.c.bet_id))
+    else:
+        raise ValueError(f"nepoznata tablica za izvoz: {table}")
+    stmt = stmt.where(fixtures.c.season == season)
+    if league is not None:
+        stmt = stmt.where(fixtures.c.league_id == league)
+    return stmt
+
+
+def arrow_schema(stmt: Select) -> Any:
+    pa, _ = _arrow()
+    fields = []
+    for col in stmt.selected_columns:
+        t = col.type
+        if isinstance(t, REAL):
+            at = pa.float32()
+        elif isinstance(t, Float):
+            at = pa.float64()
+        elif isinstance(t, Integer):
+            at = pa.int64()
+        elif isinstance(t, DateTime):
+            at = pa.timestamp("us")
+        elif isinstance(t, Date):
+            at = pa.date32()
+        elif isinstance(t, Boolean):
+            at = pa.bool_()
+        else:
+            at = pa.string()
+        fields.append(pa.field(col.name, at))
+    return pa.schema(fields)
+
+
+def iter_batches(stmt: Select, schema: Any, chunk_rows: int = CHUNK_ROWS) -> Iterator[Any]:
+    """Server-side kursor (stream_results) → jedan RecordBatch po bloku redova."""
+    pa, _ = _arrow()
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunk_rows).execute(stmt)
+        for rows in result.partitions(chunk_rows):
+            columns = list(zip(*rows))
+            yield pa.record_batch(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+
+
+def _writer(fmt: str, where: Any, schema: Any) -> Any:
+    pa, pq = _arrow()
+    if fmt == "parquet":
+        return pq.ParquetWriter(where, schema, compression="zstd")
+    if fmt == "arrow":
+        return pa.ipc.new_stream(where, schema)
+    raise ValueError(f"nepoznat format: {fmt}")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Izlaz writer-a koji se prazni posle svakog bloka – za HTTP stream."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos                    # ParquetWriter računa offset-e iz ovoga
+
+    def drain(self) -> bytes:
+        data, self._buf = bytes(self._buf), bytearray()
+        return data
+
+
+def stream_export(table: str, season: int, league: Optional[int] = None,
+                  fmt: str = "parquet", chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Bajtovi fajla blok po blok (sinhroni generator – Starlette ga vrti u thread pool-u)."""
+    stmt = export_query(table, season, league)
+    schema = arrow_schema(stmt)
+    sink = _ChunkSink()
+    writer = _writer(fmt, sink, schema)
+    try:
+        for batch in iter_batches(stmt, schema, chunk_rows):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_to_file(table: str, season: int, league: Optional[int] = None,
+                   fmt: str = "parquet", out_dir: str = EXPORT_DIR) -> Dict[str, Any]:
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = f"_{league}" if league is not None else ""
+    path = os.path.join(out_dir, f"{table}_{season}{suffix}{FORMATS[fmt]}")
+    started = time.perf_counter()
+    stmt = export_query(table, season, league)
+    schema = arrow_schema(stmt)
+    rows = 0
+    writer = _writer(fmt, path, schema)
+    try:
+        for batch in iter_batches(stmt, schema):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return {"path": path, "rows": rows, "bytes": os.path.getsize(path),
+            "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    if len(argv) < 3:
+        raise SystemExit("upotreba: python export.py <fixtures|fixture_statistics|odds|all> <sezona> [liga]")
+    tables = TABLES if argv[1] == "all" else (argv[1],)
+    season = int(argv[2])
+    league = int(argv[3]) if len(argv) > 3 else None
+    fmt = os.getenv("EXPORT_FORMAT", "parquet")
+
+    for table in tables:
+        info = export_to_file(table, season, league, fmt)
+        print(f"✓ {table}: {info['rows']} redova → {info['path']} "
+              f"({info['bytes'] / 1e6:.1f} MB, {info['seconds']} s)")
+
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
@@ -3,9 +3,19 @@
 fixtures_loader.py
 
 ▲ Što radi?
-    • dohvaća fixtur(e) za zadani datum  (default = danas, UTC)
-    • popunjava / ažurira tablicu  fixtures  u Postgres bazi
-    • pokreće se ručno:        python fixtures_loader.py 2025-07-01
+    • dohvaća fixture za raspon datuma (default = danas, UTC), više datuma
+      paralelno, u "bulk" traci rate-limitera (ne troši kvotu rutera)
+    • sirove odgovore pretvara u kolone tablice  fixtures  iz db_init.py
+      (+ minimalni zapisi u leagues / teams / venues zbog FK-ova)
+    • upsert u Postgres u blokovima fiksne veličine kroz jedan engine s poolom;
+      redovi idu sortirani po id-u, pa paralelni dani zaključavaju istim
+      redom, a deadlock koji ipak nastane ponavlja se cijela transakcija
+    • forma timova (team_form) se osvježava samo za timove iz završenih mečeva
+    • završeni mečevi ulaze u Elo rejting (elo_ratings.py, snapshot na disku)
+      tek kad su svi dani upisani, hronološki – dani stižu paralelno i
+      nekim redom, a Elo zavisi od redoslijeda
+    • na kraju ispisuje propusnost (fixtura / s)
+    • pokreće se ručno:        python fixtures_loader.py 2025-07-01 [2025-07-31]
       ili iz Cron job-a / Background Worker-a bez argumenata
 
 ▲ Zahtjevi:
@@ -14,104 +24,293 @@ fixtures_loader.py
     • SQLAlchemy 2.x +  psycopg2-binary  (u requirements.txt)
 """
 
+import asyncio
+import logging
 import os
+import random
 import sys
+import time
 import datetime as dt
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from db_init import (
+    engine, fixtures as fixtures_t, leagues as leagues_t, teams as teams_t,
+    venues as venues_t, sync_state as sync_state_t,
+)
 # tvoj wrapper
 from smartbets_API.api_football import get_fixtures_by_date
+from smartbets_API.ratelimit import BULK, priority
+from elo_ratings import mark_stale, record_fixtures
+from team_form import refresh_team_form, touched_teams
 
+CHUNK_SIZE  = int(os.getenv("LOADER_CHUNK_SIZE", "500"))
+CONCURRENCY = int(os.getenv("LOADER_CONCURRENCY", "4"))
+DEADLOCK_RETRIES = int(os.getenv("LOADER_DEADLOCK_RETRIES", "3"))
 
-def _iso_date(arg: str | None) -> dt.date:
+logger = logging.getLogger(__name__)
+
+# deadlock_detected, serialization_failure – transakcija je poništena, smije se ponoviti
+RETRYABLE_PGCODES = {"40P01", "40001"}
+
+
+def _iso_date(arg: Optional[str]) -> dt.date:
     """vrati date objekt iz YYYY-MM-DD stringa ili današnji datum."""
     if arg:
         return dt.date.fromisoformat(arg)
     return dt.datetime.utcnow().date()
 
 
-def _flatten_fixture(raw: dict) -> dict:
+def _date_range(start: dt.date, end: dt.date) -> List[dt.date]:
+    return [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _cut(value: Optional[str], size: int) -> Optional[str]:
+    """VARCHAR kolone su ograničene – predugačak string bi oborio cijeli blok."""
+    return value[:size] if isinstance(value, str) else value
+
+
+def _utc(value: Optional[str]) -> Optional[dt.datetime]:
+    """ISO string iz API-ja → naivni UTC datetime (kolona je DateTime bez zone)."""
+    if not value:
+        return None
+    parsed = dt.datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def flatten_fixture(raw: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Iz raw JSON-a (kakav vraća api_football) izvlači kolone
-    koje postoje u tablici  fixtures.
-    Prilagodi nazive ako si u DB shemi drugačije imenovao!
+    Iz jednog elementa  response  liste (kakav vraća /fixtures) izvlači
+    kolone tablice  fixtures  iz db_init.py.
     """
-    fxt   = raw["fixture"]["fixture"]
-    lg    = raw["fixture"]["league"]
-    teams = raw["fixture"]["teams"]
-    goals = raw["fixture"]["goals"]
-    stat  = fxt["status"]
+    fxt    = raw["fixture"]
+    lg     = raw.get("league") or {}
+    teams  = raw.get("teams") or {}
+    goals  = raw.get("goals") or {}
+    score  = raw.get("score") or {}
+    stat   = fxt.get("status") or {}
+    venue  = fxt.get("venue") or {}
+
+    def part(name: str, side: str) -> Optional[int]:
+        return (score.get(name) or {}).get(side)
 
     return {
-        "fixture_id":      fxt["id"],
+        "id":           fxt["id"],
 
-        # FK prema leagues / teams (već moraju postojati ili radi ON CONFLICT … NOTHING)
-        "league_id":       lg["id"],
-        "season":          lg["season"],
-        "home_team_id":    teams["home"]["id"],
-        "away_team_id":    teams["away"]["id"],
+        # FK prema leagues / venues / teams (vidi reference_rows)
+        "league_id":    lg.get("id"),
+        "season":       lg.get("season"),
+        "round":        _cut(lg.get("round"), 64),
+        "venue_id":     venue.get("id"),
+        "home_id":      (teams.get("home") or {}).get("id"),
+        "away_id":      (teams.get("away") or {}).get("id"),
 
         # osnovni podaci
-        "date_utc":        fxt["date"],       # ISO string
-        "timestamp":       fxt["timestamp"],  # epoch (int)
-        "venue_name":      fxt["venue"]["name"] if fxt["venue"] else None,
-        "venue_city":      fxt["venue"]["city"] if fxt["venue"] else None,
+        "date_utc":     _utc(fxt.get("date")),
+        "timestamp":    fxt.get("timestamp"),
+        "referee":      _cut(fxt.get("referee"), 64),
 
         # status + rezultat
-        "status_short":    stat["short"],
-        "status_long":     stat["long"],
-        "elapsed":         stat["elapsed"],
+        "status_long":  _cut(stat.get("long"), 32),
+        "status_short": _cut(stat.get("short"), 8),
+        "elapsed":      stat.get("elapsed"),
 
-        "goals_home":      goals["home"],
-        "goals_away":      goals["away"],
+        "home_goals":   goals.get("home"),
+        "away_goals":   goals.get("away"),
+        "ht_home":      part("halftime", "home"),
+        "ht_away":      part("halftime", "away"),
+        "ft_home":      part("fulltime", "home"),
+        "ft_away":      part("fulltime", "away"),
+        "et_home":      part("extratime", "home"),
+        "et_away":      part("extratime", "away"),
+        "pen_home":     part("penalty", "home"),
+        "pen_away":     part("penalty", "away"),
     }
 
 
-def save_fixtures(rows: List[dict]) -> None:
+def reference_rows(raws: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Bulk upsert u Postgres.
-    Ako već postoji isti fixture_id → UPDATE svih ostalih kolona.
+    Lige, timovi i stadioni na koje fixture pokazuju.  Upisuju se s
+    ON CONFLICT DO NOTHING – bogatiji podaci iz drugih izvora se ne gaze.
+    Svaka lista je sortirana po id-u (isti redoslijed zaključavanja u svim
+    transakcijama).
     """
-    db_url = os.environ["DATABASE_URL"]
-    engine = create_engine(db_url, pool_pre_ping=True)
-
-    meta = MetaData()
-    meta.reflect(bind=engine, only=("fixtures",))
-    fixtures_t = meta.tables["fixtures"]
-
-    with engine.begin() as conn:
-        stmt = pg_insert(fixtures_t).values(rows)
-        # sve kolone osim PK (fixture_id) update-amo kada se sudare
-        update_cols = {c: stmt.excluded[c]
-                       for c in rows[0].keys() if c != "fixture_id"}
+    leagues: Dict[int, Dict[str, Any]] = {}
+    teams:   Dict[int, Dict[str, Any]] = {}
+    venues:  Dict[int, Dict[str, Any]] = {}
+    for raw in raws:
+        lg = raw.get("league") or {}
+        if lg.get("id") is not None:
+            leagues[lg["id"]] = {"id": lg["id"], "name": _cut(lg.get("name"), 64) or "",
+                                 "logo": _cut(lg.get("logo"), 256)}
+        for side in ("home", "away"):
+            team = (raw.get("teams") or {}).get(side) or {}
+            if team.get("id") is not None:
+                teams[team["id"]] = {"id": team["id"], "name": _cut(team.get("name"), 64) or "",
+                                     "logo": _cut(team.get("logo"), 256)}
+        venue = (raw.get("fixture") or {}).get("venue") or {}
+        if venue.get("id") is not None:
+            venues[venue["id"]] = {"id": venue["id"], "name": _cut(venue.get("name"), 128),
+                                   "city": _cut(venue.get("city"), 64)}
+    return {"leagues": [leagues[k] for k in sorted(leagues)],
+            "teams":   [teams[k] for k in sorted(teams)],
+            "venues":  [venues[k] for k in sorted(venues)]}
+
+
+def _chunks(rows: Sequence[Dict[str, Any]], size: int) -> Iterator[Sequence[Dict[str, Any]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def upsert_fixtures(conn: Connection, raws: Sequence[Dict[str, Any]],
+                    chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Bulk upsert u Postgres, u blokovima od  chunk_size  redova.
+    Ako već postoji isti id → UPDATE svih ostalih kolona.
+    """
+    if not raws:
+        return 0
+
+    refs = reference_rows(raws)
+    for table, key in ((leagues_t, "leagues"), (teams_t, "teams"), (venues_t, "venues")):
+        for chunk in _chunks(refs[key], chunk_size):
+            conn.execute(pg_insert(table).values(list(chunk)).on_conflict_do_nothing(index_elements=["id"]))
+
+    # isti id dvaput u jednom INSERT … ON CONFLICT bi pao → zadnji pobjeđuje;
+    # po id-u sortirano, kao i reference
+    by_id = {row["id"]: row for row in map(flatten_fixture, raws)}
+    rows = [by_id[k] for k in sorted(by_id)]
+    for chunk in _chunks(rows, chunk_size):
+        stmt = pg_insert(fixtures_t).values(list(chunk))
+        # sve kolone osim PK (id) update-amo kada se sudare
         stmt = stmt.on_conflict_do_update(
-            index_elements=["fixture_id"],
-            set_=update_cols
+            index_elements=["id"],
+            set_={c: stmt.excluded[c] for c in chunk[0] if c != "id"},
         )
         conn.execute(stmt)
+    return len(rows)
+
+
+def mark_synced(conn: Connection, entity: str, scope: str) -> None:
+    """Zabilježi da je opseg (npr. fixtures / date=2025-08-16) upravo povučen s API-ja."""
+    stmt = pg_insert(sync_state_t).values(entity=entity, scope=scope,
+                                          fetched_at=dt.datetime.utcnow())
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["entity", "scope"],
+        set_={"fetched_at": stmt.excluded.fetched_at},
+    ))
+
+
+def date_scope(day: str, league: Optional[int] = None, season: Optional[int] = None) -> str:
+    scope = f"date={day}"
+    if league is not None:
+        scope += f";league={league}"
+    if season is not None:
+        scope += f";season={season}"
+    return scope
+
+
+def record_elo(raws: Sequence[Dict[str, Any]]) -> None:
+    """Elo iz serije; greška ne obara upis – snapshot se označava za catch-up."""
+    try:
+        record_fixtures(raws)
+    except Exception as exc:
+        logger.warning(f"Elo snapshot nije ažuriran ({exc}) – sljedeći prolaz radi catch-up")
+        mark_stale()
+
+
+def save_fixtures(raws: Sequence[Dict[str, Any]], chunk_size: int = CHUNK_SIZE,
+                  scope: Optional[str] = None, elo: bool = True) -> int:
+    """
+    Upsert jedne serije fixtura u vlastitoj transakciji (dijeljeni engine);
+    deadlock / serialization failure ponavlja transakciju do DEADLOCK_RETRIES puta.
+    Forma timova iz završenih mečeva serije se preračunava u istoj transakciji.
+    Sa  scope  (vidi date_scope) se serija bilježi i kao svježa za read-through rutere.
+    Elo rejting se ažurira tek posle commit-a, samo iz završenih mečeva serije;
+    elo=False prepušta to pozivaocu (load_range ga radi jednom, hronološki).
+    """
+    for attempt in range(DEADLOCK_RETRIES + 1):
+        try:
+            with engine.begin() as conn:
+                saved = upsert_fixtures(conn, raws, chunk_size)
+                refresh_team_form(conn, touched_teams(raws))
+                if scope is not None:
+                    mark_synced(conn, "fixtures", scope)
+            break
+        except DBAPIError as exc:
+            if attempt == DEADLOCK_RETRIES or getattr(exc.orig, "pgcode", None) not in RETRYABLE_PGCODES:
+                raise
+            time.sleep(0.1 * 2 ** attempt + random.random() * 0.1)
+    if elo:
+        record_elo(raws)
+    return saved
+
+
+async def load_range(start: dt.date, end: dt.date,
+                     concurrency: int = CONCURRENCY) -> Dict[str, Any]:
+    """
+    Dohvaća datume paralelno (najviše  concurrency  istovremeno); svaki
+    datum se upisuje čim stigne, u thread-u, pa se upis preklapa s dohvatom.
+    Elo ide na kraju, jednom serijom svih upisanih dana (sortira je po vremenu).
+    """
+    sem = asyncio.Semaphore(concurrency)
+    dates = _date_range(start, end)
+    started = time.perf_counter()
+    totals: Dict[str, Any] = {"dates": len(dates), "fixtures": 0, "failed_dates": []}
+    saved_raws: List[Dict[str, Any]] = []
+
+    async def one(day: dt.date) -> None:
+        async with sem:
+            payload = await get_fixtures_by_date(day.isoformat())
+        raws = payload.get("response", [])
+        saved = await asyncio.to_thread(save_fixtures, raws, CHUNK_SIZE,
+                                        date_scope(day.isoformat()), False)
+        saved_raws.extend(raws)
+        totals["fixtures"] += saved
+        print(f"  {day.isoformat()}: {saved} fixtura")
+
+    results = await asyncio.gather(*(one(d) for d in dates), return_exceptions=True)
+    for day, result in zip(dates, results):
+        if isinstance(result, BaseException):
+            totals["failed_dates"].append(day.isoformat())
+            print(f"⚠️  {day.isoformat()}: {result}")
+    await asyncio.to_thread(record_elo, saved_raws)
+
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 2)
+    totals["fixtures_per_second"] = round(totals["fixtures"] / elapsed, 1) if elapsed else None
+    return totals
 
 
-def main(argv: list[str]) -> None:
-    target_date = _iso_date(argv[1] if len(argv) > 1 else None)
-    print(f"➡️  Povlačim fixtur(e) za {target_date.isoformat()} …")
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
 
-    raw_fixtures = get_fixtures_by_date(target_date.isoformat())
+    start = _iso_date(argv[1] if len(argv) > 1 else None)
+    end   = _iso_date(argv[2]) if len(argv) > 2 else start
+    if end < start:
+        raise SystemExit("krajnji datum je prije početnog")
+    print(f"➡️  Povlačim fixture za {start.isoformat()} … {end.isoformat()}")
 
-    if not raw_fixtures:
-        print("⚠️  Nema fixtura za taj datum.")
-        return
+    totals = asyncio.run(load_range(start, end))
 
-    rows = [_flatten_fixture(item) for item in raw_fixtures]
-    save_fixtures(rows)
-    print(f"✓ U bazi upisano / ažurirano {len(rows)} fixtura.")
+    print(f"✓ U bazi upisano / ažurirano {totals['fixtures']} fixtura "
+          f"({totals['dates']} dana) za {totals['seconds']} s "
+          f"→ {totals['fixtures_per_second']} fixtura/s")
+    if totals["failed_dates"]:
+        raise SystemExit(f"Neuspjeli datumi: {', '.join(totals['failed_dates'])}")
 
 
 if __name__ == "__main__":
     try:
-        main(sys.argv)
+        # bulk traka: loader ne smije pojesti kvotu interaktivnih rutera
+        with priority(BULK):
+            main(sys.argv)
     except Exception as exc:       # noqa: BLE001
         # Grešku ispiši da bude vidljiva u Render log-ovima
         import traceback
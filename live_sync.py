@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+live_sync.py
+
+▲ Što radi?
+    • dugotrajni worker za vrijeme utakmica: svakih LIVE_SYNC_INTERVAL sekundi
+      povlači SAMO utakmice u toku (/fixtures?live=all – jedan poziv)
+    • svaki red (flatten_fixture iz fixtures_loader.py) se hashira; u Postgres
+      se piše samo red čiji se hash promijenio od zadnjeg upisa.  Novi hash
+      se pamti tek kad upis uspije – neuspjeli tick se ponavlja idući put
+    • utakmica koja ispadne iz live liste (završila / prekinuta) dohvaća se
+      još jednom po ID-u (do 20 u pozivu) da se upiše konačni rezultat
+    • pri startu hash-eve puni iz baze, pa restart ne prepisuje sve ispočetka
+    • pokreće se:   python live_sync.py          (Render Background Worker)
+
+▲ Zahtjevi:  DATABASE_URL, API_FOOTBALL_KEY
+"""
+
+import asyncio
+import hashlib
+import os
+import signal
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+
+from db_init import engine, fixtures as fixtures_t
+from fixtures_loader import flatten_fixture, save_fixtures
+from smartbets_API.api_football import get_fixtures_by_ids, get_live_fixtures
+from smartbets_API.ratelimit import BULK, priority
+
+INTERVAL = float(os.getenv("LIVE_SYNC_INTERVAL", "15"))
+
+# status_short vrijednosti API-Football-a za utakmice u toku
+LIVE_STATUSES = ("1H", "HT", "2H", "ET", "BT", "P", "SUSP", "INT", "LIVE")
+
+_COLUMNS = [c.name for c in fixtures_t.columns]
+
+
+def row_hash(row: Dict[str, Any]) -> str:
+    """Stabilan otisak reda – isti za red iz API-ja i isti red pročitan iz baze."""
+    raw = "\x1f".join(repr(row.get(c)) for c in _COLUMNS)
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _seed_hashes() -> Dict[int, str]:
+    """Hash-evi utakmica koje su u bazi zapisane kao "u toku"."""
+    stmt = select(fixtures_t).where(fixtures_t.c.status_short.in_(LIVE_STATUSES))
+    with engine.connect() as conn:
+        return {r["id"]: row_hash(r) for r in conn.execute(stmt).mappings()}
+
+
+class LiveSync:
+
+    def __init__(self) -> None:
+        self.hashes: Dict[int, str] = {}
+        self.stats = {"ticks": 0, "polled": 0, "written": 0, "unchanged": 0,
+                      "finished": 0, "upstream_calls": 0}
+
+    def _changed(self, raws: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+        """Promijenjeni redovi i njihovi novi hash-evi (self.hashes se ne dira)."""
+        changed = []
+        pending: Dict[int, str] = {}
+        for raw in raws:
+            row = flatten_fixture(raw)
+            h = row_hash(row)
+            if self.hashes.get(row["id"]) != h:
+                pending[row["id"]] = h
+                changed.append(raw)
+        return changed, pending
+
+    async def tick(self) -> Dict[str, int]:
+        live = (await get_live_fixtures()).get("response", [])
+        self.stats["upstream_calls"] += 1
+        live_ids = {r["fixture"]["id"] for r in live}
+
+        # utakmice koje su ispale iz live liste → još jedan dohvat za konačan status
+        gone = [fid for fid in self.hashes if fid not in live_ids]
+        final: List[Dict[str, Any]] = []
+        for i in range(0, len(gone), 20):
+            final.extend((await get_fixtures_by_ids(gone[i:i + 20])).get("response", []))
+            self.stats["upstream_calls"] += 1
+
+        changed, pending = self._changed([*live, *final])
+        if changed:
+            await asyncio.to_thread(save_fixtures, changed)
+        # tek posle uspješnog upisa – inače bi greška zauvijek sakrila promjenu
+        self.hashes.update(pending)
+        for fid in gone:
+            self.hashes.pop(fid, None)
+
+        tick = {"polled": len(live) + len(final), "written": len(changed),
+                "finished": len(gone)}
+        self.stats["ticks"] += 1
+        self.stats["polled"] += tick["polled"]
+        self.stats["written"] += tick["written"]
+        self.stats["unchanged"] += tick["polled"] - tick["written"]
+        self.stats["finished"] += tick["finished"]
+        return tick
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self.hashes = await asyncio.to_thread(_seed_hashes)
+        print(f"➡️  Live sync: {len(self.hashes)} utakmica u toku iz baze, interval {INTERVAL}s")
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                tick = await self.tick()
+                print(f"  live={tick['polled']:>4}  upisano={tick['written']:>4}  "
+                      f"završeno={tick['finished']:>3}")
+            except Exception as exc:       # noqa: BLE001 – jedan loš tick ne gasi worker
+                print(f"⚠️  {exc}")
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, INTERVAL - (time.monotonic() - started)))
+            except asyncio.TimeoutError:
+                pass
+        print(f"✓ Live sync zaustavljen: {self.stats}")
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:      # Windows
+            pass
+    await LiveSync().run(stop)
+
+
+if __name__ == "__main__":
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    with priority(BULK):
+        asyncio.run(_main())
@@ -1,8 +1,10 @@
 # main.py
 from dotenv import load_dotenv
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers.countries      import router as countries_router
@@ -15,6 +17,11 @@ from routers.predictions    import router as predictions_router
 from routers.predictions_api import router as predictions_api_router
 from routers.odds           import router as odds_router
 from routers.today          import router as today_router
+from routers.metrics        import router as metrics_router
+from routers.export         import router as export_router
+from smartbets_API import api_football
+from smartbets_API.ratelimit import QuotaExhausted, UpstreamUnavailable
+import db_async
 
 # 1) Load .env i proveri API ključ
 load_dotenv()
@@ -22,14 +29,28 @@ API_FOOTBALL_KEY = os.getenv("API_FOOTBALL_KEY")
 if not API_FOOTBALL_KEY:
     raise RuntimeError("API_FOOTBALL_KEY nije postavljen u okruženju")
 
-# 2) Inicijalizuj FastAPI
+# 2) Lifespan: jedan deljeni HTTP klijent ka API-Football i jedan async
+#    DB engine (ako je DATABASE_URL postavljen) za sve rutere
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await api_football.init_client()
+    await db_async.init_engine()
+    try:
+        yield
+    finally:
+        await db_async.close_engine()
+        await api_football.close_client()
+
+
+# 3) Inicijalizuj FastAPI
 app = FastAPI(
     title="API-Football Smartbets",
     version="0.2.0",
-    description="FastAPI servis za predikcije i podatke iz API-Football"
+    description="FastAPI servis za predikcije i podatke iz API-Football",
+    lifespan=lifespan,
 )
 
-# 3) CORS (dev: sve; prod: stisni)
+# 4) CORS (dev: sve; prod: stisni)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -38,7 +59,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 4) Registruj sve rutere
+# 5) Registruj sve rutere
 app.include_router(countries_router)
 app.include_router(leagues_router)
 app.include_router(teams_router)
@@ -49,5 +70,20 @@ app.include_router(predictions_router)
 app.include_router(predictions_api_router)
 app.include_router(odds_router)
 
-# 5) Nova `/today` ruta
+# 6) Nova `/today` ruta
 app.include_router(today_router)
+
+# 7) Interni brojači (konekcije ka upstream-u)
+app.include_router(metrics_router)
+
+# 8) Kolonarni izvoz (Parquet / Arrow) za offline analize
+app.include_router(export_router)
+
+# 9) Potrošena kvota / upstream limit → 503 / 429 sa Retry-After, ne 500
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailable) -> JSONResponse:
+    return JSONResponse(
+        status_code=503 if isinstance(exc, QuotaExhausted) else 429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
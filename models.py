@@ -1,5 +1,6 @@
 # models.py
 from __future__ import annotations
+import datetime as dt
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
@@ -97,11 +98,47 @@ class FixtureEvent(BaseModel):
 
 # ── 7. YOUR PREDICTIONS ──────────────────────────────────────────────────────────
 class PredictionResponse(BaseModel):
+    fixture_id: int
+    teams: Optional[FixtureTeams] = None  # None (kao i prediction / odds) kad je error postavljen
+    prediction: Optional[str] = None
+    odds: List[Dict[str, Any]] = []
+    error: Optional[str] = None
+    memo: bool = False                    # rezultat iz memoa (isti ulazi) – nije ponovo računat
+
+class MarketPick(BaseModel):
+    g: float                              # očekivani golovi (domaćin + gost)
+    gg: float
+    ov15: float
+    ov25: float
+    ov35: float
+    choice: float                         # verovatnoća za result, %
+    result: str                           # 1 | 1x | x | 2x | 2
+    pick: str                             # 1 | 1x | x | 2x | 2 | gg | ov15 | ov25 | ov35
+
+class MarketPrediction(BaseModel):
     fixture_id: int
     teams: FixtureTeams
-    prediction: str
-    odds: List[Dict[str, Any]]
-    error: Optional[str]
+    expected_goals: Dict[str, float]      # home, away
+    markets: Dict[str, float]             # 1, x, 2, 1x, 2x, 12, gg, ov15, ov25, ov35 – %
+    prediction: MarketPick
+
+class LeagueSeason(BaseModel):
+    league: int
+    season: int
+
+class BatchPredictionRequest(BaseModel):
+    leagues: List[LeagueSeason] = Field(..., min_length=1)
+    date_from: dt.date
+    date_to: Optional[dt.date] = None           # uključivo; podrazumevano = date_from
+    bookmaker: Optional[int] = None
+    concurrency: int = Field(8, ge=1, le=32)
+
+class BatchPredictionGroup(BaseModel):
+    league: int
+    season: int
+    date: str
+    predictions: List[PredictionResponse]
+    error: Optional[str] = None
 
 # ── 8. API-FOOTBALL PREDICTIONS ─────────────────────────────────────────────────
 class APIPrediction(BaseModel):
@@ -125,6 +162,18 @@ class OddsResponse(BaseModel):
     bookmaker: BookmakerInfo
     bets: List[OddsMappingEntry]
 
+class OddsPricePoint(BaseModel):
+    ts: Optional[str]
+    odd: float
+
+class OddsMovementLine(BaseModel):
+    bookmaker: Dict[str, Any]             # id, name
+    bet: Dict[str, Any]                   # id, name
+    selection: str
+    current: float
+    updated: Optional[str]
+    history: List[OddsPricePoint]         # samo promene cene, najstarija prva
+
 # ── 10. TODAY AGGREGATE ─────────────────────────────────────────────────────────
 class TodayFixtureData(BaseModel):
     fixture: Fixture
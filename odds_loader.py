@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+"""
+odds_loader.py
+
+▲ Što radi?
+    • dohvaća sve pre-match kvote za raspon datuma (/odds?date=…, sve stranice)
+    • svaku kvotu pretvara u red  (fixture, kladionica, oklada, selekcija, kvota)
+    • redove STREAMA u privremenu staging tablicu Postgres COPY naredbom
+      (bez gradnje ogromnog INSERT-a u memoriji)
+    • iz staginga jednom set-based naredbom radi merge u  odds
+      (+ bookmakers / bets koji još ne postoje)
+    • u istoj naredbi u  odds_history  dopisuje samo linije čija se cena
+      promijenila (nova linija = prva točka povijesti)
+    • pokreće se ručno:        python odds_loader.py 2025-07-01 [2025-07-07]
+
+▲ Zahtjevi:
+    • DATABASE_URL (Postgres, psycopg2 driver – COPY ide kroz copy_expert)
+    • fixture moraju već biti u bazi (fixtures_loader.py) – kvote za
+      nepoznate fixture se preskaču zbog FK-a
+"""
+
+import asyncio
+import csv
+import io
+import os
+import sys
+import time
+import datetime as dt
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from db_init import engine
+from db_maintenance import partition_ddl
+from smartbets_API.api_football import get_odds_by_date
+from smartbets_API.ratelimit import BULK, priority
+
+CONCURRENCY = int(os.getenv("LOADER_CONCURRENCY", "4"))
+
+# (fixture_id, bookmaker_id, bookmaker_name, bet_id, bet_name, selection, odd)
+OddsLine = Tuple[int, int, str, int, str, str, float]
+
+STAGE_DDL = """
+CREATE TEMP TABLE odds_stage (
+    fixture_id     integer,
+    bookmaker_id   integer,
+    bookmaker_name varchar(64),
+    bet_id         integer,
+    bet_name       varchar(64),
+    selection      varchar(64),
+    odd            double precision
+) ON COMMIT DROP
+"""
+
+STAGE_COPY = "COPY odds_stage FROM STDIN WITH (FORMAT csv)"
+
+MERGE_SQL = """
+INSERT INTO public.bookmakers (id, name)
+SELECT DISTINCT ON (bookmaker_id) bookmaker_id, bookmaker_name
+  FROM odds_stage
+ON CONFLICT (id) DO NOTHING;
+
+INSERT INTO public.bets (id, name)
+SELECT DISTINCT ON (bet_id) bet_id, bet_name
+  FROM odds_stage
+ON CONFLICT (id) DO NOTHING;
+
+WITH merged AS (
+    INSERT INTO public.odds (fixture_id, bookmaker_id, bet_id, selection, odd, ts_fetched)
+    SELECT DISTINCT ON (s.fixture_id, s.bookmaker_id, s.bet_id, s.selection)
+           s.fixture_id, s.bookmaker_id, s.bet_id, s.selection, s.odd, %(ts)s
+      FROM odds_stage s
+      JOIN public.fixtures f ON f.id = s.fixture_id
+     ORDER BY s.fixture_id, s.bookmaker_id, s.bet_id, s.selection
+    ON CONFLICT ON CONSTRAINT uq_odds_unique_line
+    DO UPDATE SET odd = EXCLUDED.odd, ts_fetched = EXCLUDED.ts_fetched
+    RETURNING id, odd
+)
+-- glavni upit vidi  odds  PRE upsert-a iz CTE-a → o.odd je prethodna cena
+INSERT INTO public.odds_history (line_id, ts, odd)
+SELECT m.id, %(ts)s, m.odd
+  FROM merged m
+  LEFT JOIN public.odds o ON o.id = m.id
+ WHERE o.odd IS DISTINCT FROM m.odd;
+"""
+
+
+def flatten_odds(items: Iterable[Dict[str, Any]]) -> Iterator[OddsLine]:
+    """Ugniježđeni odgovor (fixture → bookmakers → bets → values) u ravne redove."""
+    for item in items:
+        fixture_id = (item.get("fixture") or {}).get("id")
+        if fixture_id is None:
+            continue
+        for bm in item.get("bookmakers", []):
+            for bet in bm.get("bets", []):
+                for val in bet.get("values", []):
+                    try:
+                        odd = float(val.get("odd"))
+                    except (TypeError, ValueError):
+                        continue
+                    yield (fixture_id, bm["id"], (bm.get("name") or "")[:64],
+                           bet["id"], (bet.get("name") or "")[:64],
+                           str(val.get("value"))[:64], odd)
+
+
+class _CsvStream(io.RawIOBase):
+    """
+    File-like objekt za copy_expert koji CSV generira u hodu iz iteratora
+    redova – u memoriji je uvijek samo jedan blok, bez obzira na broj redova.
+    """
+
+    def __init__(self, lines: Iterable[OddsLine]):
+        self._lines = iter(lines)
+        self._buf = b""
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int) -> None:
+        for line in self._lines:
+            self._writer.writerow(line)
+            self.rows += 1
+            if self._text.tell() >= size:
+                break
+        self._buf += self._text.getvalue().encode()
+        self._text.seek(0)
+        self._text.truncate()
+
+    def readinto(self, b: Any) -> int:
+        if len(self._buf) < len(b):
+            self._fill(len(b))
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def copy_merge_odds(lines: Iterable[OddsLine], ts: Optional[dt.datetime] = None) -> int:
+    """
+    COPY u staging + jedan merge u  odds / odds_history, sve u jednoj transakciji.
+    Vraća broj redova poslanih u staging.
+    """
+    ts = ts or dt.datetime.utcnow()
+    stream = _CsvStream(lines)
+    partition, partition_sql = partition_ddl("odds_history", ts)
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cur:
+            # particija mjeseca upisa – inače je pravi db_maintenance.py unaprijed
+            cur.execute("SELECT to_regclass(%s)", (f"public.{partition}",))
+            if cur.fetchone()[0] is None:
+                cur.execute(partition_sql)
+            cur.execute(STAGE_DDL)
+            cur.copy_expert(STAGE_COPY, stream, size=64 * 1024)
+            cur.execute(MERGE_SQL, {"ts": ts})
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return stream.rows
+
+
+async def fetch_odds_day(day: dt.date, sem: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    """Sve stranice /odds?date=… – prva stranica otkriva ukupan broj, ostale idu paralelno."""
+    async with sem:
+        first = await get_odds_by_date(day.isoformat(), 1)
+    total = (first.get("paging") or {}).get("total", 1) or 1
+
+    async def page(n: int) -> List[Dict[str, Any]]:
+        async with sem:
+            return (await get_odds_by_date(day.isoformat(), n)).get("response", [])
+
+    rest = await asyncio.gather(*(page(n) for n in range(2, total + 1)))
+    items = list(first.get("response", []))
+    for chunk in rest:
+        items.extend(chunk)
+    return items
+
+
+async def load_range(start: dt.date, end: dt.date,
+                     concurrency: int = CONCURRENCY) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    totals: Dict[str, Any] = {"lines": 0, "dates": 0}
+
+    day = start
+    while day <= end:
+        items = await fetch_odds_day(day, sem)
+        lines = await asyncio.to_thread(copy_merge_odds, flatten_odds(items))
+        totals["lines"] += lines
+        totals["dates"] += 1
+        print(f"  {day.isoformat()}: {len(items)} fixtura, {lines} kvota")
+        day += dt.timedelta(days=1)
+
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 2)
+    totals["lines_per_second"] = round(totals["lines"] / elapsed, 1) if elapsed else None
+    return totals
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+
+    start = dt.date.fromisoformat(argv[1]) if len(argv) > 1 else dt.datetime.utcnow().date()
+    end   = dt.date.fromisoformat(argv[2]) if len(argv) > 2 else start
+    print(f"➡️  Povlačim kvote za {start.isoformat()} … {end.isoformat()}")
+
+    totals = asyncio.run(load_range(start, end))
+    print(f"✓ {totals['lines']} kvota ({totals['dates']} dana) za {totals['seconds']} s "
+          f"→ {totals['lines_per_second']} kvota/s")
+
+
+if __name__ == "__main__":
+    try:
+        with priority(BULK):
+            main(sys.argv)
+    except Exception:              # noqa: BLE001
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
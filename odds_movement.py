@@ -0,0 +1,77 @@
+"""
+odds_movement.py
+────────────────
+Kretanje kvota jednog meča iz  odds_history  (vidi odds_loader.py).
+
+• linije meča dolaze iz  odds  (uq_odds_unique_line počinje sa fixture_id),
+  istorija iz  odds_history  po (line_id, ts) – dva indeksirana upita
+• linija koja još nema istoriju (učitana pre odds_history) vraća samo
+  trenutnu cenu iz  odds
+• upit nad istorijom je ograničen po  ts  (particioni ključ): od početka
+  meča − ODDS_HISTORY_DAYS do poslednjeg ts_fetched linija – Postgres
+  čita samo particije tog opsega
+• ruter je poziva nad deljenim async engine-om:
+  await conn.run_sync(movement, fixture, bet, bookmaker)
+"""
+
+import datetime as dt
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from db_init import bets, bookmakers, fixtures, odds, odds_history
+
+# koliko dana pre utakmice kladionice objavljuju kvote (donja granica istorije)
+HISTORY_DAYS = int(os.getenv("ODDS_HISTORY_DAYS", "21"))
+
+
+def movement(conn: Connection, fixture: int, bet: Optional[int] = None,
+             bookmaker: Optional[int] = None) -> List[Dict[str, Any]]:
+    lines_stmt = (
+        select(odds.c.id, odds.c.bookmaker_id, bookmakers.c.name.label("bookmaker_name"),
+               odds.c.bet_id, bets.c.name.label("bet_name"), odds.c.selection,
+               odds.c.odd, odds.c.ts_fetched)
+        .select_from(odds
+                     .outerjoin(bookmakers, bookmakers.c.id == odds.c.bookmaker_id)
+                     .outerjoin(bets, bets.c.id == odds.c.bet_id))
+        .where(odds.c.fixture_id == fixture)
+        .order_by(odds.c.bet_id, odds.c.bookmaker_id, odds.c.id)
+    )
+    if bet is not None:
+        lines_stmt = lines_stmt.where(odds.c.bet_id == bet)
+    if bookmaker is not None:
+        lines_stmt = lines_stmt.where(odds.c.bookmaker_id == bookmaker)
+
+    lines = conn.execute(lines_stmt).all()
+    if not lines:
+        return []
+
+    # istorija se piše u istom merge-u koji postavlja ts_fetched → nikad nije novija od njega
+    history_stmt = (
+        select(odds_history.c.line_id, odds_history.c.ts, odds_history.c.odd)
+        .where(odds_history.c.line_id.in_([line.id for line in lines]))
+        .order_by(odds_history.c.line_id, odds_history.c.ts)
+    )
+    fetched = [line.ts_fetched for line in lines if line.ts_fetched is not None]
+    if fetched:
+        history_stmt = history_stmt.where(odds_history.c.ts <= max(fetched))
+    kickoff = conn.execute(select(fixtures.c.date_utc).where(fixtures.c.id == fixture)).scalar()
+    if kickoff is not None:
+        history_stmt = history_stmt.where(odds_history.c.ts >= kickoff - dt.timedelta(days=HISTORY_DAYS))
+
+    history: Dict[int, List[Dict[str, Any]]] = {}
+    for h in conn.execute(history_stmt):
+        history.setdefault(h.line_id, []).append(
+            {"ts": h.ts.isoformat(), "odd": round(h.odd, 3)})
+
+    return [{
+        "bookmaker": {"id": line.bookmaker_id, "name": line.bookmaker_name},
+        "bet":       {"id": line.bet_id, "name": line.bet_name},
+        "selection": line.selection,
+        "current":   line.odd,
+        "updated":   line.ts_fetched.isoformat() if line.ts_fetched else None,
+        "history":   history.get(line.id) or [
+            {"ts": line.ts_fetched.isoformat() if line.ts_fetched else None, "odd": line.odd}],
+    } for line in lines]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+poisson_model.py
+────────────────
+Poisson model golova (smartbets_API/poisson.py) nad podacima iz Postgresa.
+
+• fit po (liga, sezona) iz završenih utakmica te i POISSON_SEASONS_BACK
+  prethodnih sezona; starije utakmice teže manje (POISSON_HALF_LIFE_DAYS)
+• golovi su rezultat posle 90 minuta (ft_home / ft_away; home/away_goals
+  samo gde ft nema) – produžeci ne ulaze u snagu napada i odbrane
+• fitovan model se drži u TTLCache-u POISSON_REFIT_SECONDS (najviše
+  POISSON_MAX_MODELS liga × sezona) – svi zahtevi za isti dan i ligu dele
+  jedan fit
+• predict_markets(): sve utakmice dana jednim NumPy prolazom → 1X2,
+  dvostruka šansa, GG, over 1.5 / 2.5 / 3.5 i polja starog  Prediction-a
+• ruta  GET /predictions/markets  (routers/predictions.py)
+
+    python poisson_model.py 39 2024 [2024-11-09]
+"""
+
+import datetime as dt
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from db_init import engine, fixtures as fixtures_t
+from read_through import FIXTURES_SELECT, fixture_item
+from smartbets_API import poisson
+from smartbets_API.cache import TTLCache
+from team_form import FINISHED
+
+SEASONS_BACK   = int(os.getenv("POISSON_SEASONS_BACK", "1"))
+HALF_LIFE_DAYS = float(os.getenv("POISSON_HALF_LIFE_DAYS", "180"))
+REFIT_SECONDS  = int(os.getenv("POISSON_REFIT_SECONDS", "3600"))
+MAX_MODELS     = int(os.getenv("POISSON_MAX_MODELS", "500"))
+
+HISTORY_SQL = text("""
+SELECT home_id, away_id, COALESCE(ft_home, home_goals), COALESCE(ft_away, away_goals), timestamp
+  FROM public.fixtures
+ WHERE league_id = :league
+   AND season BETWEEN :first AND :season
+   AND status_short = ANY(:finished)
+   AND COALESCE(ft_home, home_goals) IS NOT NULL
+   AND COALESCE(ft_away, away_goals) IS NOT NULL
+   AND home_id IS NOT NULL AND away_id IS NOT NULL
+""")
+
+_models = TTLCache(max_entries=MAX_MODELS)     # "liga:sezona" → PoissonModel
+
+
+def load_history(conn: Connection, league: int, season: int) -> np.ndarray:
+    """(n, 5): home_id, away_id, golovi domaćina i gosta posle 90 minuta, timestamp."""
+    rows = conn.execute(HISTORY_SQL, {"league": league, "season": season,
+                                      "first": season - SEASONS_BACK,
+                                      "finished": list(FINISHED)}).all()
+    return np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+
+def fit_model(conn: Connection, league: int, season: int) -> poisson.PoissonModel:
+    h = load_history(conn, league, season)
+    weights = poisson.decay_weights(h[:, 4], time.time(), HALF_LIFE_DAYS)
+    return poisson.fit(h[:, 0].astype(np.int64), h[:, 1].astype(np.int64), h[:, 2], h[:, 3], weights)
+
+
+def get_model(conn: Connection, league: int, season: int) -> poisson.PoissonModel:
+    """Fit iz keša dok ne istekne REFIT_SECONDS; sinhrono (async: conn.run_sync(get_model, …))."""
+    key = f"{league}:{season}"
+    cached = _models.get(key)
+    if cached is not None:
+        return cached
+    model = fit_model(conn, league, season)
+    _models.set(key, model, REFIT_SECONDS,
+                model.teams.nbytes + model.attack.nbytes + model.defence.nbytes
+                + model.games.nbytes)
+    return model
+
+
+def market_probabilities(model: poisson.PoissonModel, fixtures: Sequence[Dict[str, Any]]
+                         ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Fixtures u upstream obliku → (λ domaćina, λ gosta, verovatnoće tržišta 0–1)."""
+    teams = [f.get("teams", {}) for f in fixtures]
+    home = np.array([(t.get("home") or {}).get("id") or -1 for t in teams], dtype=np.int64)
+    away = np.array([(t.get("away") or {}).get("id") or -1 for t in teams], dtype=np.int64)
+    lam, mu = model.expected_goals(home, away)
+    return lam, mu, poisson.markets(poisson.score_matrices(lam, mu))
+
+
+def predict_markets(model: poisson.PoissonModel,
+                    fixtures: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fixtures u upstream obliku → jedna stavka po utakmici, istim redom."""
+    if not fixtures:
+        return []
+    teams = [f.get("teams", {}) for f in fixtures]
+    lam, mu, probs = market_probabilities(model, fixtures)
+    legacy = poisson.legacy(lam, mu, probs)
+    pct = {k: np.round(v * 100, 2) for k, v in probs.items()}
+
+    return [
+        {
+            "fixture_id": f.get("fixture", {}).get("id"),
+            "teams": {"home": t.get("home"), "away": t.get("away")},
+            "expected_goals": {"home": round(float(lam[i]), 2), "away": round(float(mu[i]), 2)},
+            "markets": {k: float(pct[k][i]) for k in poisson.MARKETS},
+            "prediction": legacy[i],
+        }
+        for i, (f, t) in enumerate(zip(fixtures, teams))
+    ]
+
+
+def main(argv: List[str]) -> None:
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    if len(argv) < 3:
+        raise SystemExit("upotreba: python poisson_model.py <liga> <sezona> [datum]")
+    league, season = int(argv[1]), int(argv[2])
+    date: Optional[str] = argv[3] if len(argv) > 3 else None
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        model = fit_model(conn, league, season)
+    print(f"✓ fit: {model.fixtures} utakmica, {len(model.teams)} timova, "
+          f"domaći teren ×{model.home_adv:.3f}, {time.perf_counter() - started:.3f} s")
+    if date is None:
+        return
+
+    day = dt.datetime.fromisoformat(date)
+    with engine.connect() as conn:
+        items = [fixture_item(r) for r in conn.execute(
+            FIXTURES_SELECT
+            .where(fixtures_t.c.date_utc >= day, fixtures_t.c.date_utc < day + dt.timedelta(days=1))
+            .where(fixtures_t.c.league_id == league, fixtures_t.c.season == season)
+            .order_by(fixtures_t.c.timestamp, fixtures_t.c.id)
+        )]
+    started = time.perf_counter()
+    for p in predict_markets(model, items):
+        m, pr = p["markets"], p["prediction"]
+        print(f"  {p['teams']['home']['name']} – {p['teams']['away']['name']}: "
+              f"1 {m['1']:.1f}  X {m['x']:.1f}  2 {m['2']:.1f}  GG {m['gg']:.1f}  "
+              f"O2.5 {m['ov25']:.1f}  → {pr['result']} / {pr['pick']}")
+    print(f"• {len(items)} utakmica za {time.perf_counter() - started:.4f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
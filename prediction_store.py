@@ -0,0 +1,87 @@
+"""
+prediction_store.py
+───────────────────
+• čuva izlaz Predictor-a u tabeli  predictions  (db_init.py)
+• ponovljeni upiti za iste utakmice služe se iz baze dok god se ulazi
+  modela (inputs_hash – poeni, Elo i kvote) i verzija modela nisu promenili
+• drugi nivo iza memoa u procesu (smartbets_API/predictor.py): deli
+  rezultate između worker-a i preživljava restart
+• upiti idu kroz deljeni async engine (db_async.run_sync)
+"""
+
+import datetime as dt
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+
+from db_async import run_sync
+from db_init import engine, fixtures as fixtures_t, predictions as predictions_t
+from smartbets_API.predictor import MODEL_VERSION
+
+
+class PredictionStore:
+
+    def __init__(self, model: str = "predictor", version: str = MODEL_VERSION):
+        self.model = model
+        self.version = version
+
+    async def load(self, hashes: Mapping[int, str]) -> Dict[int, Dict[str, Any]]:
+        if not hashes:
+            return {}
+        return await run_sync(self._load, dict(hashes))
+
+    async def save(self, rows: Sequence[Tuple[int, str, Dict[str, Any]]]) -> None:
+        if rows:
+            await run_sync(self._save, list(rows), begin=True)
+
+    def _load(self, conn: Connection, hashes: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        stmt = (
+            select(predictions_t.c.fixture_id, predictions_t.c.inputs_hash,
+                   predictions_t.c.payload)
+            .where(predictions_t.c.fixture_id.in_(list(hashes)))
+            .where(predictions_t.c.model == self.model)
+            .where(predictions_t.c.version == self.version)
+        )
+        rows = conn.execute(stmt).all()
+
+        return {
+            r.fixture_id: r.payload
+            for r in rows
+            if r.inputs_hash == hashes[r.fixture_id]
+        }
+
+    def _save(self, conn: Connection, rows: List[Tuple[int, str, Dict[str, Any]]]) -> None:
+        now = dt.datetime.utcnow()
+        ids = [fid for fid, _, _ in rows]
+        # FK na fixtures: upisujemo samo utakmice koje je loader već uneo
+        known = set(conn.execute(
+            select(fixtures_t.c.id).where(fixtures_t.c.id.in_(ids))
+        ).scalars())
+        values = [
+            {
+                "fixture_id":   fid,
+                "model":        self.model,
+                "version":      self.version,
+                "inputs_hash":  h,
+                "payload":      payload,
+                "generated_at": now,
+            }
+            for fid, h, payload in rows
+            if fid in known
+        ]
+        if not values:
+            return
+        stmt = pg_insert(predictions_t).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["fixture_id", "model"],
+            set_={c: stmt.excluded[c]
+                  for c in ("version", "inputs_hash", "payload", "generated_at")},
+        )
+        conn.execute(stmt)
+
+
+def get_store() -> Optional[PredictionStore]:
+    """None kad baza nije konfigurisana (DATABASE_URL) – predikcije se tada samo računaju."""
+    return PredictionStore() if engine is not None else None
@@ -0,0 +1,496 @@
+"""
+read_through.py
+───────────────
+Read-through sloj za rutere  fixtures / standings / teams / leagues.
+
+• ako je opseg upita (sync_state) dovoljno svež za taj tip podatka,
+  odgovor se sklapa iz Postgresa jednim indeksiranim upitom
+• inače (miss, zastarelo, prazno) → API-Football, a rezultat se upisuje
+  nazad u tabele iz db_init.py i opseg se označava kao svež
+• odgovor ima isti oblik kao upstream ({"response": [...]}), pa ruteri
+  samo menjaju funkciju koju pozivaju
+• upiti idu kroz deljeni async engine (db_async.run_sync), ne kroz thread pool
+• bez DATABASE_URL (engine je None) sve ide direktno na upstream
+"""
+
+import datetime as dt
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException
+
+from db_async import run_sync
+from db_init import (
+    engine, countries, fixtures, league_teams, leagues, seasons, standings,
+    sync_state, teams, venues,
+)
+from fixtures_loader import date_scope, mark_synced, upsert_fixtures
+from team_form import FINISHED, refresh_team_form, touched_teams
+from smartbets_API.api_football import (
+    get_fixtures_by_date, get_head2head_teams, get_leagues, get_standings, get_teams,
+)
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# Koliko dugo (s) je opseg u bazi dovoljno svež, po tipu podatka
+FRESHNESS = {
+    "leagues":       int(os.getenv("FRESH_LEAGUES", str(24 * HOUR))),
+    "teams":         int(os.getenv("FRESH_TEAMS", str(24 * HOUR))),
+    "standings":     int(os.getenv("FRESH_STANDINGS", "600")),
+    "fixtures":      int(os.getenv("FRESH_FIXTURES", "120")),           # danas i budući dani
+    "fixtures_past": int(os.getenv("FRESH_FIXTURES_PAST", str(24 * HOUR))),
+    # par se povlači sa upstream-a samo prvi put; nove mečeve donose loader i live_sync
+    "h2h":           int(os.getenv("FRESH_H2H", str(365 * 24 * HOUR))),
+}
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+Rows = List[Dict[str, Any]]
+
+
+def stats() -> Dict[str, Any]:
+    return {"enabled": engine is not None, "freshness": FRESHNESS, "entities": _stats}
+
+
+def _count(entity: str, outcome: str) -> None:
+    _stats.setdefault(entity, {"db": 0, "upstream": 0, "db_errors": 0})[outcome] += 1
+
+
+def _s(value: Optional[str], size: int) -> Optional[str]:
+    return value[:size] if isinstance(value, str) else value
+
+
+def _read_fresh(conn: Connection, entity: str, scopes: Sequence[str], ttl: int,
+                read: Callable[[Connection], Rows]) -> Optional[Rows]:
+    fetched_at = conn.execute(
+        select(func.max(sync_state.c.fetched_at))
+        .where(sync_state.c.entity == entity)
+        .where(sync_state.c.scope.in_(list(scopes)))
+    ).scalar()
+    if fetched_at is None or (dt.datetime.utcnow() - fetched_at).total_seconds() > ttl:
+        return None
+    return read(conn)
+
+
+def _write_back(conn: Connection, entity: str, scope: str, items: Rows,
+                write: Callable[[Connection, Rows], bool]) -> None:
+    # write vraća False kad baza ne može verno da ponovi odgovor → opseg ostaje "star"
+    if write(conn, items):
+        mark_synced(conn, entity, scope)
+
+
+async def _read_through(
+    entity: str,
+    scopes: Sequence[str],
+    ttl: int,
+    read: Callable[[Connection], Rows],
+    fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    write: Callable[[Connection, Rows], bool],
+    allow_empty: bool = False,
+) -> Dict[str, Any]:
+    """
+    scopes[0] je tačan opseg upita; ostali su širi opsezi koji ga pokrivaju.
+    allow_empty: prazan rezultat iz svežeg opsega je validan odgovor (npr. par
+    timova koji se nikad nisu sreli), a ne znak da baza nije popunjena.
+    """
+    if engine is None:
+        return await fetch()
+
+    try:
+        rows = await run_sync(_read_fresh, entity, scopes, ttl, read)
+    except (SQLAlchemyError, HTTPException) as exc:      # HTTPException: pool pun → upstream
+        logger.warning(f"Read-through čitanje ({entity}) nije uspelo: {exc}")
+        _count(entity, "db_errors")
+        rows = None
+    if rows is not None and (rows or allow_empty):   # inače se prazan rezultat ne veruje
+        _count(entity, "db")
+        return {"results": len(rows), "response": rows}
+
+    _count(entity, "upstream")
+    payload = await fetch()
+    items = payload.get("response", [])
+    if (items or allow_empty) and not payload.get("errors"):
+        try:
+            await run_sync(_write_back, entity, scopes[0], items, write, begin=True)
+        except (SQLAlchemyError, HTTPException) as exc:
+            logger.warning(f"Read-through upis ({entity}) nije uspeo: {exc}")
+            _count(entity, "db_errors")
+    return payload
+
+
+# ─────────────────────────────── FIXTURES ──────────────────────────────────────
+_home, _away = teams.alias("home_team"), teams.alias("away_team")
+
+FIXTURES_SELECT = (
+    select(
+        fixtures,
+        leagues.c.name.label("league_name"), leagues.c.logo.label("league_logo"),
+        countries.c.name.label("country_name"), countries.c.flag.label("country_flag"),
+        _home.c.name.label("home_name"), _home.c.logo.label("home_logo"),
+        _away.c.name.label("away_name"), _away.c.logo.label("away_logo"),
+        venues.c.name.label("venue_name"), venues.c.city.label("venue_city"),
+    )
+    .select_from(
+        fixtures
+        .outerjoin(leagues, leagues.c.id == fixtures.c.league_id)
+        .outerjoin(countries, countries.c.code == leagues.c.country_code)
+        .outerjoin(_home, _home.c.id == fixtures.c.home_id)
+        .outerjoin(_away, _away.c.id == fixtures.c.away_id)
+        .outerjoin(venues, venues.c.id == fixtures.c.venue_id)
+    )
+)
+
+
+def _winner(r: Any, side: str) -> Optional[bool]:
+    if r.status_short not in FINISHED:
+        return None
+    if r.status_short == "PEN":
+        h, a = r.pen_home, r.pen_away
+    else:
+        h, a = r.home_goals, r.away_goals
+    if h is None or a is None or h == a:
+        return None
+    return (h > a) if side == "home" else (a > h)
+
+
+def fixture_item(r: Any) -> Dict[str, Any]:
+    """Red iz FIXTURES_SELECT → element /fixtures odgovora (upstream oblik)."""
+    return {
+        "fixture": {
+            "id":        r.id,
+            "referee":   r.referee,
+            "timezone":  "UTC",
+            "date":      r.date_utc.isoformat() + "+00:00" if r.date_utc else None,
+            "timestamp": r.timestamp,
+            "venue":     {"id": r.venue_id, "name": r.venue_name, "city": r.venue_city},
+            "status":    {"long": r.status_long, "short": r.status_short, "elapsed": r.elapsed},
+        },
+        "league": {
+            "id": r.league_id, "name": r.league_name, "country": r.country_name,
+            "logo": r.league_logo, "flag": r.country_flag,
+            "season": r.season, "round": r.round,
+        },
+        "teams": {
+            "home": {"id": r.home_id, "name": r.home_name, "logo": r.home_logo,
+                     "winner": _winner(r, "home")},
+            "away": {"id": r.away_id, "name": r.away_name, "logo": r.away_logo,
+                     "winner": _winner(r, "away")},
+        },
+        "goals": {"home": r.home_goals, "away": r.away_goals},
+        "score": {
+            "halftime":  {"home": r.ht_home,  "away": r.ht_away},
+            "fulltime":  {"home": r.ft_home,  "away": r.ft_away},
+            "extratime": {"home": r.et_home,  "away": r.et_away},
+            "penalty":   {"home": r.pen_home, "away": r.pen_away},
+        },
+    }
+
+
+async def fixtures_by_date(date: str, league: Optional[int] = None,
+                           season: Optional[int] = None) -> Dict[str, Any]:
+    try:
+        day = dt.date.fromisoformat(date)
+    except ValueError:                          # neka upstream vrati svoju poruku o grešci
+        return await get_fixtures_by_date(date, league, season)
+    start = dt.datetime.combine(day, dt.time())
+    past = day < dt.datetime.utcnow().date() - dt.timedelta(days=1)
+
+    def read(conn: Connection) -> Rows:
+        stmt = FIXTURES_SELECT.where(and_(fixtures.c.date_utc >= start,
+                                          fixtures.c.date_utc < start + dt.timedelta(days=1)))
+        if league is not None:
+            stmt = stmt.where(fixtures.c.league_id == league)
+        if season is not None:
+            stmt = stmt.where(fixtures.c.season == season)
+        return [fixture_item(r) for r in conn.execute(stmt.order_by(fixtures.c.timestamp, fixtures.c.id))]
+
+    def write(conn: Connection, items: Rows) -> bool:
+        upsert_fixtures(conn, items)
+        return True
+
+    # ceo dan (loader ga tako beleži) pokriva i upit filtriran po ligi / sezoni
+    scopes = [date_scope(date, league, season), date_scope(date)]
+    return await _read_through(
+        "fixtures", scopes, FRESHNESS["fixtures_past" if past else "fixtures"],
+        read, lambda: get_fixtures_by_date(date, league, season), write,
+    )
+
+
+# ─────────────────────────────── HEAD-TO-HEAD ──────────────────────────────────
+def _h2h_filter(items: Rows, season: Optional[int], last: Optional[int]) -> Rows:
+    """Isti filter nad odgovorom iz baze i nad punom istorijom sa upstream-a."""
+    if season is not None:
+        items = [i for i in items if (i.get("league") or {}).get("season") == season]
+    items = sorted(items, key=lambda i: (i.get("fixture") or {}).get("timestamp") or 0, reverse=True)
+    return items[:last] if last else items
+
+
+async def head2head(team1: int, team2: int, season: Optional[int] = None,
+                    last: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Međusobni mečevi dva tima iz fixtures – jedan range scan po idx_fixtures_pair.
+    Upstream (h2h=a-b, cela istorija) samo za par koji još nije povučen.
+    """
+    low, high = sorted((team1, team2))
+
+    def read(conn: Connection) -> Rows:
+        stmt = (
+            FIXTURES_SELECT
+            .where(func.least(fixtures.c.home_id, fixtures.c.away_id) == low)
+            .where(func.greatest(fixtures.c.home_id, fixtures.c.away_id) == high)
+        )
+        if season is not None:
+            stmt = stmt.where(fixtures.c.season == season)
+        stmt = stmt.order_by(fixtures.c.date_utc.desc())
+        if last:
+            stmt = stmt.limit(last)
+        return [fixture_item(r) for r in conn.execute(stmt)]
+
+    def write(conn: Connection, items: Rows) -> bool:
+        upsert_fixtures(conn, items)
+        refresh_team_form(conn, touched_teams(items))
+        return True
+
+    payload = await _read_through(
+        "h2h", [f"pair={low}-{high}"], FRESHNESS["h2h"],
+        read, lambda: get_head2head_teams(low, high), write, allow_empty=True,
+    )
+    items = _h2h_filter(payload.get("response", []), season, last)
+    return {**payload, "results": len(items), "response": items}
+
+
+# ─────────────────────────────── STANDINGS ─────────────────────────────────────
+def _league_ref(conn: Connection, league_id: int, name: Optional[str] = None,
+                logo: Optional[str] = None) -> None:
+    conn.execute(pg_insert(leagues).values(id=league_id, name=_s(name, 64) or "", logo=_s(logo, 256))
+                 .on_conflict_do_nothing(index_elements=["id"]))
+
+
+def _team_refs(conn: Connection, team_rows: Rows) -> None:
+    if team_rows:
+        conn.execute(pg_insert(teams).values(team_rows).on_conflict_do_nothing(index_elements=["id"]))
+
+
+async def standings_table(league: int, season: int) -> Dict[str, Any]:
+
+    def read(conn: Connection) -> Rows:
+        info = conn.execute(
+            select(leagues.c.name, leagues.c.logo, countries.c.name.label("country"), countries.c.flag)
+            .select_from(leagues.outerjoin(countries, countries.c.code == leagues.c.country_code))
+            .where(leagues.c.id == league)
+        ).first()
+        rows = conn.execute(
+            select(standings, teams.c.name.label("team_name"), teams.c.logo.label("team_logo"))
+            .select_from(standings.join(teams, teams.c.id == standings.c.team_id))
+            .where(standings.c.league_id == league, standings.c.season == season)
+            .order_by(standings.c.group, standings.c.rank)
+        ).all()
+        if info is None or not rows:
+            return []
+        groups: "OrderedDict[Optional[str], Rows]" = OrderedDict()
+        for r in rows:
+            groups.setdefault(r.group, []).append({
+                "rank": r.rank,
+                "team": {"id": r.team_id, "name": r.team_name, "logo": r.team_logo},
+                "points": r.points, "goalsDiff": r.goals_diff, "group": r.group, "form": r.form,
+                "status": None, "description": None,
+                "all": {"played": r.played, "win": r.wins, "draw": r.draws, "lose": r.losses,
+                        "goals": {"for": r.goals_for, "against": r.goals_ag}},
+            })
+        return [{"league": {
+            "id": league, "name": info.name, "country": info.country, "logo": info.logo,
+            "flag": info.flag, "season": season, "standings": list(groups.values()),
+        }}]
+
+    def write(conn: Connection, items: Rows) -> bool:
+        values: Dict[int, Dict[str, Any]] = {}
+        team_rows: Dict[int, Dict[str, Any]] = {}
+        complete = True
+        for item in items:
+            lg = item.get("league") or {}
+            _league_ref(conn, league, lg.get("name"), lg.get("logo"))
+            for group in lg.get("standings", []):
+                for e in group:
+                    team = e.get("team") or {}
+                    if team.get("id") is None:
+                        continue
+                    team_rows[team["id"]] = {"id": team["id"], "name": _s(team.get("name"), 64) or "",
+                                             "logo": _s(team.get("logo"), 256)}
+                    if team["id"] in values:
+                        complete = False        # tim u više tabela (npr. konferencije)
+                        continue
+                    stat = e.get("all") or {}
+                    goals = stat.get("goals") or {}
+                    values[team["id"]] = {
+                        "league_id": league, "season": season, "team_id": team["id"],
+                        "rank": e.get("rank"), "group": _s(e.get("group"), 64),
+                        "points": e.get("points"), "played": stat.get("played"),
+                        "wins": stat.get("win"), "draws": stat.get("draw"), "losses": stat.get("lose"),
+                        "goals_for": goals.get("for"), "goals_ag": goals.get("against"),
+                        "goals_diff": e.get("goalsDiff"), "form": _s(e.get("form"), 32),
+                    }
+        _team_refs(conn, list(team_rows.values()))
+        conn.execute(delete(standings).where(standings.c.league_id == league,
+                                             standings.c.season == season))
+        if values:
+            conn.execute(pg_insert(standings).values(list(values.values())))
+        return complete
+
+    return await _read_through(
+        "standings", [f"league={league};season={season}"], FRESHNESS["standings"],
+        read, lambda: get_standings(league, season), write,
+    )
+
+
+# ─────────────────────────────── TEAMS ─────────────────────────────────────────
+async def league_teams_list(league: int, season: int) -> Dict[str, Any]:
+
+    def read(conn: Connection) -> Rows:
+        rows = conn.execute(
+            select(teams, countries.c.name.label("country"),
+                   venues.c.id.label("v_id"), venues.c.name.label("v_name"),
+                   venues.c.address.label("v_address"), venues.c.city.label("v_city"),
+                   venues.c.capacity.label("v_capacity"), venues.c.surface.label("v_surface"),
+                   venues.c.image.label("v_image"))
+            .select_from(
+                league_teams
+                .join(teams, teams.c.id == league_teams.c.team_id)
+                .outerjoin(countries, countries.c.code == teams.c.country_code)
+                .outerjoin(venues, venues.c.id == teams.c.venue_id)
+            )
+            .where(league_teams.c.league_id == league, league_teams.c.season == season)
+            .order_by(teams.c.name)
+        ).all()
+        return [{
+            "team": {"id": r.id, "name": r.name, "code": None, "country": r.country,
+                     "founded": r.founded, "national": None, "logo": r.logo},
+            "venue": {"id": r.v_id, "name": r.v_name, "address": r.v_address, "city": r.v_city,
+                      "capacity": r.v_capacity, "surface": r.v_surface, "image": r.v_image},
+        } for r in rows]
+
+    def write(conn: Connection, items: Rows) -> bool:
+        venue_rows: Dict[int, Dict[str, Any]] = {}
+        team_rows: Dict[int, Dict[str, Any]] = {}
+        for item in items:
+            v = item.get("venue") or {}
+            t = item.get("team") or {}
+            if v.get("id") is not None:
+                venue_rows[v["id"]] = {
+                    "id": v["id"], "name": _s(v.get("name"), 128), "city": _s(v.get("city"), 64),
+                    "address": _s(v.get("address"), 128), "capacity": v.get("capacity"),
+                    "surface": _s(v.get("surface"), 32), "image": _s(v.get("image"), 256),
+                }
+            if t.get("id") is not None:
+                team_rows[t["id"]] = {
+                    "id": t["id"], "name": _s(t.get("name"), 64) or "", "founded": t.get("founded"),
+                    "logo": _s(t.get("logo"), 256), "venue_id": v.get("id"),
+                }
+        if venue_rows:
+            stmt = pg_insert(venues).values(list(venue_rows.values()))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=["id"], set_={c: stmt.excluded[c] for c in
+                                             ("name", "city", "address", "capacity", "surface", "image")}))
+        if team_rows:
+            stmt = pg_insert(teams).values(list(team_rows.values()))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=["id"], set_={c: stmt.excluded[c] for c in
+                                             ("name", "founded", "logo", "venue_id")}))
+        _league_ref(conn, league)
+        conn.execute(delete(league_teams).where(league_teams.c.league_id == league,
+                                                league_teams.c.season == season))
+        if team_rows:
+            conn.execute(pg_insert(league_teams).values(
+                [{"league_id": league, "season": season, "team_id": tid} for tid in team_rows]))
+        return True
+
+    return await _read_through(
+        "teams", [f"league={league};season={season}"], FRESHNESS["teams"],
+        read, lambda: get_teams(league, season), write,
+    )
+
+
+# ─────────────────────────────── LEAGUES ───────────────────────────────────────
+def _iso(value: Optional[str]) -> Optional[dt.date]:
+    try:
+        return dt.date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+async def leagues_list(country: Optional[str] = None) -> Dict[str, Any]:
+
+    def read(conn: Connection) -> Rows:
+        stmt = (
+            select(leagues, countries.c.name.label("country_name"), countries.c.flag.label("country_flag"))
+            .select_from(leagues.outerjoin(countries, countries.c.code == leagues.c.country_code))
+            .order_by(leagues.c.id)
+        )
+        if country:
+            stmt = stmt.where(func.lower(countries.c.name) == country.lower())
+        rows = conn.execute(stmt).all()
+        by_league: Dict[int, Rows] = {}
+        for s in conn.execute(
+            select(seasons).where(seasons.c.league_id.in_([r.id for r in rows])).order_by(seasons.c.year)
+        ):
+            by_league.setdefault(s.league_id, []).append({
+                "year": s.year, "start": s.start.isoformat() if s.start else None,
+                "end": s.end.isoformat() if s.end else None, "current": s.current,
+            })
+        return [{
+            "league":  {"id": r.id, "name": r.name, "type": r.type, "logo": r.logo},
+            "country": {"name": r.country_name, "code": r.country_code, "flag": r.country_flag},
+            "seasons": by_league.get(r.id, []),
+        } for r in rows]
+
+    def write(conn: Connection, items: Rows) -> bool:
+        country_rows: Dict[str, Dict[str, Any]] = {}
+        league_rows: Dict[int, Dict[str, Any]] = {}
+        season_rows: Dict[tuple, Dict[str, Any]] = {}
+        complete = True
+        for item in items:
+            lg, c = item.get("league") or {}, item.get("country") or {}
+            if lg.get("id") is None:
+                continue
+            code = _s(c.get("code"), 5)
+            if code:
+                country_rows[code] = {"code": code, "name": _s(c.get("name"), 64) or "",
+                                      "flag": _s(c.get("flag"), 256)}
+            elif country:
+                complete = False        # npr. "World" nema kod → filter po zemlji ne bi radio iz baze
+            league_rows[lg["id"]] = {"id": lg["id"], "name": _s(lg.get("name"), 64) or "",
+                                     "type": _s(lg.get("type"), 16), "logo": _s(lg.get("logo"), 256),
+                                     "country_code": code}
+            for s in item.get("seasons", []):
+                if s.get("year") is not None:
+                    season_rows[(lg["id"], s["year"])] = {
+                        "league_id": lg["id"], "year": s["year"], "start": _iso(s.get("start")),
+                        "end": _iso(s.get("end")), "current": s.get("current"),
+                    }
+        if country_rows:
+            stmt = pg_insert(countries).values(list(country_rows.values()))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=["code"], set_={"name": stmt.excluded.name, "flag": stmt.excluded.flag}))
+        if league_rows:
+            stmt = pg_insert(leagues).values(list(league_rows.values()))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=["id"], set_={c: stmt.excluded[c] for c in
+                                             ("name", "type", "logo", "country_code")}))
+        if season_rows:
+            stmt = pg_insert(seasons).values(list(season_rows.values()))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=["league_id", "year"], set_={c: stmt.excluded[c] for c in
+                                                            ("start", "end", "current")}))
+        return complete
+
+    return await _read_through(
+        "leagues", [f"country={country.lower()}" if country else "all"], FRESHNESS["leagues"],
+        read, lambda: get_leagues(country), write,
+    )
@@ -5,6 +5,7 @@ from typing import List
 
 from models import Country
 from smartbets_API.api_football import get_countries
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/countries", tags=["countries"])
 
@@ -13,7 +14,7 @@ async def read_countries() -> List[Country]:
     try:
         payload = await get_countries()
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,39 @@
+# api-football-smartbets/routers/export.py
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from db_init import engine
+from export import FORMATS, MEDIA_TYPES, TABLES, arrow_available, stream_export
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+@router.get("/{table}")
+async def read_export(
+    table: str,
+    season: int,
+    league: Optional[int] = None,
+    format: str = "parquet"
+) -> StreamingResponse:
+    """
+    Sezona (opciono jedna liga) tablice fixtures / fixture_statistics / odds
+    kao Parquet ili Arrow IPC stream.  Šalje se blok po blok sa server-side
+    kursora, pa memorija ne raste sa veličinom sezone.
+    """
+    if table not in TABLES:
+        raise HTTPException(status_code=404, detail=f"Izvoz postoji za: {', '.join(TABLES)}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"format: {' | '.join(FORMATS)}")
+    if engine is None:
+        raise HTTPException(status_code=503, detail="DATABASE_URL nije postavljen")
+    if not arrow_available():
+        raise HTTPException(status_code=501, detail="Izvoz traži pyarrow na serveru")
+
+    suffix = f"_{league}" if league is not None else ""
+    filename = f"{table}_{season}{suffix}{FORMATS[format]}"
+    return StreamingResponse(
+        stream_export(table, season, league, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
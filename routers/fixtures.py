@@ -4,7 +4,8 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional, List
 
 from models import Fixture
-from smartbets_API.api_football import get_fixtures_by_date
+from read_through import fixtures_by_date
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/fixtures", tags=["fixtures"])
 
@@ -24,9 +25,9 @@ async def read_fixtures(
       - season: opcioni godina sezone (npr. 2025)
     """
     try:
-        payload = await get_fixtures_by_date(date, league, season)
+        payload = await fixtures_by_date(date, league, season)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         # Propagiramo HTTPException (npr. 404/422 iz sdk-a)
         raise
     except Exception as e:
@@ -4,13 +4,14 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Optional
 
 from models import Round, Fixture, Head2HeadEntry, FixtureStatistic, FixtureEvent
+from read_through import head2head
 from smartbets_API.api_football import (
     get_fixtures_rounds,
     get_fixtures,
-    get_head2head,
     get_fixture_statistics,
     get_fixture_events,
 )
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/fixtures", tags=["fixtures-extra"])
 
@@ -19,7 +20,7 @@ async def read_rounds(league: int, season: int) -> List[Round]:
     try:
         payload = await get_fixtures_rounds(league, season)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -34,7 +35,7 @@ async def read_fixtures(
     try:
         payload = await get_fixtures(date, league, season, status)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -43,12 +44,13 @@ async def read_fixtures(
 async def read_head2head(
     team1: int,
     team2: int,
-    season: Optional[int] = None
+    season: Optional[int] = None,
+    last: Optional[int] = None
 ) -> List[Head2HeadEntry]:
     try:
-        payload = await get_head2head(team1, team2, season)
+        payload = await head2head(team1, team2, season, last)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -61,7 +63,7 @@ async def read_fixture_statistics(
     try:
         payload = await get_fixture_statistics(fixture_id, halftime)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -71,7 +73,7 @@ async def read_fixture_events(fixture_id: int) -> List[FixtureEvent]:
     try:
         payload = await get_fixture_events(fixture_id)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
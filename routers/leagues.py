@@ -4,16 +4,18 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Optional
 
 from models import League, LeagueSeasonList
-from smartbets_API.api_football import get_leagues, get_seasons
+from read_through import leagues_list
+from smartbets_API.api_football import get_seasons
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/leagues", tags=["leagues"])
 
 @router.get("/", response_model=List[League])
 async def read_leagues(country: Optional[str] = None) -> List[League]:
     try:
-        payload = await get_leagues(country)
+        payload = await leagues_list(country)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -31,7 +33,7 @@ async def read_league_seasons(league_id: int) -> LeagueSeasonList:
             league=League.parse_obj(league_info),
             seasons=seasons
         )
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
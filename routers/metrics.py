@@ -0,0 +1,47 @@
+# api-football-smartbets/routers/metrics.py
+
+from fastapi import APIRouter
+from typing import Any, Dict
+import asyncio
+
+from db_async import pool_stats
+from db_init import engine
+from read_through import stats as read_through_stats
+from smartbets_API.api_football import cache_stats, client_stats
+from smartbets_API.predictor import memo_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/upstream")
+async def read_upstream_metrics() -> Dict[str, Any]:
+    """
+    Brojači deljenog HTTP klijenta: koliko zahteva je otvorilo novu
+    konekciju, a koliko je iskoristilo toplu (keep-alive / HTTP/2).
+    """
+    return client_stats()
+
+@router.get("/cache")
+async def read_cache_metrics() -> Dict[str, Any]:
+    """Stanje keša odgovora: broj unosa, bajtovi, hit/miss/eviction brojači."""
+    return await asyncio.to_thread(cache_stats)     # SQLite sloj ne sme blokirati loop
+
+@router.get("/read-through")
+async def read_read_through_metrics() -> Dict[str, Any]:
+    """Koliko odgovora je sklopljeno iz Postgresa, a koliko je išlo na upstream, po tipu podatka."""
+    return read_through_stats()
+
+@router.get("/db")
+async def read_db_metrics() -> Dict[str, Any]:
+    """
+    Pool deljenog async engine-a (zauzete konekcije, overflow, čekanje na
+    konekciju) i stanje sinhronog pool-a koji koristi izvoz (export.py).
+    """
+    return {
+        "async": pool_stats(),
+        "sync":  engine.pool.status() if engine is not None else None,
+    }
+
+@router.get("/predictions")
+async def read_prediction_metrics() -> Dict[str, Any]:
+    """Memo predikcija u procesu: unosi, hit/miss – hit = ulazi isti, model nije ponovo računat."""
+    return memo_stats()
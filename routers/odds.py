@@ -1,14 +1,22 @@
 # api-football-smartbets/routers/odds.py
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import List, Optional
+import datetime
 
-from models import OddsResponse, OddsMappingEntry, BookmakerInfo
+from db_async import get_conn
+from db_init import engine
+from models import OddsMovementLine, OddsResponse, OddsMappingEntry, BookmakerInfo
+from odds_movement import movement
+from routers.streaming import NDJSON, ndjson_response
 from smartbets_API.api_football import (
     get_odds_by_fixture,
     get_odds_mapping,
     get_bookmakers
 )
+from value_bets import MIN_EDGE, scan_day
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/odds", tags=["odds"])
 
@@ -17,7 +25,7 @@ async def read_odds(fixture: int, bookmaker: int) -> List[OddsResponse]:
     try:
         payload = await get_odds_by_fixture(fixture, bookmaker)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -27,7 +35,7 @@ async def read_mapping() -> List[OddsMappingEntry]:
     try:
         payload = await get_odds_mapping()
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -37,7 +45,48 @@ async def read_bookmakers() -> List[BookmakerInfo]:
     try:
         payload = await get_bookmakers()
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/value-bets",
+    responses={200: {"content": {NDJSON: {}},
+                     "description": "Jedna selekcija po liniji, najveći edge prvi"}},
+)
+async def read_value_bets(
+    date: str,
+    min_edge: float = Query(MIN_EDGE, ge=0, description="p_modela · kvota − 1"),
+    min_prob: float = Query(0.0, ge=0, le=1),
+    bookmaker: Optional[int] = None
+):
+    """
+    Kvote svih kladionica za dan naspram Poisson modela: implicitna
+    verovatnoća, marža tržišta, verovatnoća modela i edge po selekciji.
+    """
+    try:
+        datetime.date.fromisoformat(date)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date: YYYY-MM-DD")
+    if engine is None:
+        raise HTTPException(status_code=503, detail="DATABASE_URL nije postavljen")
+    return ndjson_response(scan_day(date, min_edge, min_prob, bookmaker))
+
+@router.get("/{fixture}/movement", response_model=List[OddsMovementLine])
+async def read_odds_movement(
+    fixture: int,
+    bet: Optional[int] = None,
+    bookmaker: Optional[int] = None,
+    conn: AsyncConnection = Depends(get_conn)
+) -> List[OddsMovementLine]:
+    """
+    Istorija cena po liniji (kladionica × oklada × selekcija) iz odds_history.
+    Tačka postoji samo kad se cena promenila, pa je niz kratak i za dug period.
+    """
+    try:
+        return await conn.run_sync(movement, fixture, bet, bookmaker)
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,13 +1,25 @@
 # api-football-smartbets/routers/predictions.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncConnection
 from typing import List, Optional
+import datetime
 
-from models import PredictionResponse
-from smartbets_API.predictor import Predictor
+from db_async import get_conn
+from elo_ratings import get_ratings
+from models import BatchPredictionRequest, MarketPrediction, PredictionResponse
+from poisson_model import get_model, predict_markets
+from prediction_store import get_store
+from read_through import fixtures_by_date
+from team_form import get_form_store
+from smartbets_API.predictor import Predictor, predict_batch
+from routers.streaming import NDJSON, ndjson_response
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/predictions", tags=["predictions"])
 
+BATCH_MAX_DAYS = 31
+
 @router.get("/", response_model=List[PredictionResponse])
 async def read_predictions(
     date: str,
@@ -16,9 +28,56 @@ async def read_predictions(
     bookmaker: Optional[int] = None
 ) -> List[PredictionResponse]:
     try:
-        predictor = Predictor(league=league, season=season, bookmaker=bookmaker)
-        return await predictor.predict_by_date(date)
-    except HTTPException:
+        predictor = Predictor(league=league, season=season, bookmaker=bookmaker,
+                              form=get_form_store(), ratings=get_ratings())
+        return await predictor.predict_by_date(date, store=get_store())
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/markets", response_model=List[MarketPrediction])
+async def read_market_predictions(
+    date: str,
+    league: int,
+    season: int,
+    conn: AsyncConnection = Depends(get_conn)
+) -> List[MarketPrediction]:
+    """
+    Poisson model golova za sve utakmice dana: 1X2, dvostruka šansa, GG i
+    over 1.5 / 2.5 / 3.5.  Snage timova su iz utakmica u bazi, bez upstream
+    poziva po timu; cela lista se računa jednim NumPy prolazom.
+    """
+    try:
+        payload = await fixtures_by_date(date, league, season)
+        model = await conn.run_sync(get_model, league, season)
+        return predict_markets(model, payload.get("response", []))
+    except (HTTPException, UpstreamUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post(
+    "/batch",
+    responses={200: {"content": {NDJSON: {}},
+                     "description": "Jedna BatchPredictionGroup linija po (liga, datum)"}},
+)
+async def read_predictions_batch(body: BatchPredictionRequest):
+    """
+    Više liga × raspon datuma u jednom zahtevu.  Upstream pozivi se planiraju
+    zajedno (bez duplikata) i izvršavaju paralelno uz limit `concurrency`;
+    rezultat je NDJSON tok grupisan po ligi i datumu.
+    """
+    date_to = body.date_to or body.date_from
+    if date_to < body.date_from:
+        raise HTTPException(status_code=422, detail="date_to je pre date_from")
+    days = (date_to - body.date_from).days + 1
+    if days > BATCH_MAX_DAYS:
+        raise HTTPException(status_code=422, detail=f"Najviše {BATCH_MAX_DAYS} dana po zahtevu")
+
+    dates = [(body.date_from + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+    leagues = [(ls.league, ls.season) for ls in body.leagues]
+    return ndjson_response(
+        predict_batch(leagues, dates, body.bookmaker, body.concurrency,
+                      store=get_store(), form=get_form_store(), ratings=get_ratings())
+    )
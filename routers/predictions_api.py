@@ -5,6 +5,7 @@ from typing import List, Optional
 
 from models import APIPrediction
 from smartbets_API.api_football import get_api_predictions
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/predictions-api", tags=["predictions-api"])
 
@@ -16,7 +17,7 @@ async def read_api_predictions(
     try:
         payload = await get_api_predictions(fixture, bookmaker)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,24 @@
+# api-football-smartbets/routers/streaming.py
+
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """Streaming se bira query parametrom `stream=true` ili `Accept: application/x-ndjson`."""
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+async def _encode(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def ndjson_response(records: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Šalje svaki zapis kao jednu JSON liniju čim je spreman (chunked)."""
+    return StreamingResponse(_encode(records), media_type=NDJSON)
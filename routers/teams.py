@@ -1,29 +1,48 @@
 # api-football-smartbets/routers/teams.py
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import List, Optional
 
+from db_async import get_optional_conn
 from models import Team, TeamStatistics
-from smartbets_API.api_football import get_teams, get_team_statistics
+from read_through import league_teams_list
+from smartbets_API.api_football import get_team_statistics
+from team_form import form_statistics, load_team_form
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 @router.get("/", response_model=List[Team])
 async def read_teams(league: int, season: int) -> List[Team]:
     try:
-        payload = await get_teams(league, season)
+        payload = await league_teams_list(league, season)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{team_id}/statistics", response_model=List[TeamStatistics])
-async def read_team_stats(team_id: int, league: int, season: int) -> List[TeamStatistics]:
+async def read_team_stats(
+    team_id: int,
+    league: int,
+    season: int,
+    conn: Optional[AsyncConnection] = Depends(get_optional_conn)
+) -> List[TeamStatistics]:
     try:
+        # forma iz baze (team_form) – jedan lookup po ključu, bez upstream poziva
+        if conn is not None:
+            try:
+                rows = await conn.run_sync(load_team_form, [team_id], league, season)
+            except Exception:
+                rows = {}
+            if team_id in rows:
+                return form_statistics(rows[team_id])
+
         payload = await get_team_statistics(team_id, league, season)
         return payload.get("response", [])
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,9 @@
 # routers/today.py
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional
+import asyncio
 import datetime
+import os
 
 from smartbets_API.api_football import (
     get_fixtures,
@@ -9,34 +11,101 @@ from smartbets_API.api_football import (
     get_head_to_head,
     get_odds,
 )
+from routers.streaming import ndjson_response, wants_ndjson
+from smartbets_API.ratelimit import UpstreamUnavailable
 
 router = APIRouter(prefix="/today", tags=["today"])
 
+# Koliko fixtura se istovremeno obrađuje (svaki fixture = 3 upstream poziva)
+TODAY_CONCURRENCY     = int(os.getenv("TODAY_CONCURRENCY", "10"))
+TODAY_MAX_CONCURRENCY = int(os.getenv("TODAY_MAX_CONCURRENCY", "50"))
+
+
+async def _fixture_record(f: Dict[str, Any], sem: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Skuplja statistiku, H2H i kvote za jedan fixture.
+    Greška u pojedinačnom pozivu (ili fixture bez id-a) se upisuje u `errors`,
+    ne obara ceo odgovor.
+    """
+    try:
+        fid = f["fixture"]["id"]       # id iz API-Football odgovora
+    except (KeyError, TypeError) as exc:
+        return {"fixture": f, "statistics": [], "h2h": [], "odds": [],
+                "errors": {"fixture": f"nema fixture.id: {exc!r}"}}
+    async with sem:
+        stats, h2h, odds = await asyncio.gather(
+            get_fixture_statistics(fid),
+            get_head_to_head(fid),
+            get_odds(fid),
+            return_exceptions=True,
+        )
+
+    record: Dict[str, Any] = {"fixture": f}    # kompletan sirovi fixture blok
+    errors: Dict[str, str] = {}
+    for key, result in (("statistics", stats), ("h2h", h2h), ("odds", odds)):
+        if isinstance(result, BaseException):
+            record[key] = []
+            errors[key] = str(result) or type(result).__name__
+        else:
+            record[key] = result.get("response", [])
+    if errors:
+        record["errors"] = errors
+    return record
+
+
+async def _iter_records(
+    fixtures_raw: Iterable[Dict[str, Any]],
+    limit: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Klizni prozor od najviše `limit` fixtura u obradi; zapis se predaje
+    čim je gotov (redosled završetka), pa memorija ne raste sa brojem fixtura.
+    """
+    sem = asyncio.Semaphore(limit)
+    source = iter(fixtures_raw)
+    pending: set = set()
+    try:
+        while True:
+            while len(pending) < limit:
+                f = next(source, None)
+                if f is None:
+                    break
+                pending.add(asyncio.ensure_future(_fixture_record(f, sem)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # klijent je prekinuo konekciju → ne radimo upstream pozive uzalud
+        for task in pending:
+            task.cancel()
+
+
 @router.get("/", response_model=List[Dict[str, Any]])      # ⇦ vraćamo listu dict-ova
-async def read_today():
+async def read_today(
+    request: Request,
+    concurrency: Optional[int] = Query(None, ge=1, description="Broj fixtura koji se obrađuju paralelno"),
+    stream: bool = Query(False, description="NDJSON: jedan fixture po liniji, čim je spreman"),
+):
     date_str = datetime.date.today().isoformat()
     try:
         fx_payload = await get_fixtures(date_str)
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     fixtures_raw = fx_payload.get("response", [])
 
-    aggregated: List[Dict[str, Any]] = []
-    for f in fixtures_raw:
-        fid = f["fixture"]["id"]           # id iz API-Football odgovora
-
-        stats   = (await get_fixture_statistics(fid)).get("response", [])
-        h2h     = (await get_head_to_head(fid)).get("response", [])
-        odds    = (await get_odds(fid)).get("response", [])
-
-        aggregated.append(
-            {
-                "fixture": f,       # kompletan sirovi fixture blok
-                "statistics": stats,
-                "h2h":        h2h,
-                "odds":       odds,
-            }
-        )
+    limit = min(concurrency or TODAY_CONCURRENCY, TODAY_MAX_CONCURRENCY)
+    if wants_ndjson(request, stream):
+        return ndjson_response(_iter_records(fixtures_raw, limit))
+
+    sem = asyncio.Semaphore(limit)
 
+    # gather čuva redosled ulaza → rezultat je u istom redosledu kao fixtures_raw
+    aggregated: List[Dict[str, Any]] = await asyncio.gather(
+        *(_fixture_record(f, sem) for f in fixtures_raw)
+    )
     return aggregated
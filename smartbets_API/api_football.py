@@ -1,6 +1,11 @@
 import os
+import logging
 import httpx
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import SQLiteCache, TieredCache, TTLCache, make_key
+from .singleflight import SingleFlight
+from .ratelimit import QuotaLimiter, UpstreamThrottled
 
 API_KEY = os.getenv("API_FOOTBALL_KEY")
 if not API_KEY:
@@ -9,13 +14,234 @@ if not API_KEY:
 BASE    = "https://v3.football.api-sports.io"
 HEADERS = {"x-apisports-key": API_KEY}
 
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# ─────────────────── HTTP CLIENT ─────────────────
+# Jedan dugoživeći klijent za ceo proces: DNS/TCP/TLS se plaća jednom po
+# konekciji, a ne po zahtevu.  Kreira se u lifespan hook-u (main.py), a
+# skripte bez FastAPI-ja (fixtures_loader.py) ga dobijaju lenjo u _get.
+TIMEOUT          = float(os.getenv("API_FOOTBALL_TIMEOUT", "15"))
+MAX_CONNECTIONS  = int(os.getenv("API_FOOTBALL_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE    = int(os.getenv("API_FOOTBALL_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("API_FOOTBALL_KEEPALIVE_EXPIRY", "30"))
+HTTP2            = _env_flag("API_FOOTBALL_HTTP2")
+
+_client: Optional[httpx.AsyncClient] = None
+_http2_enabled = False
+
+# ─────────────────── RATE LIMIT ──────────────────
+# Početne vrednosti; limiter ih posle prvog odgovora uči iz x-ratelimit-* zaglavlja.
+RATE_PER_MINUTE = int(os.getenv("API_FOOTBALL_RATE_PER_MINUTE", "30"))
+RATE_PER_DAY    = int(os.getenv("API_FOOTBALL_RATE_PER_DAY", "0")) or None
+BULK_RESERVE    = float(os.getenv("API_FOOTBALL_BULK_RESERVE", "0.2"))
+THROTTLE_RETRIES = int(os.getenv("API_FOOTBALL_THROTTLE_RETRIES", "3"))
+
+limiter = QuotaLimiter(per_minute=RATE_PER_MINUTE, per_day=RATE_PER_DAY,
+                       bulk_reserve=BULK_RESERVE)
+_stats: Dict[str, int] = {
+    "requests":           0,
+    "new_connections":    0,   # zahtev je morao da otvori TCP (+TLS) konekciju
+    "reused_connections": 0,   # zahtev je išao preko tople keep-alive konekcije
+    "errors":             0,
+}
+
+
+def _http2_supported() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def init_client() -> httpx.AsyncClient:
+    """Kreira (ili vraća postojeći) deljeni AsyncClient."""
+    global _client, _http2_enabled
+    if _client is not None and not _client.is_closed:
+        return _client
+
+    http2 = HTTP2 and _http2_supported()
+    if HTTP2 and not http2:
+        logger.warning("API_FOOTBALL_HTTP2 je uključen, ali paket 'h2' nije "
+                       "instaliran – koristim HTTP/1.1")
+
+    _http2_enabled = http2
+    _client = httpx.AsyncClient(
+        base_url=BASE,
+        headers=HEADERS,
+        timeout=TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+    return _client
+
+
+async def close_client() -> None:
+    """Zatvara deljeni klijent i sve njegove konekcije (shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def client_stats() -> Dict[str, Any]:
+    """Brojači upotrebe konekcija – koliko zahteva je dobilo toplu konekciju."""
+    done = _stats["new_connections"] + _stats["reused_connections"]
+    return {
+        **_stats,
+        "reuse_ratio": round(_stats["reused_connections"] / done, 4) if done else None,
+        "http2":       _http2_enabled,
+        "limits": {
+            "max_connections":     MAX_CONNECTIONS,
+            "max_keepalive":       MAX_KEEPALIVE,
+            "keepalive_expiry":    KEEPALIVE_EXPIRY,
+        },
+        "rate_limit": limiter.stats(),
+    }
+
+
+# ─────────────────── RESPONSE CACHE ──────────────
+# TTL po klasi endpoint-a (sekunde); prvi prefiks koji se poklopi pobeđuje,
+# zato specifične putanje idu pre opštih.
+MINUTE, HOUR = 60, 3600
+
+CACHE_TTLS = (
+    ("/countries",            12 * HOUR),
+    ("/leagues",               6 * HOUR),   # uklj. /leagues/{id}/seasons
+    ("/odds/bookmakers",      12 * HOUR),
+    ("/odds/mapping",          6 * HOUR),
+    ("/teams/statistics",     10 * MINUTE),
+    ("/teams",                 6 * HOUR),
+    ("/standings",             5 * MINUTE),
+    ("/fixtures/rounds",           HOUR),
+    ("/fixtures/headtohead",       HOUR),
+    ("/fixtures/statistics",       MINUTE),
+    ("/fixtures/events",          30),
+    ("/fixtures",                  MINUTE),
+    ("/odds",                  5 * MINUTE),
+    ("/predictions",               HOUR),
+)
+LIVE_TTL = 15                               # ?live=… – rezultati se menjaju stalno
+
+CACHE_ENABLED     = _env_flag("API_FOOTBALL_CACHE", "1")
+CACHE_MAX_ENTRIES = int(os.getenv("API_FOOTBALL_CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES   = int(os.getenv("API_FOOTBALL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# "memory" = keš po procesu; "sqlite" = + deljeni fajl za sve worker-e na hostu
+CACHE_BACKEND          = os.getenv("API_FOOTBALL_CACHE_BACKEND", "memory").lower()
+CACHE_PATH             = os.getenv("API_FOOTBALL_CACHE_PATH", "/tmp/api_football_cache.sqlite3")
+CACHE_SHARED_MAX_BYTES = int(os.getenv("API_FOOTBALL_CACHE_SHARED_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_local_cache = TTLCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+if CACHE_BACKEND == "sqlite":
+    response_cache: Any = TieredCache(_local_cache,
+                                      SQLiteCache(CACHE_PATH, max_bytes=CACHE_SHARED_MAX_BYTES))
+else:
+    response_cache = _local_cache
+# isti path+params u toku → jedan upstream poziv za sve pozivaoce
+_inflight = SingleFlight()
+
+
+def _ttl_for(path: str, params: Optional[Dict[str, Any]]) -> float:
+    if params and params.get("live") is not None:
+        return LIVE_TTL
+    for prefix, ttl in CACHE_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return 0
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        "enabled":      CACHE_ENABLED,
+        "backend":      CACHE_BACKEND,
+        **response_cache.stats(),
+        "single_flight": _inflight.stats(),
+    }
+
 
 async def _get(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    url = f"{BASE}{path}"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, headers=HEADERS, params=params, timeout=15.0)
+    """
+    GET ka API-Football-u.  Keširani odgovori se dele između pozivalaca –
+    vraćeni dict se ne sme menjati.
+    """
+    ttl = _ttl_for(path, params) if CACHE_ENABLED else 0
+    key = make_key(path, params)
+    if ttl:
+        cached = await response_cache.aget(key)
+        if cached is not None:
+            return cached
+
+    async def _load() -> Dict[str, Any]:
+        payload, size = await _fetch(path, params)
+        # API-Football vraća 200 i za greške (npr. prekoračen limit) – te ne keširamo
+        if ttl and not payload.get("errors"):
+            await response_cache.aset(key, payload, ttl, size)
+        return payload
+
+    return await _inflight.do(key, _load)
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    try:
+        return float(resp.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def _fetch(path: str, params: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """
+    Jedan upstream poziv kroz limiter.  Odbijanje zbog limita (HTTP 429 ili
+    200 sa errors.rateLimit) vraća zahtev u red umesto da ga propusti kao grešku.
+    """
+    client = await init_client()
+    retry_after: Optional[float] = None
+
+    for _ in range(THROTTLE_RETRIES + 1):
+        await limiter.acquire()
+
+        opened = False
+
+        async def _trace(event: str, info: Dict[str, Any]) -> None:
+            # httpcore javlja connect_tcp samo kada pool otvara novu konekciju
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+
+        _stats["requests"] += 1
+        try:
+            resp = await client.get(path, params=params, extensions={"trace": _trace})
+        except httpx.HTTPError:
+            _stats["errors"] += 1
+            raise
+        _stats["new_connections" if opened else "reused_connections"] += 1
+        limiter.update(resp.headers)
+
+        if resp.status_code == 429:
+            retry_after = _retry_after(resp)
+            limiter.throttle(retry_after)
+            continue
         resp.raise_for_status()
-        return resp.json()
+
+        payload = resp.json()
+        errors = payload.get("errors")
+        if isinstance(errors, dict) and "rateLimit" in errors:
+            retry_after = None
+            limiter.throttle()
+            continue
+        return payload, len(resp.content)
+
+    raise UpstreamThrottled(
+        f"API-Football odbija zahteve zbog limita ({THROTTLE_RETRIES + 1} pokušaja)",
+        retry_after or 60.0 / limiter.per_minute)
 
 
 # ─────────────────── COUNTRIES ───────────────────
@@ -58,6 +284,14 @@ async def get_fixtures(date: str,
 
 get_fixtures_by_date = get_fixtures          # alias
 
+async def get_live_fixtures(league: Optional[int] = None):
+    """Utakmice u toku ("all" ili jedna liga) – keš ih drži samo LIVE_TTL sekundi."""
+    return await _get("/fixtures", {"live": league if league is not None else "all"})
+
+async def get_fixtures_by_ids(ids: List[int]):
+    """Do 20 utakmica po ID-u u jednom pozivu."""
+    return await _get("/fixtures", {"ids": "-".join(str(i) for i in ids[:20])})
+
 async def get_fixtures_rounds(league: int, season: int):
     return await _get("/fixtures/rounds", {"league": league, "season": season})
 
@@ -74,6 +308,15 @@ async def get_head_to_head(fixture: int):
 
 get_head2head = get_head_to_head             # alias
 
+async def get_head2head_teams(team1: int, team2: int,
+                              season: Optional[int] = None,
+                              last: Optional[int] = None):
+    """Svi međusobni mečevi dva tima (h2h=team1-team2)."""
+    params: Dict[str, Any] = {"h2h": f"{team1}-{team2}"}
+    if season is not None:  params["season"] = season
+    if last is not None:    params["last"] = last
+    return await _get("/fixtures/headtohead", params)
+
 
 # ─────────────────── ODDS ────────────────────────
 async def get_odds(fixture: int, bookmaker: Optional[int] = None):
@@ -84,6 +327,13 @@ async def get_odds(fixture: int, bookmaker: Optional[int] = None):
 
 get_odds_by_fixture = get_odds               # alias
 
+async def get_odds_by_date(date: str, page: int = 1, bookmaker: Optional[int] = None):
+    """Sve kvote za dan; odgovor je paginiran (paging.current / paging.total)."""
+    params: Dict[str, Any] = {"date": date, "page": page}
+    if bookmaker is not None:
+        params["bookmaker"] = bookmaker
+    return await _get("/odds", params)
+
 async def get_odds_mapping():
     return await _get("/odds/mapping")
 
@@ -0,0 +1,172 @@
+"""
+backtest.py
+───────────
+Vektorizovan backtest modela nad završenim utakmicama (NumPy, bez petlji po meču).
+
+• FixtureArrays – kolone jedne ili više sezona: timovi, golovi, ishod i
+  zaključne kvote 1 / X / 2 (NaN gde kvote nema)
+• ishod 1X2 se ocenjuje po rezultatu posle 90 minuta (regulation_goals):
+  kup-meč rešen u produžecima ili na penale je za kladionice nerešen
+• model = funkcija  FixtureArrays → verovatnoće (n, 3)  za  1 / X / 2
+• evaluate(): pogodak, ROI (1 jedinica na favorita modela po zaključnoj
+  kvoti) i log-loss, ukupno i po ligi
+• punjenje iz Postgresa je u  backtest.py  u korenu projekta
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+HOME, DRAW, AWAY = 0, 1, 2
+PICKS = ("1", "X", "2")
+EPS = 1e-15
+
+
+def regulation_goals(ft: np.ndarray, goals: np.ndarray) -> np.ndarray:
+    """Golovi posle 90 minuta (ft_*); konačan rezultat (home/away_goals) samo gde ft nema (NaN)."""
+    return np.where(np.isnan(ft), goals, ft)
+
+
+class FixtureArrays:
+    """Kolone završenih utakmica, sortirane po vremenu početka."""
+
+    def __init__(
+        self,
+        fixture_id: np.ndarray,
+        league: np.ndarray,
+        season: np.ndarray,
+        timestamp: np.ndarray,
+        home: np.ndarray,
+        away: np.ndarray,
+        home_goals: np.ndarray,
+        away_goals: np.ndarray,
+        odds: Optional[np.ndarray] = None,
+    ):
+        order = np.argsort(timestamp, kind="stable")
+        self.fixture_id = fixture_id[order]
+        self.league = league[order]
+        self.season = season[order]
+        self.timestamp = timestamp[order]
+        self.home = home[order]
+        self.away = away[order]
+        self.home_goals = home_goals[order]
+        self.away_goals = away_goals[order]
+        n = len(order)
+        self.odds = odds[order] if odds is not None else np.full((n, 3), np.nan)
+        self.outcome = np.select(
+            [self.home_goals > self.away_goals, self.home_goals == self.away_goals],
+            [HOME, DRAW], AWAY,
+        )
+
+    def __len__(self) -> int:
+        return len(self.fixture_id)
+
+    def subset(self, mask: np.ndarray) -> "FixtureArrays":
+        return FixtureArrays(self.fixture_id[mask], self.league[mask], self.season[mask],
+                             self.timestamp[mask], self.home[mask], self.away[mask],
+                             self.home_goals[mask], self.away_goals[mask], self.odds[mask])
+
+
+Model = Callable[[FixtureArrays], np.ndarray]
+
+
+def points_before(a: FixtureArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bodovi domaćina i gosta u (liga, sezona) PRE svake utakmice – ono što
+    bi /standings pokazao tog dana, bez curenja budućih rezultata.
+    """
+    n = len(a)
+    home_pts = np.select([a.outcome == HOME, a.outcome == DRAW], [3, 1], 0)
+    away_pts = np.select([a.outcome == AWAY, a.outcome == DRAW], [3, 1], 0)
+
+    # dugi format: jedan red po (utakmica, tim)
+    team = np.concatenate([a.home, a.away])
+    league = np.concatenate([a.league, a.league])
+    season = np.concatenate([a.season, a.season])
+    ts = np.concatenate([a.timestamp, a.timestamp])
+    gained = np.concatenate([home_pts, away_pts])
+
+    order = np.lexsort((ts, team, season, league))
+    g = gained[order]
+    exclusive = np.cumsum(g) - g                    # zbir svega pre reda, globalno
+    new_group = np.ones(2 * n, dtype=bool)
+    new_group[1:] = ((league[order][1:] != league[order][:-1])
+                     | (season[order][1:] != season[order][:-1])
+                     | (team[order][1:] != team[order][:-1]))
+    start = np.maximum.accumulate(np.where(new_group, np.arange(2 * n), 0))
+    before = np.empty(2 * n, dtype=np.int64)
+    before[order] = exclusive - exclusive[start]    # … umanjen za zbir pre početka grupe
+    return before[:n], before[n:]
+
+
+def picks_to_probs(picks: np.ndarray, confidence: float = 0.5) -> np.ndarray:
+    """Tvrd izbor 1/X/2 → verovatnoće: izbor dobija  confidence, ostatak pola-pola."""
+    probs = np.full((len(picks), 3), (1.0 - confidence) / 2)
+    probs[np.arange(len(picks)), picks] = confidence
+    return probs
+
+
+def points_model(a: FixtureArrays) -> np.ndarray:
+    """Pravilo Predictor-a: više bodova u tabeli → pobeda, isto → X."""
+    home_pts, away_pts = points_before(a)
+    picks = np.select([home_pts > away_pts, away_pts > home_pts], [HOME, AWAY], DRAW)
+    return picks_to_probs(picks)
+
+
+def home_model(a: FixtureArrays) -> np.ndarray:
+    """Bazna linija: uvek domaćin."""
+    return picks_to_probs(np.full(len(a), HOME))
+
+
+def market_model(a: FixtureArrays) -> np.ndarray:
+    """Implicitne verovatnoće zaključnih kvota bez marže; bez kvota – uniformno."""
+    inv = 1.0 / a.odds
+    total = inv.sum(axis=1, keepdims=True)
+    probs = inv / total
+    missing = ~np.isfinite(probs).all(axis=1)
+    probs[missing] = 1.0 / 3
+    return probs
+
+
+MODELS: Dict[str, Model] = {
+    "points": points_model,
+    "home":   home_model,
+    "market": market_model,
+}
+
+
+def _metrics(probs: np.ndarray, outcome: np.ndarray, odds: np.ndarray) -> Dict[str, Any]:
+    n = len(outcome)
+    if n == 0:
+        return {"fixtures": 0, "hit_rate": None, "bets": 0, "roi": None, "log_loss": None}
+    rows = np.arange(n)
+    pick = probs.argmax(axis=1)
+    hit = pick == outcome
+    price = odds[rows, pick]
+    priced = np.isfinite(price)
+    profit = np.where(hit, price - 1.0, -1.0)[priced]
+    p_true = np.clip(probs[rows, outcome], EPS, 1.0)
+    bets = int(priced.sum())
+    return {
+        "fixtures": n,
+        "hit_rate": round(float(hit.mean()), 4),
+        "bets":     bets,
+        "roi":      round(float(profit.sum() / bets), 4) if bets else None,
+        "log_loss": round(float(-np.log(p_true).mean()), 4),
+    }
+
+
+def evaluate(model: Model, a: FixtureArrays, by_league: bool = True) -> Dict[str, Any]:
+    """
+    Jedan poziv modela nad svim utakmicama, pa metrike ukupno i po ligi.
+    Model dobija celu istoriju (npr. bodove pre meča računa sam).
+    """
+    probs = model(a)
+    report: Dict[str, Any] = {"total": _metrics(probs, a.outcome, a.odds)}
+    if by_league:
+        report["leagues"] = {
+            int(lg): _metrics(probs[mask], a.outcome[mask], a.odds[mask])
+            for lg in np.unique(a.league)
+            for mask in [a.league == lg]
+        }
+    return report
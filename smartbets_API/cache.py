@@ -0,0 +1,302 @@
+"""
+cache.py
+────────
+In-process TTL keš za odgovore API-Football-a.
+
+• ključ = putanja + normalizovani query parametri (vidi `make_key`)
+• svaki unos ima svoj TTL (zavisi od klase endpoint-a, bira ga api_football)
+• ograničen brojem unosa i ukupnom veličinom u bajtovima, LRU izbacivanje
+• brojači hit / miss / eviction / expired za /metrics
+• `SQLiteCache` – deljeni keš za sve worker procese na hostu (SQLite WAL),
+  `TieredCache` – lokalni TTLCache ispred njega
+• iz async koda se koriste `aget` / `aset`: SQLite sloj ide u thread pool,
+  pa zaključan fajl (timeout 2 s) ne blokira event loop
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Isti upit → isti ključ, bez obzira na redosled i None vrednosti."""
+    if not params:
+        return path
+    items = sorted((k, str(v)) for k, v in params.items() if v is not None)
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+class TTLCache:
+    """LRU keš sa TTL-om po unosu i limitom na broj unosa i bajtove."""
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        """`size` je veličina sirovog odgovora u bajtovima (procena memorije)."""
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._data:
+            self._drop(key)
+        self._data[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+            self.evictions += 1
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: float, size: int) -> None:
+        self.set(key, value, ttl, size)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries":     len(self._data),
+            "bytes":       self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes":   self.max_bytes,
+            "hits":        self.hits,
+            "misses":      self.misses,
+            "hit_ratio":   round(self.hits / lookups, 4) if lookups else None,
+            "evictions":   self.evictions,
+            "expired":     self.expired,
+        }
+
+
+class SQLiteCache:
+    """
+    Keš u lokalnom SQLite fajlu (WAL režim) koji dele svi `uvicorn --workers N`
+    procesi: odgovor koji dohvati jedan worker odmah je topao za ostale.
+
+    • upis je jedna INSERT OR REPLACE naredba → atomski, čitaoci nikad ne
+      vide polovičan unos (WAL: čitanja ne blokiraju upis)
+    • TTL je apsolutno vreme isteka (wall clock), isto za sve procese
+    • veličina ograničena bajtovima; višak se izbacuje po accessed_at (≈ LRU)
+    • greške baze (npr. zaključan fajl) se tretiraju kao miss, nikad ne obaraju zahtev
+    • metode blokiraju (do timeout-a); async kod ih zove iz thread pool-a
+      (TieredCache.aget / aset), pa deljenu konekciju čuva lock
+    """
+
+    SWEEP_EVERY = 64            # posle koliko upisa proveravamo limit veličine…
+    SWEEP_INTERVAL = 30.0       # …ili posle koliko sekundi od poslednje provere
+    TOUCH_AFTER = 60.0          # accessed_at se osvežava najviše jednom u minutu
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._last_sweep = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.errors = 0
+
+    def _db(self) -> sqlite3.Connection:
+        # konekcija se ne sme deliti preko fork-a → jedna po procesu
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """Vraća (vrednost, preostali TTL u sekundama, veličina) ili None."""
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, size, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                value, size, expires_at, accessed_at = row
+                if expires_at <= now:
+                    self.expired += 1
+                    self.misses += 1
+                    return None
+                if now - accessed_at > self.TOUCH_AFTER:
+                    db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.Error as exc:
+                self.errors += 1
+                logger.warning("SQLite keš (get) nije dostupan: %s", exc)
+                return None
+        self.hits += 1
+        return json.loads(value), expires_at - now, size
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(value, separators=(",", ":")), size, now + ttl, now),
+                )
+                self._writes += 1
+                if self._writes % self.SWEEP_EVERY == 0 or now - self._last_sweep > self.SWEEP_INTERVAL:
+                    self._last_sweep = now
+                    self._sweep(db, now)
+            except sqlite3.Error as exc:
+                self.errors += 1
+                logger.warning("SQLite keš (set) nije dostupan: %s", exc)
+
+    def _sweep(self, db: sqlite3.Connection, now: float) -> None:
+        """Briše istekle unose, pa najstarije po pristupu dok ne stane u max_bytes."""
+        db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess, victims = total - self.max_bytes, []
+        for key, size in db.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self._db().execute("DELETE FROM cache")
+            except sqlite3.Error as exc:
+                self.errors += 1
+                logger.warning("SQLite keš (clear) nije dostupan: %s", exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                entries, size = self._db().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+                ).fetchone()
+            except sqlite3.Error:
+                entries, size = None, None
+        lookups = self.hits + self.misses
+        return {
+            "path":      self.path,
+            "entries":   entries,
+            "bytes":     size,
+            "max_bytes": self.max_bytes,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expired":   self.expired,
+            "errors":    self.errors,
+        }
+
+
+class TieredCache:
+    """
+    Lokalni TTLCache (L1, po procesu) ispred deljenog SQLiteCache-a (L2).
+    L2 pogodak puni L1 sa preostalim TTL-om, pa vreme isteka ostaje isto u
+    svim worker-ima.
+    """
+
+    def __init__(self, local: TTLCache, shared: SQLiteCache):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return self._promote(key, self.shared.get_entry(key))
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        self.local.set(key, value, ttl, size)
+        self.shared.set(key, value, ttl, size)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return self._promote(key, await asyncio.to_thread(self.shared.get_entry, key))
+
+    async def aset(self, key: str, value: Any, ttl: float, size: int) -> None:
+        self.local.set(key, value, ttl, size)
+        await asyncio.to_thread(self.shared.set, key, value, ttl, size)
+
+    def _promote(self, key: str, entry: Optional[Tuple[Any, float, int]]) -> Optional[Any]:
+        if entry is None:
+            return None
+        value, remaining, size = entry
+        self.local.set(key, value, remaining, size)
+        return value
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.local.stats(), "shared": self.shared.stats()}
@@ -0,0 +1,136 @@
+"""
+elo.py
+──────
+Inkrementalni Elo rejting timova (NumPy niz + gusto mapiranje team_id → indeks).
+
+• rejtinzi i broj mečeva su nizovi; team_id → indeks je dict, pa je
+  lookup po timu O(1), a novi tim samo dobija sledeći indeks
+• update_many(): jedan prolaz kroz završene utakmice, hronološki; već
+  primenjene (applied, sortiran niz fixture id-eva) se preskaču, pa isti
+  meč iz loadera i iz catch-up-a ne računa dvaput
+• save() / load(): snapshot u .npz (atomski rename) – restart ne
+  prepričava istoriju
+• punjenje iz Postgresa i veza sa loaderom su u  elo_ratings.py
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+INITIAL = 1500.0
+K = 20.0
+HOME_ADV = 65.0              # Elo poena vredi domaći teren
+
+
+def margin_factor(goal_diff: np.ndarray) -> np.ndarray:
+    """Množilac K po razlici golova (kao eloratings.net): 1, 1.5, pa (11 + n) / 8."""
+    d = np.abs(goal_diff)
+    return np.where(d <= 1, 1.0, np.where(d == 2, 1.5, (11.0 + d) / 8.0))
+
+
+class EloRatings:
+
+    def __init__(self, k: float = K, home_adv: float = HOME_ADV, initial: float = INITIAL):
+        self.k = k
+        self.home_adv = home_adv
+        self.initial = initial
+        self.index: Dict[int, int] = {}
+        self.ratings = np.empty(0)
+        self.games = np.empty(0, dtype=np.int32)
+        self.applied = np.empty(0, dtype=np.int64)
+        self.last_ts = 0                    # najkasniji primenjen timestamp (catch-up prozor)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _slot(self, team_id: int) -> int:
+        i = self.index.get(team_id)
+        if i is None:
+            i = self.index[team_id] = len(self.index)
+            if i >= len(self.ratings):      # rast duplo, kao lista
+                size = max(64, 2 * len(self.ratings))
+                self.ratings = np.concatenate([self.ratings, np.full(size - len(self.ratings), self.initial)])
+                self.games = np.concatenate([self.games, np.zeros(size - len(self.games), np.int32)])
+        return i
+
+    def rating(self, team_id: Optional[int]) -> Optional[float]:
+        i = self.index.get(team_id)
+        return float(self.ratings[i]) if i is not None else None
+
+    def expected(self, home_id: Optional[int], away_id: Optional[int]) -> Optional[float]:
+        """Očekivani učinak domaćina (0–1); None ako nijedan tim nema rejting."""
+        home, away = self.rating(home_id), self.rating(away_id)
+        if home is None and away is None:
+            return None
+        diff = (home if home is not None else self.initial) + self.home_adv \
+            - (away if away is not None else self.initial)
+        return 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+    def update_many(self, fixture_id: np.ndarray, timestamp: np.ndarray, home: np.ndarray,
+                    away: np.ndarray, home_goals: np.ndarray, away_goals: np.ndarray) -> int:
+        """
+        Primenjuje završene utakmice redom (timestamp, id).  Elo je
+        sekvencijalan, ali filtriranje, sortiranje i množioci su nad nizovima,
+        a petlja radi samo sabiranje nad dva indeksa.  Vraća broj novih mečeva.
+        """
+        fixture_id = np.asarray(fixture_id, dtype=np.int64)
+        fresh = ~np.isin(fixture_id, self.applied)
+        keep = np.zeros(len(fixture_id), bool)
+        keep[np.unique(fixture_id, return_index=True)[1]] = True   # duplikat u seriji – jednom
+        mask = fresh & keep
+        if not mask.any():
+            return 0
+        order = np.lexsort((fixture_id[mask], np.asarray(timestamp)[mask]))
+        ids = fixture_id[mask][order]
+        ts = np.asarray(timestamp, dtype=np.int64)[mask][order]
+        hg = np.asarray(home_goals)[mask][order]
+        ag = np.asarray(away_goals)[mask][order]
+        score = np.select([hg > ag, hg == ag], [1.0, 0.5], 0.0)
+        k = self.k * margin_factor(hg - ag)
+
+        h = [self._slot(int(t)) for t in np.asarray(home)[mask][order]]
+        a = [self._slot(int(t)) for t in np.asarray(away)[mask][order]]
+        r = self.ratings
+        for i, j, s, kk in zip(h, a, score.tolist(), k.tolist()):
+            e = 1.0 / (1.0 + 10.0 ** ((r[j] - r[i] - self.home_adv) / 400.0))
+            delta = kk * (s - e)
+            r[i] += delta
+            r[j] -= delta
+        np.add.at(self.games, h, 1)
+        np.add.at(self.games, a, 1)
+
+        self.applied = np.union1d(self.applied, ids)
+        self.last_ts = max(self.last_ts, int(ts.max()))
+        return len(ids)
+
+    def table(self) -> Dict[int, Dict[str, float]]:
+        return {t: {"rating": round(float(self.ratings[i]), 1), "games": int(self.games[i])}
+                for t, i in self.index.items()}
+
+    def save(self, path: str) -> None:
+        """Snapshot u .npz; piše se u privremen fajl pa rename – čitač nikad ne vidi pola fajla."""
+        n = len(self.index)
+        team_ids = np.empty(n, dtype=np.int64)
+        for t, i in self.index.items():
+            team_ids[i] = t
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(
+                fh, team_ids=team_ids, ratings=self.ratings[:n], games=self.games[:n],
+                applied=self.applied, last_ts=np.int64(self.last_ts),
+                params=np.array([self.k, self.home_adv, self.initial]),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EloRatings":
+        with np.load(path) as data:
+            k, home_adv, initial = data["params"].tolist()
+            elo = cls(k, home_adv, initial)
+            elo.index = {int(t): i for i, t in enumerate(data["team_ids"])}
+            elo.ratings = data["ratings"].astype(np.float64)
+            elo.games = data["games"].astype(np.int32)
+            elo.applied = data["applied"].astype(np.int64)
+            elo.last_ts = int(data["last_ts"])
+        return elo
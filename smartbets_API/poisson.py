@@ -0,0 +1,177 @@
+"""
+poisson.py
+──────────
+Poisson model golova (NumPy, bez upstream poziva).
+
+• fit(): napad i odbrana po timu + prednost domaćeg terena iz završenih
+  utakmica; golovi domaćina ~ Poisson(avg · home · napad_d · odbrana_g),
+  gosta ~ Poisson(avg · napad_g · odbrana_d); novije utakmice teže više
+• score_matrices(): matrice verovatnoća rezultata (n, G+1, G+1) za sve
+  utakmice dana jednom operacijom
+• markets(): 1 / X / 2, dvostruka šansa, GG i over 1.5 / 2.5 / 3.5
+• legacy(): polja starog  interface.Prediction  (g, gg, ov15 … pick)
+• punjenje iz Postgresa i keš fitovanih modela su u  poisson_model.py
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MAX_GOALS = 10
+ITERATIONS = 50
+TOL = 1e-6
+PRIOR_GOALS = 2.0            # „prazne“ utakmice prosečnog tima – timovi sa malo mečeva
+RESULT_MIN = 0.5             # ispod ovoga  result  postaje dvostruka šansa
+MIN_PICK_ODDS = 1.30         # pick je najverovatnije tržište koje fer kvotom plaća bar ovoliko
+
+MARKETS = ("1", "x", "2", "1x", "2x", "12", "gg", "ov15", "ov25", "ov35")
+
+
+class PoissonModel:
+    """Fitovane snage; tim koji nije viđen dobija prosečne (1.0)."""
+
+    def __init__(self, teams: np.ndarray, attack: np.ndarray, defence: np.ndarray,
+                 home_adv: float, avg_goals: float, fixtures: int,
+                 games: Optional[np.ndarray] = None):
+        self.teams = teams                  # sortirani team_id-evi
+        self.attack = attack
+        self.defence = defence
+        self.home_adv = home_adv
+        self.avg_goals = avg_goals          # prosek golova gosta po utakmici (osnova)
+        self.fixtures = fixtures
+        self.games = np.zeros(len(teams), np.int64) if games is None else games
+
+    def _index(self, team_ids: np.ndarray) -> np.ndarray:
+        pos = np.clip(np.searchsorted(self.teams, team_ids), 0, max(len(self.teams) - 1, 0))
+        known = (self.teams[pos] == team_ids) if len(self.teams) else np.zeros(len(team_ids), bool)
+        return np.where(known, pos, -1)
+
+    def expected_goals(self, home: np.ndarray, away: np.ndarray):
+        """Očekivani golovi (domaćin, gost) za nizove team_id-eva."""
+        h, a = self._index(np.asarray(home)), self._index(np.asarray(away))
+        att = np.append(self.attack, 1.0)   # indeks -1 → prosečan tim
+        dfc = np.append(self.defence, 1.0)
+        lam = self.avg_goals * self.home_adv * att[h] * dfc[a]
+        mu = self.avg_goals * att[a] * dfc[h]
+        return lam, mu
+
+    def games_played(self, team_ids: np.ndarray) -> np.ndarray:
+        """Broj utakmica iz kojih je tim fitovan; 0 za tim koji nije viđen."""
+        return np.append(self.games, 0)[self._index(np.asarray(team_ids))]
+
+    def strengths(self) -> Dict[int, Dict[str, float]]:
+        return {int(t): {"attack": round(float(a), 4), "defence": round(float(d), 4)}
+                for t, a, d in zip(self.teams, self.attack, self.defence)}
+
+
+def decay_weights(timestamp: np.ndarray, now: float, half_life_days: Optional[float]) -> np.ndarray:
+    if not half_life_days:
+        return np.ones(len(timestamp))
+    age_days = np.maximum(now - timestamp, 0) / 86400.0
+    return 0.5 ** (age_days / half_life_days)
+
+
+def fit(home: np.ndarray, away: np.ndarray, home_goals: np.ndarray, away_goals: np.ndarray,
+        weights: Optional[np.ndarray] = None, iterations: int = ITERATIONS) -> PoissonModel:
+    """
+    Maksimalna verodostojnost fiksnom tačkom (Maher): svaka iteracija je
+    nekoliko  bincount-a  preko svih utakmica, bez petlje po timu.
+    """
+    teams, idx = np.unique(np.concatenate([home, away]), return_inverse=True)
+    n, k = len(home), len(teams)
+    if n == 0:
+        return PoissonModel(teams, np.ones(k), np.ones(k), 1.0, 1.0, 0)
+    h, a = idx[:n], idx[n:]
+    w = np.ones(n) if weights is None else weights
+    hg, ag = home_goals * w, away_goals * w
+
+    scored = np.bincount(h, hg, k) + np.bincount(a, ag, k)
+    conceded = np.bincount(h, ag, k) + np.bincount(a, hg, k)
+    base = max(ag.sum() / w.sum(), 1e-6)
+    home_adv = max(hg.sum() / max(ag.sum(), 1e-6), 1e-6)
+    attack, defence = np.ones(k), np.ones(k)
+
+    for _ in range(iterations):
+        exp_h = w * base * home_adv * defence[a]    # očekivano za napad domaćina / napad=1
+        exp_a = w * base * defence[h]
+        new_attack = (scored + PRIOR_GOALS) / (np.bincount(h, exp_h, k) + np.bincount(a, exp_a, k) + PRIOR_GOALS)
+        new_attack /= new_attack.mean()
+
+        exp_h = w * base * home_adv * new_attack[h]  # primljeno od domaćina / odbrana=1
+        exp_a = w * base * new_attack[a]
+        new_defence = (conceded + PRIOR_GOALS) / (np.bincount(a, exp_h, k) + np.bincount(h, exp_a, k) + PRIOR_GOALS)
+
+        home_adv = hg.sum() / max((w * base * new_attack[h] * new_defence[a]).sum(), 1e-6)
+        base = ag.sum() / max((w * new_attack[a] * new_defence[h]).sum(), 1e-6)
+
+        delta = max(np.abs(new_attack - attack).max(), np.abs(new_defence - defence).max())
+        attack, defence = new_attack, new_defence
+        if delta < TOL:
+            break
+
+    games = np.bincount(h, minlength=k) + np.bincount(a, minlength=k)
+    return PoissonModel(teams, attack, defence, float(home_adv), float(base), n, games)
+
+
+def score_matrices(lam: np.ndarray, mu: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """(n, G+1, G+1): [i, h, a] = P(domaćin h golova, gost a golova), normalizovano."""
+    goals = np.arange(max_goals + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(goals[1:]))])
+    lam = np.maximum(np.asarray(lam, float), 1e-9)[:, None]
+    mu = np.maximum(np.asarray(mu, float), 1e-9)[:, None]
+    p_home = np.exp(goals * np.log(lam) - lam - log_fact)
+    p_away = np.exp(goals * np.log(mu) - mu - log_fact)
+    m = p_home[:, :, None] * p_away[:, None, :]
+    return m / m.sum(axis=(1, 2), keepdims=True)
+
+
+def markets(m: np.ndarray) -> Dict[str, np.ndarray]:
+    """Verovatnoće tržišta (0–1) za svaku matricu; ključevi su MARKETS."""
+    g = m.shape[1]
+    h, a = np.indices((g, g))
+    total = h + a
+    p1 = (m * (h > a)).sum(axis=(1, 2))
+    px = (m * (h == a)).sum(axis=(1, 2))
+    p2 = (m * (h < a)).sum(axis=(1, 2))
+    return {
+        "1": p1, "x": px, "2": p2,
+        "1x": p1 + px, "2x": p2 + px, "12": p1 + p2,
+        "gg":   (m * ((h > 0) & (a > 0))).sum(axis=(1, 2)),
+        "ov15": (m * (total >= 2)).sum(axis=(1, 2)),
+        "ov25": (m * (total >= 3)).sum(axis=(1, 2)),
+        "ov35": (m * (total >= 4)).sum(axis=(1, 2)),
+    }
+
+
+def legacy(lam: np.ndarray, mu: np.ndarray, probs: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Polja  interface.Prediction  (procenti kao u starom analizatoru):
+      result – 1 / x / 2 ako je najverovatniji ishod ≥ RESULT_MIN, inače
+               dvostruka šansa koja ga pokriva (1x / 2x)
+      pick   – najverovatnije od [1,1x,x,2x,2,gg,ov15,ov25,ov35] čija fer
+               kvota (1/p) je bar MIN_PICK_ODDS; bez takvog – result
+    """
+    single = np.stack([probs["1"], probs["x"], probs["2"]], axis=1)
+    best = single.argmax(axis=1)
+    best_p = single.max(axis=1)
+    double = np.where(probs["1"] >= probs["2"], 0, 1)      # 0 → 1x, 1 → 2x
+    result = np.where(best_p >= RESULT_MIN, np.array(["1", "x", "2"])[best],
+                      np.array(["1x", "2x"])[double])
+    result_p = np.where(best_p >= RESULT_MIN, best_p,
+                        np.where(double == 0, probs["1x"], probs["2x"]))
+
+    candidates = ("1", "1x", "x", "2x", "2", "gg", "ov15", "ov25", "ov35")
+    cand = np.stack([probs[c] for c in candidates], axis=1)
+    eligible = np.where(cand <= 1.0 / MIN_PICK_ODDS, cand, -1.0)
+    pick_i = eligible.argmax(axis=1)
+    pick = np.where(eligible.max(axis=1) >= 0, np.array(candidates)[pick_i], result)
+
+    pct = {k: np.round(v * 100, 2) for k, v in probs.items()}
+    g = np.round(lam + mu, 2)
+    choice = np.round(result_p * 100, 2)
+    return [
+        {"g": float(g[i]), "gg": float(pct["gg"][i]), "ov15": float(pct["ov15"][i]),
+         "ov25": float(pct["ov25"][i]), "ov35": float(pct["ov35"][i]),
+         "choice": float(choice[i]), "result": str(result[i]), "pick": str(pick[i])}
+        for i in range(len(g))
+    ]
@@ -1,90 +1,256 @@
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+from typing import (
+    Any, AsyncIterator, Awaitable, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple,
+)
 
 from .api_football import (
+    get_fixtures,
     get_fixtures_by_date,
     get_odds_by_fixture,
+    get_standings,
     get_team_statistics,
 )
+from .cache import TTLCache
+from .ratelimit import UpstreamUnavailable
 
 # Konfiguriši logger za debug
 logger = logging.getLogger(__name__)
 
+# Povećaj kad se promeni heuristika – sačuvane predikcije stare verzije se ne koriste
+MODEL_VERSION = "points-2"
+
+# Pri istim poenima Elo odlučuje tek kad domaćinov očekivani učinak odstupa od 0.5 bar ovoliko
+ELO_TIEBREAK = 0.1
+
+# Memo u procesu: ključ = fixture + verzija modela + inputs_hash – isti ulazi
+# (poeni, Elo i kvote iz /odds odgovora) koji ulaze i u payload i u bazu.
+# Promenjen ulaz daje nov ključ, pa je TTL samo granica memorije
+MEMO_TTL = float(os.getenv("PREDICTION_MEMO_TTL", "86400"))
+_memo = TTLCache(
+    max_entries=int(os.getenv("PREDICTION_MEMO_MAX_ENTRIES", "20000")),
+    max_bytes=int(os.getenv("PREDICTION_MEMO_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+class PredictionStore(Protocol):
+    """Trajno skladište predikcija (implementacija: prediction_store.py)."""
+
+    async def load(self, hashes: Mapping[int, str]) -> Dict[int, Dict[str, Any]]:
+        """fixture_id → sačuvan payload, samo gde se inputs_hash poklapa."""
+        ...
+
+    async def save(self, rows: Sequence[Tuple[int, str, Dict[str, Any]]]) -> None:
+        """Bulk upis (fixture_id, inputs_hash, payload)."""
+        ...
+
+
+class FormStore(Protocol):
+    """Forma timova iz baze (implementacija: team_form.py)."""
+
+    async def load(self, team_ids: Sequence[int], league: int, season: int) -> Dict[int, Dict[str, Any]]:
+        """team_id → red tabele team_form za (liga, sezona); timova bez reda nema."""
+        ...
+
+
+class RatingStore(Protocol):
+    """Rejting timova u memoriji (implementacija: smartbets_API/elo.py)."""
+
+    def expected(self, home_id: Optional[int], away_id: Optional[int]) -> Optional[float]:
+        """Očekivani učinak domaćina 0–1, O(1); None ako nijedan tim nema rejting."""
+        ...
+
+
+def form_points(row: Mapping[str, Any]) -> int:
+    """Poeni iz forme: 3 po pobedi, 1 po nerešenom, domaćin + gost."""
+    return 3 * (row["home_wins"] + row["away_wins"]) + row["home_draws"] + row["away_draws"]
+
+
+def odds_fingerprint(odds: Sequence[Dict[str, Any]]) -> str:
+    """
+    Otisak cena iz /odds odgovora: samo (kladionica, oklada, selekcija, kvota),
+    sortirano – polje `update` i redosled se menjaju i kad cene stoje.
+    """
+    lines = sorted(
+        (bm.get("id"), bet.get("id"), str(val.get("value")), str(val.get("odd")))
+        for item in odds
+        for bm in item.get("bookmakers", [])
+        for bet in bm.get("bets", [])
+        for val in bet.get("values", [])
+    )
+    return hashlib.sha256(json.dumps(lines).encode()).hexdigest()
+
+
+def memo_key(fixture_id: int, inputs_hash: str) -> str:
+    return f"{fixture_id}:{MODEL_VERSION}:{inputs_hash}"
+
+
+def _remember(key: str, payload: Dict[str, Any]) -> None:
+    _memo.set(key, payload, MEMO_TTL, len(json.dumps(payload, default=str)))
+
+
+def memo_stats() -> Dict[str, Any]:
+    return _memo.stats()
+
+
+def points_table(standings: Dict[str, Any]) -> Dict[int, int]:
+    """
+    Iz /standings odgovora pravi lookup team_id → poeni.
+    Lige sa grupama imaju više tabela; tim se pojavljuje samo u jednoj.
+    """
+    table: Dict[int, int] = {}
+    for item in standings.get("response", []):
+        for group in item.get("league", {}).get("standings", []):
+            for row in group:
+                team_id = row.get("team", {}).get("id")
+                if team_id is not None:
+                    table[team_id] = row.get("points", 0) or 0
+    return table
+
+
 class Predictor:
     def __init__(
         self,
         league: int,
         season: int,
         bookmaker: Optional[int] = None,
+        form: Optional[FormStore] = None,
+        ratings: Optional[RatingStore] = None,
     ):
         """
         :param league: ID lige koju predviđate
         :param season: godina sezone
         :param bookmaker: ID kladionice (opciono)
+        :param form: forma timova iz baze – timovi van tabele se čitaju
+                     odatle pre nego što se ide na /teams/statistics
+        :param ratings: Elo rejting – razrešava utakmice sa istim poenima
         """
         self.league = league
         self.season = season
         self.bookmaker = bookmaker
+        self.form = form
+        self.ratings = ratings
 
-    async def predict_fixture(
+    def tiebreak(self, home_id: Optional[int], away_id: Optional[int]) -> Optional[float]:
+        """Elo očekivanje domaćina kad poeni ne odlučuju; None bez rejtinga."""
+        if self.ratings is None:
+            return None
+        expected = self.ratings.expected(home_id, away_id)
+        return round(expected, 3) if expected is not None else None
+
+    async def load_points(self) -> Optional[Dict[int, int]]:
+        """
+        Jedan /standings poziv za (liga, sezona) → poeni svih timova.
+        None ako liga nema tabelu (kupovi) ili poziv ne uspe – tada
+        fixture_inputs pada nazad na formu i statistiku po timu.
+        """
+        try:
+            table = points_table(await get_standings(self.league, self.season))
+        except Exception as exc:
+            logger.warning(
+                f"Tabela nije dostupna za ligu={self.league}, sezona={self.season}: {exc}"
+            )
+            return None
+        return table or None
+
+    async def _team_points(
+        self,
+        team_id: Optional[int],
+        points: Optional[Mapping[int, int]],
+    ) -> int:
+        if points is not None and team_id in points:
+            return points[team_id]
+
+        if self.form is not None and team_id is not None:
+            try:
+                rows = await self.form.load([team_id], self.league, self.season)
+            except Exception as exc:
+                logger.warning(f"Forma tima {team_id} nije dostupna: {exc}")
+                rows = {}
+            if team_id in rows:
+                return form_points(rows[team_id])
+
+        stats = await get_team_statistics(team_id, self.league, self.season)
+        try:
+            return stats.get("response", [])[0].get("league", {}).get("points", 0)
+        except Exception as exc:
+            logger.debug(f"Greška pri izvlačenju poena: {exc}")
+            return 0
+
+    async def fixture_inputs(
         self,
-        fixture: Dict[str, Any]
+        fixture: Dict[str, Any],
+        points: Optional[Mapping[int, int]] = None,
     ) -> Dict[str, Any]:
         """
-        Predviđa ishod jedne utakmice.
-        Vraća dict sa fixture_id, teams, prediction i odds ili error poljem.
+        Tačni ulazi modela za jednu utakmicu: poeni oba tima (tabela, forma
+        ili /teams/statistics), Elo kad poeni ne odlučuju i kvote kladionice.
+
+        :param points: lookup team_id → poeni (vidi load_points); timovi kojih
+                       nema u njemu čitaju se iz forme pa iz /teams/statistics
         """
         fixture_id = fixture.get("fixture", {}).get("id")
-        home = fixture.get("teams", {}).get("home", {})
-        away = fixture.get("teams", {}).get("away", {})
+        home_id = fixture.get("teams", {}).get("home", {}).get("id")
+        away_id = fixture.get("teams", {}).get("away", {}).get("id")
 
-        try:
-            # Asinhrono preuzmi statistike i kvote
-            stats_home_task = get_team_statistics(
-                home.get("id"), self.league, self.season
-            )
-            stats_away_task = get_team_statistics(
-                away.get("id"), self.league, self.season
-            )
-            odds_task = (
-                get_odds_by_fixture(fixture_id, self.bookmaker)
-                if self.bookmaker is not None
-                else asyncio.sleep(0, result={"response": []})
-            )
-
-            stats_home, stats_away, odds_data = await asyncio.gather(
-                stats_home_task,
-                stats_away_task,
-                odds_task,
-            )
+        # Asinhrono preuzmi poene i kvote
+        odds_task = (
+            get_odds_by_fixture(fixture_id, self.bookmaker)
+            if self.bookmaker is not None
+            else asyncio.sleep(0, result={"response": []})
+        )
+        home_points, away_points, odds_data = await asyncio.gather(
+            self._team_points(home_id, points),
+            self._team_points(away_id, points),
+            odds_task,
+        )
+        return {
+            "home_points": home_points,
+            "away_points": away_points,
+            "elo": self.tiebreak(home_id, away_id) if home_points == away_points else None,
+            "odds": odds_data.get("response", []),
+        }
 
-            # Helper za bezbedno izvlačenje poena iz statistika
-            def extract_points(stats: Dict[str, Any]) -> int:
-                try:
-                    return stats.get("response", [])[0].get("league", {}).get("points", 0)
-                except Exception as exc:
-                    logger.debug(f"Greška pri izvlačenju poena: {exc}")
-                    return 0
-
-            resp_home = extract_points(stats_home)
-            resp_away = extract_points(stats_away)
-
-            # Jednostavan heuristički model
-            if resp_home > resp_away:
-                prediction = "1"
-            elif resp_away > resp_home:
-                prediction = "2"
-            else:
-                prediction = "X"
+    def compute(self, fixture: Dict[str, Any], inputs: Mapping[str, Any]) -> Dict[str, Any]:
+        """Jednostavan heuristički model nad već prikupljenim ulazima."""
+        home = fixture.get("teams", {}).get("home", {})
+        away = fixture.get("teams", {}).get("away", {})
+        expected = inputs["elo"]
+        if inputs["home_points"] > inputs["away_points"]:
+            prediction = "1"
+        elif inputs["away_points"] > inputs["home_points"]:
+            prediction = "2"
+        elif expected is not None and expected >= 0.5 + ELO_TIEBREAK:
+            prediction = "1"
+        elif expected is not None and expected <= 0.5 - ELO_TIEBREAK:
+            prediction = "2"
+        else:
+            prediction = "X"
 
-            return {
-                "fixture_id": fixture_id,
-                "teams": {"home": home, "away": away},
-                "prediction": prediction,
-                "odds": odds_data.get("response", []),
-            }
+        return {
+            "fixture_id": fixture.get("fixture", {}).get("id"),
+            "teams": {"home": home, "away": away},
+            "prediction": prediction,
+            "odds": inputs["odds"],
+        }
 
+    async def predict_fixture(
+        self,
+        fixture: Dict[str, Any],
+        points: Optional[Mapping[int, int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Predviđa ishod jedne utakmice (bez memoizacije).
+        Vraća dict sa fixture_id, teams, prediction i odds ili error poljem.
+        """
+        fixture_id = fixture.get("fixture", {}).get("id")
+        try:
+            return self.compute(fixture, await self.fixture_inputs(fixture, points))
+        except UpstreamUnavailable:
+            raise
         except Exception as exc:
             logger.error(
                 f"Greška u predict_fixture za fixture {fixture_id}: {exc}",
@@ -96,26 +262,123 @@ class Predictor:
                 "error": str(exc)
             }
 
+    def inputs_hash(self, fixture: Dict[str, Any], inputs: Mapping[str, Any]) -> str:
+        """Otisak tačnih ulaza modela za jednu utakmicu (vidi fixture_inputs)."""
+        raw = json.dumps([
+            MODEL_VERSION, self.league, self.season, self.bookmaker,
+            fixture.get("teams", {}).get("home", {}).get("id"),
+            fixture.get("teams", {}).get("away", {}).get("id"),
+            inputs["home_points"], inputs["away_points"], inputs["elo"],
+            odds_fingerprint(inputs["odds"]),
+        ])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def _resolve(
+        self,
+        fixture: Dict[str, Any],
+        points: Optional[Mapping[int, int]],
+        limit: Optional[asyncio.Semaphore] = None,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(ulazi, None) ili (None, poruka greške); limit upstream-a propagira dalje."""
+        try:
+            if limit is None:
+                return await self.fixture_inputs(fixture, points), None
+            async with limit:
+                return await self.fixture_inputs(fixture, points), None
+        except UpstreamUnavailable:
+            raise
+        except Exception as exc:
+            logger.error(
+                f"Greška pri ulazima za fixture {fixture.get('fixture', {}).get('id')}: {exc}",
+                exc_info=True
+            )
+            return None, str(exc)
+
+    async def predict_fixtures(
+        self,
+        fixtures: Sequence[Dict[str, Any]],
+        points: Optional[Mapping[int, int]],
+        store: Optional[PredictionStore] = None,
+        limit: Optional[asyncio.Semaphore] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Predikcije za listu utakmica, u istom redosledu.
+          1. tačni ulazi (fixture_inputs) – timovi iz tabele ne traže ništa
+             od upstream-a, kvote idu kroz keš odgovora
+          2. memo u procesu po inputs_hash-u, pa `store` (baza)
+          3. tek onda se računa
+        Svaki rezultat nosi `memo` – da li je došao iz memoa / baze ili je
+        sveže izračunat.
+
+        :param limit: semafor koji svaka utakmica drži dok prikuplja ulaze –
+                      predict_batch ga deli sa ostalim upstream pozivima
+        """
+        ids = [f["fixture"]["id"] for f in fixtures]
+        resolved = await asyncio.gather(*(self._resolve(f, points, limit) for f in fixtures))
+
+        results: Dict[int, Dict[str, Any]] = {}
+        hashes: Dict[int, str] = {}
+        for f, fixture_id, (inputs, error) in zip(fixtures, ids, resolved):
+            if inputs is None:
+                results[fixture_id] = {"fixture_id": fixture_id, "memo": False, "error": error}
+                continue
+            hashes[fixture_id] = self.inputs_hash(f, inputs)
+            cached = _memo.get(memo_key(fixture_id, hashes[fixture_id]))
+            if cached is not None:
+                results[fixture_id] = {**cached, "memo": True}
+
+        missing = {fid: h for fid, h in hashes.items() if fid not in results}
+        if store is not None and missing:
+            try:
+                stored = await store.load(missing)
+            except Exception as exc:
+                logger.warning(f"Skladište predikcija nije dostupno: {exc}")
+                stored = {}
+            for fixture_id, payload in stored.items():
+                _remember(memo_key(fixture_id, missing[fixture_id]), payload)
+                results[fixture_id] = {**payload, "memo": True}
+
+        fresh = []
+        for f, fixture_id, (inputs, _) in zip(fixtures, ids, resolved):
+            if fixture_id in results:
+                continue
+            payload = self.compute(f, inputs)
+            _remember(memo_key(fixture_id, hashes[fixture_id]), payload)
+            fresh.append((fixture_id, hashes[fixture_id], payload))
+            results[fixture_id] = {**payload, "memo": False}
+
+        if store is not None and fresh:
+            try:
+                await store.save(fresh)
+            except Exception as exc:
+                logger.warning(f"Upis predikcija nije uspeo: {exc}")
+
+        return [results[fixture_id] for fixture_id in ids]
+
     async def predict_by_date(
         self,
-        date: str
+        date: str,
+        store: Optional[PredictionStore] = None,
     ) -> List[Dict[str, Any]]:
         """
         Vraća predikcije za sve utakmice na dati datum.
+        Tabela lige se dohvata jednom i služi za sve utakmice tog dana.
         """
         try:
-            fixtures_resp = await get_fixtures_by_date(
-                date,
-                self.league,
-                self.season
+            fixtures_resp, points = await asyncio.gather(
+                get_fixtures_by_date(
+                    date,
+                    self.league,
+                    self.season
+                ),
+                self.load_points(),
             )
             fixtures = fixtures_resp.get("response", [])
             if not fixtures:
                 logger.info(
                     f"Nema utakmica za {date}, liga={self.league}, sezona={self.season}"
                 )
-            tasks = [self.predict_fixture(f) for f in fixtures]
-            return await asyncio.gather(*tasks)
+            return await self.predict_fixtures(fixtures, points, store)
 
         except Exception as exc:
             logger.error(
@@ -124,3 +387,71 @@ class Predictor:
             )
             # Propagiraj grešku dalje
             raise
+
+
+async def predict_batch(
+    leagues: Sequence[Tuple[int, int]],
+    dates: Sequence[str],
+    bookmaker: Optional[int] = None,
+    concurrency: int = 8,
+    store: Optional[PredictionStore] = None,
+    form: Optional[FormStore] = None,
+    ratings: Optional[RatingStore] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Predikcije za više (liga, sezona) parova i više datuma odjednom.
+
+    Plan upstream poziva pravi se unapred i bez duplikata:
+      • tabela jednom po (liga, sezona)
+      • fixtures jednom po datumu – za više liga jedan poziv bez filtera
+        lige, pa se lokalno deli po (league.id, league.season)
+    Svi pozivi idu paralelno, ali najviše `concurrency` istovremeno – i
+    ulazi pojedinačnih utakmica, ne samo pozivi po grupi.
+    Rezultat stiže grupisan po (liga, datum), grupa čim je gotova.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    leagues = list(dict.fromkeys(leagues))
+    dates = list(dict.fromkeys(dates))
+
+    async def bounded(aw: Awaitable[Any]) -> Any:
+        async with sem:
+            return await aw
+
+    predictors = {ls: Predictor(league=ls[0], season=ls[1], bookmaker=bookmaker,
+                                form=form, ratings=ratings)
+                  for ls in leagues}
+    points_tasks = {ls: asyncio.ensure_future(bounded(p.load_points()))
+                    for ls, p in predictors.items()}
+
+    if len(leagues) == 1:
+        (league, season), = leagues
+        fixtures_tasks = {d: asyncio.ensure_future(bounded(get_fixtures(d, league, season)))
+                          for d in dates}
+    else:
+        fixtures_tasks = {d: asyncio.ensure_future(bounded(get_fixtures(d))) for d in dates}
+
+    async def group(league: int, season: int, date: str) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"league": league, "season": season, "date": date}
+        try:
+            payload = await asyncio.shield(fixtures_tasks[date])
+        except Exception as exc:
+            logger.error(f"Greška pri dohvatanju utakmica za {date}: {exc}")
+            return {**record, "predictions": [], "error": str(exc)}
+
+        fixtures = [
+            f for f in payload.get("response", [])
+            if f.get("league", {}).get("id") == league
+            and f.get("league", {}).get("season") == season
+        ]
+        points = await asyncio.shield(points_tasks[(league, season)])
+        predictor = predictors[(league, season)]
+        record["predictions"] = await predictor.predict_fixtures(fixtures, points, store, sem)
+        return record
+
+    groups = [asyncio.ensure_future(group(l, s, d)) for (l, s) in leagues for d in dates]
+    try:
+        for next_done in asyncio.as_completed(groups):
+            yield await next_done
+    finally:
+        for task in [*groups, *points_tasks.values(), *fixtures_tasks.values()]:
+            task.cancel()
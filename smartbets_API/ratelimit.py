@@ -0,0 +1,222 @@
+"""
+ratelimit.py
+────────────
+Token-bucket limiter za API-Football kvote (po minutu i po danu).
+
+• kapacitet i preostali budžet uči iz `x-ratelimit-*` zaglavlja odgovora
+• kada nema tokena, zahtevi čekaju u redu umesto da dobiju 429
+• dve trake prioriteta: INTERACTIVE (ruteri) uvek ide pre BULK posla
+  (fixtures_loader…), a BULK ne sme da potroši rezervu namenjenu
+  interaktivnom saobraćaju – ni u minutu ni u danu
+• traka se bira kontekstom:  `with priority(BULK): ...`
+"""
+
+import asyncio
+import datetime as dt
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+INTERACTIVE = 0
+BULK        = 1
+LANES       = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+_lane: ContextVar[int] = ContextVar("upstream_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(lane: int) -> Iterator[None]:
+    """Svi upstream pozivi unutar bloka (i taskova kreiranih u njemu) idu datom trakom."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> int:
+    return _lane.get()
+
+
+def _next_utc_midnight() -> float:
+    now = dt.datetime.now(dt.timezone.utc)
+    midnight = (now + dt.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return time.time() + (midnight - now).total_seconds()
+
+
+class UpstreamUnavailable(Exception):
+    """Upstream trenutno ne prima zahteve; retry_after = sekunde do sledećeg pokušaja."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(int(retry_after + 0.999), 1)
+
+
+class QuotaExhausted(UpstreamUnavailable):
+    """Dnevna kvota je potrošena – nema smisla čekati do resetovanja."""
+
+    def __init__(self, message: str):
+        super().__init__(message, _next_utc_midnight() - time.time())
+
+
+class UpstreamThrottled(UpstreamUnavailable):
+    """API je odbio zahtev zbog limita i posle svih ponovljenih pokušaja."""
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class QuotaLimiter:
+
+    def __init__(self, per_minute: int = 30, per_day: Optional[int] = None,
+                 bulk_reserve: float = 0.2):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.bulk_reserve = bulk_reserve
+        self.tokens = float(per_minute)
+        self.day_remaining: Optional[int] = None
+        self._day_reset_at = _next_utc_midnight()
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0            # posle 429 / Retry-After
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._seq = itertools.count()
+        self._pump: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.granted = {lane: 0 for lane in LANES}
+        self.queued = {lane: 0 for lane in LANES}
+        self.throttled = 0                   # 429 / rateLimit odgovori
+
+    # ── token accounting ──────────────────────────────────────────────────────
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(float(self.per_minute),
+                          self.tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+        if time.time() >= self._day_reset_at:
+            self.day_remaining = None
+            self._day_reset_at = _next_utc_midnight()
+
+    def _minute_floor(self, lane: int) -> float:
+        if lane != BULK:
+            return 0.0
+        return max(0.0, min(self.per_minute * self.bulk_reserve, self.per_minute - 1.0))
+
+    def _day_floor(self, lane: int) -> int:
+        if lane != BULK or not self.per_day:
+            return 0
+        return int(self.per_day * self.bulk_reserve)
+
+    def _can_take(self, lane: int) -> bool:
+        if time.monotonic() < self._blocked_until:
+            return False
+        if self.day_remaining is not None and self.day_remaining <= self._day_floor(lane):
+            return False
+        return self.tokens - 1 >= self._minute_floor(lane)
+
+    def _take(self, lane: int) -> None:
+        self.tokens -= 1
+        if self.day_remaining is not None:
+            self.day_remaining -= 1
+        self.granted[lane] += 1
+
+    def _check_day(self, lane: int) -> None:
+        if self.day_remaining is not None and self.day_remaining <= self._day_floor(lane):
+            raise QuotaExhausted(
+                f"dnevna kvota API-Football-a je potrošena za traku '{LANES[lane]}'")
+
+    # ── public API ────────────────────────────────────────────────────────────
+    async def acquire(self, lane: Optional[int] = None) -> None:
+        lane = current_lane() if lane is None else lane
+        self._refill()
+        self._check_day(lane)
+
+        # preko reda se ide samo ako niko iste ili više trake ne čeka
+        if (not self._waiters or self._waiters[0][0] > lane) and self._can_take(lane):
+            self._take(lane)
+            return
+
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), fut))
+        self.queued[lane] += 1
+        if self._pump is None or self._pump.done():
+            self._wakeup = asyncio.Event()
+            self._pump = asyncio.ensure_future(self._run_pump())
+        elif self._wakeup is not None:
+            self._wakeup.set()              # novi čekalac možda ima viši prioritet
+        await fut
+
+    async def _run_pump(self) -> None:
+        """Deli tokene čekaocima po redu (traka, pa FIFO) kako se dopunjavaju."""
+        while self._waiters:
+            self._refill()
+            lane, _, fut = self._waiters[0]
+            if fut.done():                      # pozivalac otkazan dok je čekao
+                heapq.heappop(self._waiters)
+                continue
+            if self.day_remaining is not None and self.day_remaining <= self._day_floor(lane):
+                heapq.heappop(self._waiters)
+                fut.set_exception(QuotaExhausted(
+                    f"dnevna kvota API-Football-a je potrošena za traku '{LANES[lane]}'"))
+                continue
+            if self._can_take(lane):
+                heapq.heappop(self._waiters)
+                self._take(lane)
+                fut.set_result(None)
+                continue
+            wait = max(self._blocked_until - time.monotonic(),
+                       (self._minute_floor(lane) + 1 - self.tokens) * 60.0 / self.per_minute,
+                       0.01)
+            assert self._wakeup is not None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Uskladi lokalno stanje sa onim što API javlja u zaglavljima."""
+        self._refill()
+        minute_limit = _int_header(headers, "x-ratelimit-limit")
+        minute_left  = _int_header(headers, "x-ratelimit-remaining")
+        day_limit    = _int_header(headers, "x-ratelimit-requests-limit")
+        day_left     = _int_header(headers, "x-ratelimit-requests-remaining")
+
+        if minute_limit:
+            self.per_minute = minute_limit
+        if minute_left is not None:
+            # server je autoritet – lokalni račun sme biti samo pesimističniji
+            self.tokens = min(self.tokens, float(minute_left))
+        if day_limit:
+            self.per_day = day_limit
+        if day_left is not None:
+            self.day_remaining = day_left
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """API je odbio zahtev zbog limita – isprazni bucket i pauziraj."""
+        self.throttled += 1
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+        self._blocked_until = time.monotonic() + (retry_after if retry_after else 60.0 / self.per_minute)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "per_minute":     self.per_minute,
+            "per_day":        self.per_day,
+            "tokens":         round(self.tokens, 2),
+            "day_remaining":  self.day_remaining,
+            "bulk_reserve":   self.bulk_reserve,
+            "waiting":        {LANES[l]: sum(1 for w in self._waiters if w[0] == l and not w[2].done())
+                               for l in LANES},
+            "granted":        {LANES[l]: n for l, n in self.granted.items()},
+            "queued":         {LANES[l]: n for l, n in self.queued.items()},
+            "throttled":      self.throttled,
+        }
@@ -0,0 +1,42 @@
+"""
+singleflight.py
+───────────────
+Spajanje istovremenih identičnih poziva: dok je upit za neki ključ u toku,
+svi ostali pozivaoci sa istim ključem čekaju njegov rezultat umesto da
+šalju svoj upstream zahtev.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.leaders = 0        # pozivi koji su zaista otišli upstream
+        self.coalesced = 0      # pozivi koji su dobili tuđi rezultat
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # shield: otkazivanje jednog pozivaoca ne otkazuje zajednički zahtev
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: "asyncio.Future[Any]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()    # ako su svi pozivaoci otkazani, greška nije "izgubljena"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders":   self.leaders,
+            "coalesced": self.coalesced,
+        }
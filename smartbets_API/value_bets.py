@@ -0,0 +1,197 @@
+"""
+value_bets.py
+─────────────
+Skener value opklada: kvote svih kladionica za dan naspram verovatnoća modela.
+
+• flatten(): ugnježdeni /odds odgovor (fixture → bookmakers → bets → values)
+  u kolone – jedan red po ceni koju model ume da oceni
+• implied(): implicitna verovatnoća 1/kvota, marža (overround) po tržištu
+  (fixture × kladionica × oklada × linija) i verovatnoća bez marže – sve
+  preko  np.unique + bincount, bez petlje po tržištu
+• scan(): edge = p_modela · kvota − 1; redovi iznad praga, najveći edge prvi
+• verovatnoće modela su ključevi  poisson.MARKETS  (1, x, 2, 1x … ov35)
+• rated(): samo utakmice koje model stvarno poznaje – liga bez istorije ili
+  tim sa premalo mečeva dobija podrazumevane snage (λ = μ ≈ prosek), a to
+  daje lažan edge naspram kvota
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .poisson import MARKETS as KEYS, PoissonModel
+
+MIN_GAMES = 5                       # fitovanih utakmica po timu da bi model ocenio meč
+
+# tržište: (ime, broj selekcija, zbir fer verovatnoća) – dvostruka šansa pokriva svaki ishod dvaput
+MARKETS: List[Tuple[str, int, float]] = [
+    ("match_winner",   3, 1.0),
+    ("double_chance",  3, 2.0),
+    ("btts",           2, 1.0),
+    ("over_under_1.5", 2, 1.0),
+    ("over_under_2.5", 2, 1.0),
+    ("over_under_3.5", 2, 1.0),
+]
+
+# (bet_id, value) → (tržište, ključ modela, komplement)
+SELECTIONS: Dict[Tuple[int, str], Tuple[int, str, bool]] = {
+    (1, "Home"): (0, "1", False),
+    (1, "Draw"): (0, "x", False),
+    (1, "Away"): (0, "2", False),
+    (12, "Home/Draw"): (1, "1x", False),
+    (12, "Draw/Away"): (1, "2x", False),
+    (12, "Home/Away"): (1, "12", False),
+    (8, "Yes"): (2, "gg", False),
+    (8, "No"):  (2, "gg", True),
+    (5, "Over 1.5"):  (3, "ov15", False),
+    (5, "Under 1.5"): (3, "ov15", True),
+    (5, "Over 2.5"):  (4, "ov25", False),
+    (5, "Under 2.5"): (4, "ov25", True),
+    (5, "Over 3.5"):  (5, "ov35", False),
+    (5, "Under 3.5"): (5, "ov35", True),
+}
+_KEY_INDEX = {k: i for i, k in enumerate(KEYS)}
+
+
+class OddsColumns:
+    """Kolone cena; imena kladionica i selekcija su u rečnicima / listi labela."""
+
+    def __init__(self, fixture_id: np.ndarray, bookmaker_id: np.ndarray, market: np.ndarray,
+                 key: np.ndarray, complement: np.ndarray, odd: np.ndarray,
+                 labels: List[str], bookmakers: Dict[int, str]):
+        self.fixture_id = fixture_id
+        self.bookmaker_id = bookmaker_id
+        self.market = market
+        self.key = key                      # indeks u KEYS
+        self.complement = complement
+        self.odd = odd
+        self.labels = labels                # originalna selekcija, po redu
+        self.bookmakers = bookmakers
+
+    def __len__(self) -> int:
+        return len(self.odd)
+
+
+def flatten(items: Iterable[Dict[str, Any]], bookmaker: Optional[int] = None) -> OddsColumns:
+    fixture_id: List[int] = []
+    bookmaker_id: List[int] = []
+    sel: List[Tuple[int, str, bool]] = []
+    odd: List[float] = []
+    labels: List[str] = []
+    names: Dict[int, str] = {}
+    for item in items:
+        fid = (item.get("fixture") or {}).get("id")
+        if fid is None:
+            continue
+        for bm in item.get("bookmakers", []):
+            if bookmaker is not None and bm.get("id") != bookmaker:
+                continue
+            names[bm["id"]] = bm.get("name") or ""
+            for bet in bm.get("bets", []):
+                for val in bet.get("values", []):
+                    found = SELECTIONS.get((bet.get("id"), str(val.get("value"))))
+                    if found is None:
+                        continue
+                    try:
+                        price = float(val.get("odd"))
+                    except (TypeError, ValueError):
+                        continue
+                    if price <= 1.0:
+                        continue
+                    fixture_id.append(fid)
+                    bookmaker_id.append(bm["id"])
+                    sel.append(found)
+                    odd.append(price)
+                    labels.append(f"{bet.get('name')}: {val.get('value')}")
+    return OddsColumns(
+        np.array(fixture_id, dtype=np.int64),
+        np.array(bookmaker_id, dtype=np.int64),
+        np.array([s[0] for s in sel], dtype=np.int8),
+        np.array([_KEY_INDEX[s[1]] for s in sel], dtype=np.int8),
+        np.array([s[2] for s in sel], dtype=bool),
+        np.array(odd, dtype=np.float64),
+        labels, names,
+    )
+
+
+def implied(c: OddsColumns) -> Dict[str, np.ndarray]:
+    """
+    Po redu: implicitna verovatnoća, marža njegovog tržišta i verovatnoća
+    bez marže.  Nepotpuno tržište (npr. samo „Over 2.5“) nema maržu (NaN).
+    """
+    p = 1.0 / c.odd
+    if not len(c):
+        return {"implied": p, "overround": p.copy(), "fair": p.copy()}
+    # (fixture, kladionica, tržište) spakovano u jedan int64 – 1-D unique je brz
+    bm_ids, bm = np.unique(c.bookmaker_id, return_inverse=True)
+    key = (c.fixture_id * len(bm_ids) + bm.ravel()) * len(MARKETS) + c.market
+    _, inv, counts = np.unique(key, return_inverse=True, return_counts=True)
+    inv = inv.ravel()
+    total = np.bincount(inv, p)
+    sizes = np.array([n for _, n, _ in MARKETS])[c.market]
+    fair_sum = np.array([s for _, _, s in MARKETS])[c.market]
+    complete = counts[inv] == sizes
+    overround = np.where(complete, total[inv] / fair_sum, np.nan)
+    return {"implied": p, "overround": overround, "fair": p / overround}
+
+
+def rated(model: PoissonModel, home: np.ndarray, away: np.ndarray,
+          min_games: int = MIN_GAMES) -> np.ndarray:
+    """Maska utakmica sa istorijom lige i bar min_games fitovanih mečeva oba tima."""
+    if model.fixtures == 0:
+        return np.zeros(len(home), bool)
+    return np.minimum(model.games_played(home), model.games_played(away)) >= min_games
+
+
+def model_probabilities(c: OddsColumns, fixture_ids: np.ndarray,
+                        probs: Mapping[str, np.ndarray]) -> np.ndarray:
+    """
+    Verovatnoća modela za svaki red: matrica (utakmice × KEYS), red preko
+    searchsorted po fixture id-u, kolona po ključu; komplement = 1 − p.
+    NaN za utakmice koje model nije ocenio.
+    """
+    out = np.full(len(c), np.nan)
+    if not len(c) or not len(fixture_ids):
+        return out
+    matrix = np.stack([probs[k] for k in KEYS], axis=1)
+    order = np.argsort(fixture_ids)
+    sorted_ids = fixture_ids[order]
+    pos = np.clip(np.searchsorted(sorted_ids, c.fixture_id), 0, len(sorted_ids) - 1)
+    known = sorted_ids[pos] == c.fixture_id
+    p = matrix[order[pos], c.key]
+    p = np.where(c.complement, 1.0 - p, p)
+    out[known] = p[known]
+    return out
+
+
+def scan(c: OddsColumns, fixture_ids: np.ndarray, probs: Mapping[str, np.ndarray],
+         min_edge: float = 0.05, min_prob: float = 0.0) -> Iterator[Dict[str, Any]]:
+    """Selekcije sa edge ≥ min_edge (i p_modela ≥ min_prob), najveći edge prvi."""
+    model = model_probabilities(c, fixture_ids, probs)
+    imp = implied(c)
+    edge = model * c.odd - 1.0
+    hits = np.flatnonzero(np.nan_to_num(edge, nan=-1.0) >= min_edge)
+    hits = hits[model[hits] >= min_prob]
+    hits = hits[np.argsort(-edge[hits], kind="stable")]
+    # kolone izlaza u Python tipove jednom za sve pogotke, ne po redu
+    overround = imp["overround"][hits]
+    fair = np.where(np.isnan(overround), None, np.round(imp["fair"][hits], 4)).tolist()
+    overround = np.where(np.isnan(overround), None, np.round(overround, 4)).tolist()
+    names = [m[0] for m in MARKETS]
+    for i, fid, bm, market, odd, p_imp, p_fair, over, p_model, e in zip(
+        hits.tolist(), c.fixture_id[hits].tolist(), c.bookmaker_id[hits].tolist(),
+        c.market[hits].tolist(), c.odd[hits].tolist(), np.round(imp["implied"][hits], 4).tolist(),
+        fair, overround, np.round(model[hits], 4).tolist(), np.round(edge[hits], 4).tolist(),
+    ):
+        yield {
+            "fixture_id": fid,
+            "bookmaker":  {"id": bm, "name": c.bookmakers.get(bm)},
+            "market":     names[market],
+            "selection":  c.labels[i],
+            "odd":        odd,
+            "implied":    p_imp,
+            "fair":       p_fair,
+            "overround":  over,
+            "model":      p_model,
+            "edge":       e,
+        }
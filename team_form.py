@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+team_form.py
+────────────
+Forma timova (tabela  team_form  iz db_init.py) izvedena iz završenih fixtures.
+
+• osvežava se inkrementalno: save_fixtures posle svakog upisa preračuna samo
+  timove koje je ta serija dotakla (indeksi home_id / away_id na fixtures)
+• po (tim, liga, sezona): odigrano / W / D / L, golovi za i protiv,
+  clean sheet, bez gola, BTTS – sve podeljeno na domaćin / gost –
+  i string zadnjih FORM_LENGTH ishoda; sve po rezultatu posle 90 minuta
+• čita se jednim lookup-om po primarnom ključu (TeamFormStore) – za
+  Predictor i /teams/{id}/statistics umesto upstream /teams/statistics
+• prva izgradnja nad postojećom bazom:   python team_form.py
+"""
+
+import datetime as dt
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from db_async import run_sync
+from db_init import engine, FORM_STATS, fixtures as fixtures_t, team_form as team_form_t
+
+FORM_LENGTH = int(os.getenv("TEAM_FORM_LENGTH", "5"))
+FINISHED    = ("FT", "AET", "PEN")
+BATCH       = 500
+
+_COUNTS = {
+    "played":          "TRUE",
+    "wins":            "gf > ga",
+    "draws":           "gf = ga",
+    "losses":          "gf < ga",
+    "clean_sheets":    "ga = 0",
+    "failed_to_score": "gf = 0",
+    "btts":            "gf > 0 AND ga > 0",
+}
+_SUMS = {"goals_for": "gf", "goals_against": "ga"}
+
+
+def _aggregate(side: str, stat: str) -> str:
+    where = "is_home" if side == "home" else "NOT is_home"
+    if stat in _SUMS:
+        return f"COALESCE(sum({_SUMS[stat]}) FILTER (WHERE {where}), 0)"
+    return f"count(*) FILTER (WHERE {where} AND {_COUNTS[stat]})"
+
+
+_COLUMNS = [f"{side}_{stat}" for side in ("home", "away") for stat in FORM_STATS]
+
+# rezultat posle 90 minuta – kao backtest, Poisson i Elo; konačan samo gde ft nema
+HOME_GOALS = "COALESCE(ft_home, home_goals)"
+AWAY_GOALS = "COALESCE(ft_away, away_goals)"
+
+# jedna set-based naredba za sve dotaknute timove; ishod iz ugla tima (gf / ga)
+REFRESH_SQL = text(f"""
+WITH games AS (
+    SELECT home_id AS team_id, league_id, season, TRUE AS is_home, date_utc, id,
+           {HOME_GOALS} AS gf, {AWAY_GOALS} AS ga
+      FROM public.fixtures
+     WHERE home_id = ANY(:teams) AND status_short = ANY(:finished)
+    UNION ALL
+    SELECT away_id, league_id, season, FALSE, date_utc, id,
+           {AWAY_GOALS}, {HOME_GOALS}
+      FROM public.fixtures
+     WHERE away_id = ANY(:teams) AND status_short = ANY(:finished)
+)
+INSERT INTO public.team_form (team_id, league_id, season, {", ".join(_COLUMNS)},
+                              form, last_match_at, updated_at)
+SELECT team_id, league_id, season,
+       {", ".join(_aggregate(side, stat) for side in ("home", "away") for stat in FORM_STATS)},
+       right(string_agg(CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END, ''
+                        ORDER BY date_utc, id), :form_length),
+       max(date_utc),
+       :now
+  FROM games
+ WHERE league_id IS NOT NULL AND season IS NOT NULL AND gf IS NOT NULL AND ga IS NOT NULL
+ GROUP BY team_id, league_id, season
+ ORDER BY team_id, league_id, season
+ON CONFLICT (team_id, league_id, season) DO UPDATE SET
+       {", ".join(f"{c} = EXCLUDED.{c}" for c in _COLUMNS)},
+       form = EXCLUDED.form, last_match_at = EXCLUDED.last_match_at,
+       updated_at = EXCLUDED.updated_at
+""")
+
+
+def touched_teams(raws: Iterable[Dict[str, Any]]) -> List[int]:
+    """Timovi iz serije fixtura čija je utakmica završena – samo njima se forma menja."""
+    teams = set()
+    for raw in raws:
+        status = ((raw.get("fixture") or {}).get("status") or {}).get("short")
+        if status in FINISHED:
+            for side in ("home", "away"):
+                team_id = ((raw.get("teams") or {}).get(side) or {}).get("id")
+                if team_id is not None:
+                    teams.add(team_id)
+    return sorted(teams)
+
+
+def refresh_team_form(conn: Connection, team_ids: Sequence[int]) -> int:
+    """
+    Preračunava formu datih timova (sve njihove lige i sezone) u tekućoj
+    transakciji.  Upsert, a ne DELETE + INSERT: loader upisuje više datuma
+    paralelno i isti tim može da se osvežava iz dve transakcije odjednom.
+    Red koji ovaj prolaz nije dotakao (npr. poništen rezultat) se briše.
+    """
+    if not team_ids:
+        return 0
+    teams = sorted(team_ids)
+    now = dt.datetime.utcnow()
+    rows = conn.execute(REFRESH_SQL, {"teams": teams, "finished": list(FINISHED),
+                                      "form_length": FORM_LENGTH, "now": now}).rowcount
+    conn.execute(team_form_t.delete()
+                 .where(team_form_t.c.team_id.in_(teams))
+                 .where(team_form_t.c.updated_at < now))
+    return rows
+
+
+def totals(row: Dict[str, Any]) -> Dict[str, int]:
+    """Zbir domaćin + gost za svaku statistiku."""
+    return {stat: row[f"home_{stat}"] + row[f"away_{stat}"] for stat in FORM_STATS}
+
+
+def form_statistics(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Red iz team_form → oblik /teams/statistics odgovora (+ btts, kog upstream nema)."""
+    total = totals(row)
+
+    def split(stat: str) -> Dict[str, int]:
+        return {"home": row[f"home_{stat}"], "away": row[f"away_{stat}"], "total": total[stat]}
+
+    return {
+        "league":   {"id": row["league_id"], "season": row["season"]},
+        "team":     {"id": row["team_id"]},
+        "form":     row["form"],
+        "fixtures": {"played": split("played"), "wins": split("wins"),
+                     "draws": split("draws"), "loses": split("losses")},
+        "goals": {
+            "for":     {"total": split("goals_for")},
+            "against": {"total": split("goals_against")},
+        },
+        "clean_sheet":     split("clean_sheets"),
+        "failed_to_score": split("failed_to_score"),
+        "btts":            split("btts"),
+        "last_match_at":   row["last_match_at"].isoformat() if row["last_match_at"] else None,
+    }
+
+
+def load_team_form(conn: Connection, team_ids: Sequence[int], league: int,
+                   season: int) -> Dict[int, Dict[str, Any]]:
+    """team_id → red team_form; sinhrono (async ruteri: conn.run_sync(load_team_form, …))."""
+    rows = conn.execute(
+        select(team_form_t)
+        .where(team_form_t.c.team_id.in_(list(team_ids)))
+        .where(team_form_t.c.league_id == league)
+        .where(team_form_t.c.season == season)
+    ).mappings().all()
+    return {r["team_id"]: dict(r) for r in rows}
+
+
+class TeamFormStore:
+
+    async def load(self, team_ids: Sequence[int], league: int, season: int) -> Dict[int, Dict[str, Any]]:
+        if not team_ids:
+            return {}
+        return await run_sync(load_team_form, list(team_ids), league, season)
+
+
+def get_form_store() -> Optional[TeamFormStore]:
+    """None kad baza nije konfigurisana (DATABASE_URL)."""
+    return TeamFormStore() if engine is not None else None
+
+
+def rebuild() -> int:
+    """Puna izgradnja: svi timovi koji imaju završen meč, u serijama od BATCH timova."""
+    with engine.connect() as conn:
+        teams = sorted(set(conn.execute(
+            select(fixtures_t.c.home_id).where(fixtures_t.c.status_short.in_(FINISHED))
+            .union(select(fixtures_t.c.away_id).where(fixtures_t.c.status_short.in_(FINISHED)))
+        ).scalars()) - {None})
+    rows = 0
+    for i in range(0, len(teams), BATCH):
+        with engine.begin() as conn:
+            rows += refresh_team_form(conn, teams[i:i + BATCH])
+    return rows
+
+
+if __name__ == "__main__":
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    print(f"✓ team_form: {rebuild()} redova (liga × sezona × tim)")
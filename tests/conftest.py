@@ -0,0 +1,6 @@
+import os
+import sys
+
+# smartbets_API.api_football traži ključ pri uvozu; testovi ne zovu upstream
+os.environ.setdefault("API_FOOTBALL_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
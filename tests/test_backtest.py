@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from smartbets_API.backtest import (
+    AWAY, DRAW, HOME, FixtureArrays, evaluate, home_model, market_model,
+    points_before, points_model, regulation_goals,
+)
+
+
+def _arrays(rows, odds=None):
+    """rows: (fixture_id, liga, sezona, timestamp, domaćin, gost, golovi d., golovi g.)"""
+    cols = np.array(rows, dtype=np.float64).T
+    return FixtureArrays(cols[0].astype(np.int64), cols[1].astype(np.int64), cols[2].astype(np.int64),
+                         cols[3].astype(np.int64), cols[4].astype(np.int64), cols[5].astype(np.int64),
+                         cols[6], cols[7], None if odds is None else np.array(odds, dtype=np.float64))
+
+
+def test_regulation_goals_prefers_90_minute_score():
+    ft = np.array([1.0, np.nan, 0.0])
+    goals = np.array([2.0, 3.0, 1.0])
+    assert regulation_goals(ft, goals).tolist() == [1.0, 3.0, 0.0]
+
+
+def test_outcome_from_goals():
+    a = _arrays([(1, 1, 2024, 10, 1, 2, 2, 0),
+                 (2, 1, 2024, 20, 1, 2, 1, 1),
+                 (3, 1, 2024, 30, 1, 2, 0, 3)])
+    assert a.outcome.tolist() == [HOME, DRAW, AWAY]
+
+
+def test_points_before_excludes_the_match_itself():
+    a = _arrays([
+        (1, 1, 2024, 10, 1, 2, 2, 0),     # 1 pobeđuje
+        (2, 1, 2024, 20, 2, 3, 1, 1),     # 2 – 3 nerešeno
+        (3, 1, 2024, 30, 3, 1, 0, 1),     # 1 pobeđuje u gostima
+        (4, 1, 2024, 40, 1, 2, 0, 0),
+    ])
+    home, away = points_before(a)
+    assert home.tolist() == [0, 0, 1, 6]
+    assert away.tolist() == [0, 0, 3, 1]
+
+
+def test_points_before_ignores_input_order():
+    rows = [(1, 1, 2024, 10, 1, 2, 2, 0), (2, 1, 2024, 20, 1, 2, 0, 1), (3, 1, 2024, 30, 2, 1, 1, 1)]
+    ordered = points_before(_arrays(rows))
+    shuffled = points_before(_arrays([rows[2], rows[0], rows[1]]))
+    assert [x.tolist() for x in ordered] == [x.tolist() for x in shuffled]
+
+
+def test_points_reset_per_league_and_season():
+    a = _arrays([
+        (1, 1, 2023, 10, 1, 2, 3, 0),
+        (2, 1, 2024, 20, 1, 2, 0, 0),     # nova sezona
+        (3, 2, 2024, 30, 1, 3, 0, 0),     # isti tim u drugom takmičenju
+        (4, 1, 2024, 40, 2, 1, 0, 0),
+    ])
+    home, away = points_before(a)
+    assert home.tolist() == [0, 0, 0, 1]
+    assert away.tolist() == [0, 0, 0, 1]
+
+
+def test_points_model_picks_higher_table_position():
+    a = _arrays([(1, 1, 2024, 10, 1, 2, 1, 0), (2, 1, 2024, 20, 2, 1, 0, 0)])
+    assert points_model(a).argmax(axis=1).tolist() == [DRAW, AWAY]
+
+
+def test_evaluate_hit_rate_roi_and_log_loss():
+    a = _arrays([(1, 1, 2024, 10, 1, 2, 1, 0),
+                 (2, 1, 2024, 20, 3, 4, 0, 2)],
+                odds=[[2.0, 3.0, 4.0], [1.5, 4.0, 6.0]])
+    report = evaluate(home_model, a)["total"]
+    assert report["fixtures"] == 2
+    assert report["hit_rate"] == 0.5
+    assert report["bets"] == 2
+    assert report["roi"] == pytest.approx((1.0 - 1.0) / 2)
+    assert report["log_loss"] == pytest.approx(round(-(np.log(0.5) + np.log(0.25)) / 2, 4))
+
+
+def test_evaluate_skips_unpriced_bets_and_splits_by_league():
+    a = _arrays([(1, 1, 2024, 10, 1, 2, 1, 0),
+                 (2, 2, 2024, 20, 3, 4, 1, 0)],
+                odds=[[2.5, 3.0, 3.0], [np.nan, np.nan, np.nan]])
+    report = evaluate(home_model, a)
+    assert report["total"]["bets"] == 1
+    assert report["total"]["roi"] == pytest.approx(1.5)
+    assert report["leagues"][2]["roi"] is None
+    assert report["leagues"][1]["hit_rate"] == 1.0
+
+
+def test_market_model_removes_margin_and_falls_back_to_uniform():
+    a = _arrays([(1, 1, 2024, 10, 1, 2, 1, 0), (2, 1, 2024, 20, 3, 4, 1, 0)],
+                odds=[[2.0, 3.5, 4.0], [np.nan, 3.0, 3.0]])
+    probs = market_model(a)
+    assert np.allclose(probs.sum(axis=1), 1.0)
+    assert probs[0].argmax() == HOME
+    assert np.allclose(probs[1], 1 / 3)
+
+
+def test_evaluate_empty():
+    a = _arrays(np.empty((0, 8)))
+    assert evaluate(home_model, a, by_league=False) == {
+        "total": {"fixtures": 0, "hit_rate": None, "bets": 0, "roi": None, "log_loss": None}}
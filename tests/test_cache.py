@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from smartbets_API import cache
+from smartbets_API.cache import SQLiteCache, TTLCache, TieredCache, make_key
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    # samo sat modula keša – event loop i dalje ide po pravom vremenu
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=c, time=c))
+    return c
+
+
+def test_make_key_ignores_order_and_none():
+    assert make_key("/fixtures", {"b": 2, "a": 1, "c": None}) == make_key("/fixtures", {"a": 1, "b": 2})
+    assert make_key("/fixtures", {"c": None}) == "/fixtures"
+
+
+def test_entry_expires_after_ttl(clock):
+    c = TTLCache()
+    c.set("k", {"v": 1}, ttl=10, size=10)
+    clock.now += 9.9
+    assert c.get("k") == {"v": 1}
+    clock.now += 0.1
+    assert c.get("k") is None
+    assert len(c) == 0
+    assert c.stats()["expired"] == 1
+    assert c.stats()["bytes"] == 0
+
+
+def test_lru_eviction_by_entries(clock):
+    c = TTLCache(max_entries=2)
+    c.set("a", 1, 60, 1)
+    c.set("b", 2, 60, 1)
+    c.get("a")                      # "b" je sada najstariji
+    c.set("c", 3, 60, 1)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_byte_cap_evicts_and_rejects_oversized(clock):
+    c = TTLCache(max_bytes=100)
+    c.set("a", 1, 60, 60)
+    c.set("b", 2, 60, 60)
+    assert c.get("a") is None and c.get("b") == 2
+    assert c.stats()["bytes"] == 60
+    c.set("huge", 3, 60, 101)
+    assert c.get("huge") is None
+    assert c.get("b") == 2
+
+
+def test_replacing_key_keeps_byte_count(clock):
+    c = TTLCache()
+    c.set("a", 1, 60, 40)
+    c.set("a", 2, 60, 10)
+    assert c.get("a") == 2
+    assert c.stats()["bytes"] == 10
+
+
+def test_stats_hit_ratio(clock):
+    c = TTLCache()
+    assert c.stats()["hit_ratio"] is None
+    c.set("a", 1, 60, 1)
+    c.get("a")
+    c.get("missing")
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_zero_ttl_is_not_stored(clock):
+    c = TTLCache()
+    c.set("a", 1, 0, 1)
+    assert len(c) == 0
+
+
+def _tiered(tmp_path):
+    return TieredCache(TTLCache(), SQLiteCache(str(tmp_path / "cache.sqlite")))
+
+
+def test_shared_tier_survives_local_clear(clock, tmp_path):
+    t = _tiered(tmp_path)
+    t.set("k", {"response": [1, 2]}, 60, 20)
+    t.local.clear()
+    assert t.get("k") == {"response": [1, 2]}
+    assert t.local.get("k") == {"response": [1, 2]}
+
+
+def test_async_l2_hit_is_promoted_with_remaining_ttl(clock, tmp_path):
+    t = _tiered(tmp_path)
+    other = _tiered(tmp_path)       # drugi worker, isti fajl
+
+    async def run():
+        await other.aset("k", [1], 60, 5)
+        clock.now += 45
+        return await t.aget("k")
+
+    assert asyncio.run(run()) == [1]
+    assert t.shared.stats()["hits"] == 1
+    clock.now += 14
+    assert t.local.get("k") == [1]
+    clock.now += 1                  # isti trenutak isteka kao u L2
+    assert t.local.get("k") is None
+    assert t.get("k") is None
+
+
+def test_async_miss_on_both_tiers(clock, tmp_path):
+    t = _tiered(tmp_path)
+    assert asyncio.run(t.aget("missing")) is None
+    assert t.stats()["misses"] == 1
+    assert t.stats()["shared"]["misses"] == 1
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from smartbets_API.elo import HOME_ADV, INITIAL, K, EloRatings, margin_factor
+
+# fixture_id, timestamp, domaćin, gost, golovi d., golovi g.
+SEASON = np.array([
+    (1, 100, 10, 20, 2, 0),
+    (2, 200, 20, 30, 1, 1),
+    (3, 300, 30, 10, 0, 3),
+    (4, 400, 10, 20, 1, 2),
+    (5, 500, 30, 20, 4, 0),
+])
+
+
+def _update(elo, rows):
+    rows = np.asarray(rows)
+    return elo.update_many(*(rows[:, c] for c in range(6)))
+
+
+def test_margin_factor():
+    assert margin_factor(np.array([0, 1, -1, 2, 3, -5])).tolist() == [1.0, 1.0, 1.0, 1.5, 1.75, 2.0]
+
+
+def test_single_match_moves_ratings_symmetrically():
+    elo = EloRatings()
+    assert _update(elo, SEASON[:1]) == 1
+    expected = 1.0 / (1.0 + 10.0 ** (-HOME_ADV / 400.0))
+    delta = K * 1.5 * (1.0 - expected)
+    assert elo.rating(10) == pytest.approx(INITIAL + delta)
+    assert elo.rating(20) == pytest.approx(INITIAL - delta)
+    assert elo.table()[10]["games"] == 1
+
+
+def test_ratings_sum_is_conserved():
+    elo = EloRatings()
+    _update(elo, SEASON)
+    total = sum(v["rating"] for v in elo.table().values())
+    assert total == pytest.approx(3 * INITIAL, abs=0.2)
+    assert elo.last_ts == 500
+
+
+def test_applied_in_chronological_order_regardless_of_input_order():
+    sequential = EloRatings()
+    for row in SEASON:
+        _update(sequential, [row])
+    shuffled = EloRatings()
+    _update(shuffled, SEASON[[3, 0, 4, 2, 1]])
+    for team in (10, 20, 30):
+        assert shuffled.rating(team) == pytest.approx(sequential.rating(team))
+
+
+def test_applied_and_duplicate_fixtures_are_skipped():
+    elo = EloRatings()
+    assert _update(elo, SEASON[:3]) == 3
+    before = {t: elo.rating(t) for t in (10, 20, 30)}
+    assert _update(elo, SEASON[:3]) == 0
+    assert {t: elo.rating(t) for t in (10, 20, 30)} == before
+    # ponovljen meč u istoj seriji se računa jednom
+    assert _update(elo, np.vstack([SEASON[3:4], SEASON[3:4], SEASON[4:]])) == 2
+    assert elo.applied.tolist() == [1, 2, 3, 4, 5]
+    assert elo.table()[20]["games"] == 4
+
+
+def test_expected_uses_home_advantage_and_unknown_teams():
+    elo = EloRatings()
+    assert elo.expected(1, 2) is None
+    _update(elo, SEASON[:1])
+    assert elo.expected(10, 99) > 0.5
+    assert elo.expected(10, 20) > elo.expected(20, 10)
+
+
+def test_many_teams_grow_storage():
+    elo = EloRatings()
+    n = 200
+    ids = np.arange(1, n + 1)
+    _update(elo, np.column_stack([ids, ids, ids, ids + 1000, np.ones(n), np.zeros(n)]))
+    assert len(elo) == 2 * n
+    assert elo.rating(n) > INITIAL > elo.rating(n + 1000)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "elo.npz")
+    elo = EloRatings(k=30.0, home_adv=50.0)
+    _update(elo, SEASON[:3])
+    elo.save(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["elo.npz"]
+
+    loaded = EloRatings.load(path)
+    assert (loaded.k, loaded.home_adv, loaded.initial) == (30.0, 50.0, INITIAL)
+    assert loaded.table() == elo.table()
+    assert loaded.applied.tolist() == [1, 2, 3]
+    assert loaded.last_ts == 300
+
+    # učitan snapshot nastavlja isto kao da restarta nije bilo
+    assert _update(loaded, SEASON) == 2
+    _update(elo, SEASON)
+    assert loaded.table() == elo.table()
+
+
+def _raw(fixture_id, status, goals, fulltime):
+    return {
+        "fixture": {"id": fixture_id, "timestamp": 1000 + fixture_id, "status": {"short": status}},
+        "teams": {"home": {"id": 10}, "away": {"id": 20}},
+        "goals": {"home": goals[0], "away": goals[1]},
+        "score": {"fulltime": {"home": fulltime[0], "away": fulltime[1]}},
+    }
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    import elo_ratings
+
+    path = str(tmp_path / "elo.npz")
+    monkeypatch.setattr(elo_ratings, "SNAPSHOT", path)
+    monkeypatch.setattr(elo_ratings, "STALE", f"{path}.stale")
+    monkeypatch.setattr(elo_ratings, "_ratings", None)
+    monkeypatch.setattr(elo_ratings, "_mtime", 0.0)
+    return elo_ratings
+
+
+def test_result_row_uses_90_minute_score(snapshot):
+    assert snapshot.result_row(_raw(1, "AET", (2, 1), (1, 1))) == (1, 1001, 10, 20, 1, 1)
+    assert snapshot.result_row(_raw(2, "FT", (3, 0), (None, None))) == (2, 1002, 10, 20, 3, 0)
+    assert snapshot.result_row(_raw(3, "NS", (None, None), (None, None))) is None
+
+
+def test_extra_time_win_is_rated_as_draw(snapshot):
+    # pobeda u produžecima je posle 90 minuta nerešeno: domaćin (favorit zbog terena) gubi poene
+    assert snapshot.record_fixtures([_raw(1, "AET", (2, 1), (1, 1))]) == 1
+    draw = EloRatings()
+    _update(draw, [(1, 1001, 10, 20, 1, 1)])
+    ratings = EloRatings.load(snapshot.SNAPSHOT)
+    assert ratings.rating(10) == pytest.approx(draw.rating(10))
+    assert ratings.rating(10) < INITIAL
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import standings
+from smartbets_API.ratelimit import QuotaExhausted, UpstreamThrottled
+
+# bez `with`: lifespan (HTTP klijent, DB engine) se ne pokreće
+client = TestClient(main.app)
+
+
+@pytest.fixture
+def failing_standings(monkeypatch):
+    def install(exc):
+        async def standings_table(league, season):
+            raise exc
+        monkeypatch.setattr(standings, "standings_table", standings_table)
+    return install
+
+
+def test_quota_exhausted_is_503_with_retry_after(failing_standings):
+    failing_standings(QuotaExhausted("dnevna kvota je potrošena"))
+    r = client.get("/standings/", params={"league": 39, "season": 2025})
+    assert r.status_code == 503
+    assert r.json() == {"detail": "dnevna kvota je potrošena"}
+    assert 1 <= int(r.headers["Retry-After"]) <= 24 * 3600
+
+
+def test_upstream_throttled_is_429_with_retry_after(failing_standings):
+    failing_standings(UpstreamThrottled("limit po minutu", 6.2))
+    r = client.get("/standings/", params={"league": 39, "season": 2025})
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "7"
+
+
+def test_other_errors_stay_500(failing_standings):
+    failing_standings(RuntimeError("baza"))
+    r = client.get("/standings/", params={"league": 39, "season": 2025})
+    assert r.status_code == 500
+    assert "Retry-After" not in r.headers
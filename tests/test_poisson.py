@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from smartbets_API import poisson
+
+
+def _league(rounds=10, seed=0):
+    """Svako sa svakim; tim 1 daje najviše golova, tim 4 prima najviše."""
+    attack = {1: 2.0, 2: 1.0, 3: 1.0, 4: 0.8}
+    defence = {1: 0.7, 2: 1.0, 3: 1.0, 4: 1.5}
+    rng = np.random.default_rng(seed)
+    home, away = [], []
+    for _ in range(rounds):
+        for h in attack:
+            for a in attack:
+                if h != a:
+                    home.append(h)
+                    away.append(a)
+    home, away = np.array(home), np.array(away)
+    lam = 1.1 * 1.3 * np.array([attack[h] * defence[a] for h, a in zip(home, away)])
+    mu = 1.1 * np.array([attack[a] * defence[h] for h, a in zip(home, away)])
+    return home, away, rng.poisson(lam).astype(float), rng.poisson(mu).astype(float)
+
+
+def test_fit_recovers_strongest_attack_and_weakest_defence():
+    model = poisson.fit(*_league())
+    s = model.strengths()
+    assert max(s, key=lambda t: s[t]["attack"]) == 1
+    assert max(s, key=lambda t: s[t]["defence"]) == 4
+    assert np.isclose(model.attack.mean(), 1.0)
+    assert model.home_adv > 1.0
+    assert model.fixtures == 120
+
+
+def test_expected_goals_favour_strong_home_team():
+    model = poisson.fit(*_league())
+    lam, mu = model.expected_goals(np.array([1, 4]), np.array([4, 1]))
+    assert lam[0] > mu[0]
+    assert mu[1] > lam[1]
+
+
+def test_unseen_team_gets_average_strengths():
+    model = poisson.fit(*_league())
+    lam, mu = model.expected_goals(np.array([99]), np.array([98]))
+    assert lam[0] == pytest.approx(model.avg_goals * model.home_adv)
+    assert mu[0] == pytest.approx(model.avg_goals)
+
+
+def test_fit_without_history_is_neutral():
+    empty = np.empty(0, np.int64)
+    model = poisson.fit(empty, empty, np.empty(0), np.empty(0))
+    assert model.fixtures == 0
+    lam, mu = model.expected_goals(np.array([1]), np.array([2]))
+    assert lam[0] == mu[0] == 1.0
+
+
+def test_decay_weights_halve_per_half_life():
+    now = 100 * 86400.0
+    w = poisson.decay_weights(np.array([now, now - 30 * 86400, now - 60 * 86400]), now, 30)
+    assert w.tolist() == pytest.approx([1.0, 0.5, 0.25])
+    assert poisson.decay_weights(np.array([0.0, 1.0]), now, None).tolist() == [1.0, 1.0]
+
+
+def test_score_matrices_are_normalized():
+    m = poisson.score_matrices(np.array([1.4, 0.3]), np.array([1.1, 2.5]))
+    assert m.shape == (2, poisson.MAX_GOALS + 1, poisson.MAX_GOALS + 1)
+    assert np.allclose(m.sum(axis=(1, 2)), 1.0)
+
+
+def test_market_probabilities_are_consistent():
+    p = poisson.markets(poisson.score_matrices(np.array([1.6, 0.9]), np.array([1.0, 1.2])))
+    assert set(p) == set(poisson.MARKETS)
+    assert np.allclose(p["1"] + p["x"] + p["2"], 1.0)
+    assert np.allclose(p["1x"], p["1"] + p["x"])
+    assert np.allclose(p["2x"], p["2"] + p["x"])
+    assert np.allclose(p["12"], p["1"] + p["2"])
+    assert (p["ov15"] >= p["ov25"]).all() and (p["ov25"] >= p["ov35"]).all()
+    assert p["1"][0] > p["2"][0]
+
+
+def test_market_probabilities_match_closed_form():
+    lam, mu = 1.3, 0.8
+    p = poisson.markets(poisson.score_matrices(np.array([lam]), np.array([mu])))
+    assert p["gg"][0] == pytest.approx((1 - np.exp(-lam)) * (1 - np.exp(-mu)), abs=1e-6)
+    total = lam + mu
+    assert p["ov15"][0] == pytest.approx(1 - np.exp(-total) * (1 + total), abs=1e-6)
+
+
+def test_legacy_result_falls_back_to_double_chance():
+    lam, mu = np.array([2.5, 1.1]), np.array([0.5, 1.0])
+    out = poisson.legacy(lam, mu, poisson.markets(poisson.score_matrices(lam, mu)))
+    assert out[0]["result"] == "1"
+    assert out[1]["result"] in ("1x", "2x")
+    assert out[0]["g"] == 3.0
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+from models import PredictionResponse
+from smartbets_API import predictor as predictor_mod
+from smartbets_API.predictor import Predictor
+from smartbets_API.ratelimit import QuotaExhausted
+
+LEAGUE, SEASON, BOOKMAKER = 39, 2025, 8
+
+
+def _fixture(fixture_id, home, away):
+    return {
+        "fixture": {"id": fixture_id},
+        "teams": {"home": {"id": home, "name": f"tim-{home}", "logo": None},
+                  "away": {"id": away, "name": f"tim-{away}", "logo": None}},
+    }
+
+
+def _odds(fixture_id, home_odd, update="2025-08-16T10:00:00+00:00"):
+    return {"response": [{
+        "fixture": {"id": fixture_id},
+        "update": update,
+        "bookmakers": [{"id": BOOKMAKER, "name": "bm", "bets": [{
+            "id": 1, "name": "Match Winner",
+            "values": [{"value": "Home", "odd": str(home_odd)}, {"value": "Away", "odd": "3.1"}],
+        }]}],
+    }]}
+
+
+class Upstream:
+    """Zamena za api_football: kvote po utakmici i /teams/statistics poeni, uz brojače."""
+
+    def __init__(self):
+        self.odds = {}
+        self.stats_points = {}
+        self.calls = {"odds": 0, "stats": 0}
+
+    async def get_odds_by_fixture(self, fixture_id, bookmaker=None):
+        self.calls["odds"] += 1
+        odds = self.odds[fixture_id]
+        if isinstance(odds, Exception):
+            raise odds
+        return odds
+
+    async def get_team_statistics(self, team, league, season):
+        self.calls["stats"] += 1
+        points = self.stats_points[team]
+        if isinstance(points, Exception):
+            raise points
+        return {"response": [{"league": {"points": points}}]}
+
+
+class Store:
+    """PredictionStore u memoriji; load vraća payload samo kad se hash poklapa."""
+
+    def __init__(self):
+        self.rows = {}
+        self.loads = []
+
+    async def load(self, hashes):
+        self.loads.append(dict(hashes))
+        return {fid: payload for fid, (h, payload) in self.rows.items() if hashes.get(fid) == h}
+
+    async def save(self, rows):
+        for fid, h, payload in rows:
+            self.rows[fid] = (h, payload)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    u = Upstream()
+    monkeypatch.setattr(predictor_mod, "get_odds_by_fixture", u.get_odds_by_fixture)
+    monkeypatch.setattr(predictor_mod, "get_team_statistics", u.get_team_statistics)
+    predictor_mod._memo.clear()
+    yield u
+    predictor_mod._memo.clear()
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Fixture id-evi za koje je model zaista računao, redom."""
+    calls = []
+    original = Predictor.compute
+
+    def compute(self, fixture, inputs):
+        calls.append(fixture["fixture"]["id"])
+        return original(self, fixture, inputs)
+
+    monkeypatch.setattr(Predictor, "compute", compute)
+    return calls
+
+
+def _predict(fixtures, points, store=None, bookmaker=BOOKMAKER):
+    p = Predictor(LEAGUE, SEASON, bookmaker=bookmaker)
+    return asyncio.run(p.predict_fixtures(fixtures, points, store))
+
+
+def test_unchanged_inputs_are_served_from_memo(upstream, computed):
+    upstream.odds[1] = _odds(1, 1.8)
+    fixtures = [_fixture(1, 10, 20)]
+    first = _predict(fixtures, {10: 30, 20: 12})
+    # isti ulazi, samo novi `update` timestamp u /odds odgovoru
+    upstream.odds[1] = _odds(1, 1.8, update="2025-08-16T11:00:00+00:00")
+    second = _predict(fixtures, {10: 30, 20: 12})
+    assert first[0]["memo"] is False and second[0]["memo"] is True
+    assert first[0]["prediction"] == second[0]["prediction"] == "1"
+    assert computed == [1]
+    assert predictor_mod.memo_stats()["hits"] == 1
+
+
+def test_changed_odds_are_recomputed_and_returned(upstream, computed):
+    fixtures = [_fixture(1, 10, 20)]
+    upstream.odds[1] = _odds(1, 1.8)
+    _predict(fixtures, {10: 30, 20: 12})
+    upstream.odds[1] = _odds(1, 1.65)
+    result = _predict(fixtures, {10: 30, 20: 12})[0]
+    assert result["memo"] is False
+    assert computed == [1, 1]
+    assert result["odds"][0]["bookmakers"][0]["bets"][0]["values"][0]["odd"] == "1.65"
+
+
+def test_changed_points_are_recomputed(upstream, computed):
+    fixtures = [_fixture(1, 10, 20)]
+    upstream.odds[1] = _odds(1, 1.8)
+    assert _predict(fixtures, {10: 30, 20: 12})[0]["prediction"] == "1"
+    result = _predict(fixtures, {10: 30, 20: 33})[0]
+    assert (result["prediction"], result["memo"]) == ("2", False)
+    assert computed == [1, 1]
+
+
+def test_store_hit_by_inputs_hash_fills_memo(upstream, computed):
+    fixtures = [_fixture(1, 10, 20)]
+    upstream.odds[1] = _odds(1, 1.8)
+    store = Store()
+    _predict(fixtures, {10: 30, 20: 12}, store)
+    predictor_mod._memo.clear()                 # npr. drugi worker ili restart
+
+    from_store = _predict(fixtures, {10: 30, 20: 12}, store)[0]
+    assert from_store["memo"] is True
+    assert computed == [1]
+    assert len(store.loads) == 2
+
+    from_memo = _predict(fixtures, {10: 30, 20: 12}, store)[0]
+    assert from_memo["memo"] is True
+    assert len(store.loads) == 2                # memo pogodak ne ide u bazu
+
+
+def test_store_miss_on_changed_inputs(upstream, computed):
+    fixtures = [_fixture(1, 10, 20)]
+    upstream.odds[1] = _odds(1, 1.8)
+    store = Store()
+    _predict(fixtures, {10: 30, 20: 12}, store)
+    predictor_mod._memo.clear()
+    upstream.odds[1] = _odds(1, 2.2)
+    assert _predict(fixtures, {10: 30, 20: 12}, store)[0]["memo"] is False
+    assert computed == [1, 1]
+
+
+def test_team_outside_table_uses_statistics(upstream, computed):
+    fixtures = [_fixture(1, 10, 99)]
+    upstream.odds[1] = _odds(1, 1.8)
+    upstream.stats_points[99] = 40
+    first = _predict(fixtures, {10: 30})[0]
+    assert (first["prediction"], first["memo"]) == ("2", False)
+    second = _predict(fixtures, {10: 30})[0]
+    assert second["memo"] is True
+    assert upstream.calls["stats"] == 2
+    upstream.stats_points[99] = 20
+    assert _predict(fixtures, {10: 30})[0]["prediction"] == "1"
+    assert computed == [1, 1]
+
+
+def test_without_bookmaker_table_teams_need_no_upstream(upstream, computed):
+    fixtures = [_fixture(1, 10, 20)]
+    _predict(fixtures, {10: 30, 20: 12}, bookmaker=None)
+    assert _predict(fixtures, {10: 30, 20: 12}, bookmaker=None)[0]["memo"] is True
+    assert upstream.calls == {"odds": 0, "stats": 0}
+
+
+def test_failed_inputs_return_error_only_response(upstream, computed):
+    upstream.odds[1] = _odds(1, 1.8)
+    upstream.odds[2] = ValueError("neispravan /odds odgovor")
+    results = _predict([_fixture(1, 10, 20), _fixture(2, 30, 40)], {10: 30, 20: 12, 30: 1, 40: 2})
+    assert [r["fixture_id"] for r in results] == [1, 2]
+    assert results[1] == {"fixture_id": 2, "memo": False, "error": "neispravan /odds odgovor"}
+    assert computed == [1]
+    for r in results:
+        PredictionResponse.model_validate(r)
+
+
+def test_upstream_unavailable_propagates(upstream):
+    upstream.odds[1] = QuotaExhausted("dnevna kvota je potrošena")
+    with pytest.raises(QuotaExhausted):
+        _predict([_fixture(1, 10, 20)], {10: 30, 20: 12})
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+from smartbets_API.ratelimit import (
+    BULK, INTERACTIVE, QuotaExhausted, QuotaLimiter, UpstreamThrottled,
+    current_lane, priority,
+)
+
+
+def _empty(limiter: QuotaLimiter) -> QuotaLimiter:
+    limiter.tokens = 0.0
+    limiter._updated = time.monotonic()
+    return limiter
+
+
+def test_priority_sets_lane_for_the_block():
+    assert current_lane() == INTERACTIVE
+    with priority(BULK):
+        assert current_lane() == BULK
+    assert current_lane() == INTERACTIVE
+
+
+def test_acquire_uses_context_lane():
+    limiter = QuotaLimiter(per_minute=10)
+
+    async def run():
+        await limiter.acquire()
+        with priority(BULK):
+            await limiter.acquire()
+
+    asyncio.run(run())
+    assert limiter.stats()["granted"] == {"interactive": 1, "bulk": 1}
+
+
+def test_interactive_waiter_is_served_before_earlier_bulk():
+    # 1200/min → novi token svakih 50 ms, interactive stiže u red pre prvog
+    limiter = QuotaLimiter(per_minute=1200, bulk_reserve=0.0)
+    order = []
+
+    async def call(lane, name):
+        await limiter.acquire(lane)
+        order.append(name)
+
+    async def run():
+        _empty(limiter)
+        bulk = [asyncio.ensure_future(call(BULK, f"bulk-{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(call(INTERACTIVE, "interactive"))
+        await asyncio.gather(interactive, *bulk)
+
+    asyncio.run(run())
+    assert order == ["interactive", "bulk-0", "bulk-1", "bulk-2"]
+    assert limiter.stats()["queued"] == {"interactive": 1, "bulk": 3}
+
+
+def test_bulk_reserve_is_left_for_interactive():
+    limiter = QuotaLimiter(per_minute=10, bulk_reserve=0.2)
+
+    async def run():
+        for _ in range(8):
+            await limiter.acquire(BULK)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(BULK), timeout=0.05)
+        await limiter.acquire(INTERACTIVE)
+
+    asyncio.run(run())
+    assert limiter.granted == {INTERACTIVE: 1, BULK: 8}
+
+
+def test_throttle_blocks_until_retry_after():
+    limiter = QuotaLimiter(per_minute=6000)
+
+    async def run():
+        limiter.throttle(0.1)
+        started = time.monotonic()
+        await limiter.acquire(INTERACTIVE)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_update_follows_server_headers():
+    limiter = QuotaLimiter(per_minute=30)
+    limiter.update({
+        "x-ratelimit-limit": "300",
+        "x-ratelimit-remaining": "4",
+        "x-ratelimit-requests-limit": "7500",
+        "x-ratelimit-requests-remaining": "120",
+    })
+    s = limiter.stats()
+    assert s["per_minute"] == 300 and s["per_day"] == 7500
+    assert s["day_remaining"] == 120
+    assert s["tokens"] <= 4.1
+    limiter.update({"x-ratelimit-remaining": "abc"})      # neispravno zaglavlje se ignoriše
+    assert limiter.stats()["per_minute"] == 300
+
+
+def test_exhausted_day_raises_with_retry_after():
+    limiter = QuotaLimiter(per_minute=30)
+    limiter.update({"x-ratelimit-requests-remaining": "0"})
+    with pytest.raises(QuotaExhausted) as err:
+        asyncio.run(limiter.acquire(INTERACTIVE))
+    assert 1 <= err.value.retry_after <= 24 * 3600
+
+
+def test_day_reserve_refuses_bulk_only():
+    limiter = QuotaLimiter(per_minute=30, per_day=100, bulk_reserve=0.2)
+    limiter.update({"x-ratelimit-requests-remaining": "20"})
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(limiter.acquire(BULK))
+    asyncio.run(limiter.acquire(INTERACTIVE))
+    assert limiter.day_remaining == 19
+
+
+def test_retry_after_is_whole_seconds():
+    assert UpstreamThrottled("x", 0.2).retry_after == 1
+    assert UpstreamThrottled("x", 2.1).retry_after == 3
+    assert UpstreamThrottled("x", 5).retry_after == 5
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from smartbets_API.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_request():
+    sf = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"response": calls}
+
+    async def run():
+        return await asyncio.gather(*(sf.do("k", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert results == [{"response": 1}] * 5
+    assert sf.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_different_keys_are_not_coalesced():
+    sf = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(sf.do("a", lambda: asyncio.sleep(0, "a")),
+                                    sf.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert sf.stats()["leaders"] == 2
+
+
+def test_finished_key_starts_a_new_request():
+    sf = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        return [await sf.do("k", fetch), await sf.do("k", fetch)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_error_reaches_every_waiter():
+    sf = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream")
+
+    async def run():
+        return await asyncio.gather(sf.do("k", fail), sf.do("k", fail), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert sf.stats()["in_flight"] == 0
+
+
+def test_cancelling_leader_does_not_cancel_followers():
+    sf = SingleFlight()
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return "ok"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.ensure_future(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "ok"
+    assert sf.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 1}
@@ -0,0 +1,59 @@
+import datetime as dt
+
+from db_init import FORM_STATS
+from smartbets_API.predictor import form_points
+from team_form import REFRESH_SQL, form_statistics, totals, touched_teams
+
+
+def _row():
+    home = dict(played=3, wins=2, draws=1, losses=0, goals_for=5, goals_against=1,
+                clean_sheets=2, failed_to_score=0, btts=1)
+    away = dict(played=2, wins=0, draws=1, losses=1, goals_for=1, goals_against=3,
+                clean_sheets=0, failed_to_score=1, btts=1)
+    row = {"team_id": 10, "league_id": 39, "season": 2025, "form": "WDWDL",
+           "last_match_at": dt.datetime(2025, 9, 1, 15, 0)}
+    row.update({f"home_{k}": v for k, v in home.items()})
+    row.update({f"away_{k}": v for k, v in away.items()})
+    return row
+
+
+def test_form_statistics_maps_columns_to_upstream_shape():
+    s = form_statistics(_row())
+    assert s["league"] == {"id": 39, "season": 2025}
+    assert s["team"] == {"id": 10}
+    assert s["form"] == "WDWDL"
+    assert s["fixtures"]["played"] == {"home": 3, "away": 2, "total": 5}
+    assert s["fixtures"]["wins"] == {"home": 2, "away": 0, "total": 2}
+    assert s["fixtures"]["loses"] == {"home": 0, "away": 1, "total": 1}
+    assert s["goals"]["for"]["total"] == {"home": 5, "away": 1, "total": 6}
+    assert s["goals"]["against"]["total"] == {"home": 1, "away": 3, "total": 4}
+    assert s["clean_sheet"]["total"] == 2
+    assert s["failed_to_score"]["away"] == 1
+    assert s["btts"] == {"home": 1, "away": 1, "total": 2}
+    assert s["last_match_at"] == "2025-09-01T15:00:00"
+
+
+def test_form_statistics_without_last_match():
+    assert form_statistics({**_row(), "last_match_at": None})["last_match_at"] is None
+
+
+def test_totals_and_form_points():
+    row = _row()
+    assert set(totals(row)) == set(FORM_STATS)
+    assert form_points(row) == 3 * 2 + 2
+
+
+def test_touched_teams_only_finished():
+    raws = [
+        {"fixture": {"status": {"short": "AET"}}, "teams": {"home": {"id": 5}, "away": {"id": 3}}},
+        {"fixture": {"status": {"short": "NS"}}, "teams": {"home": {"id": 7}, "away": {"id": 8}}},
+        {"fixture": {"status": {"short": "FT"}}, "teams": {"home": {"id": 3}, "away": {}}},
+    ]
+    assert touched_teams(raws) == [3, 5]
+
+
+def test_refresh_uses_90_minute_score():
+    sql = str(REFRESH_SQL)
+    assert "COALESCE(ft_home, home_goals) AS gf" in sql
+    assert "COALESCE(ft_away, away_goals) AS ga" in sql
+    assert " home_goals AS gf" not in sql
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import today
+
+client = TestClient(main.app)
+
+# kasnije utakmice stižu ranije – redosled završetka je obrnut od ulaznog
+DELAYS = {1: 0.06, 2: 0.04, 3: 0.02, 4: 0.0}
+
+
+class Upstream:
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.active = 0
+        self.max_active = 0
+
+    async def get_fixtures(self, date):
+        return {"response": self.fixtures}
+
+    async def get_fixture_statistics(self, fid):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(DELAYS.get(fid, 0))
+        finally:
+            self.active -= 1
+        return {"response": [{"fixture": fid}]}
+
+    async def get_head_to_head(self, fid):
+        if fid == 2:
+            raise RuntimeError("h2h nije dostupan")
+        return {"response": []}
+
+    async def get_odds(self, fid):
+        return {"response": [{"odds": fid}]}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    def install(fixtures):
+        u = Upstream(fixtures)
+        for name in ("get_fixtures", "get_fixture_statistics", "get_head_to_head", "get_odds"):
+            monkeypatch.setattr(today, name, getattr(u, name))
+        return u
+    return install
+
+
+def _fixtures(*ids):
+    return [{"fixture": {"id": i}} for i in ids]
+
+
+def test_list_keeps_upstream_order(upstream):
+    upstream(_fixtures(1, 2, 3, 4))
+    r = client.get("/today/")
+    assert r.status_code == 200
+    records = r.json()
+    assert [rec["fixture"]["fixture"]["id"] for rec in records] == [1, 2, 3, 4]
+    assert records[0]["statistics"] == [{"fixture": 1}]
+    assert records[0]["odds"] == [{"odds": 1}]
+    assert "errors" not in records[0]
+
+
+def test_failed_sub_call_is_reported_per_fixture(upstream):
+    upstream(_fixtures(1, 2))
+    records = client.get("/today/").json()
+    assert records[1]["h2h"] == []
+    assert records[1]["errors"] == {"h2h": "h2h nije dostupan"}
+    assert records[1]["statistics"] == [{"fixture": 2}]
+
+
+def test_item_without_fixture_id_does_not_fail_the_day(upstream):
+    upstream([{"fixture": {"id": 1}}, {"league": {"id": 39}}, {"fixture": {"id": 3}}])
+    r = client.get("/today/")
+    assert r.status_code == 200
+    records = r.json()
+    assert len(records) == 3
+    assert set(records[1]["errors"]) == {"fixture"}
+    assert records[1]["statistics"] == records[1]["h2h"] == records[1]["odds"] == []
+    assert records[2]["statistics"] == [{"fixture": 3}]
+
+
+def test_concurrency_is_capped(upstream):
+    u = upstream(_fixtures(*range(1, 9)))
+    assert len(client.get("/today/", params={"concurrency": 2}).json()) == 8
+    assert u.max_active == 2
+
+
+def test_concurrency_is_capped_by_max(upstream, monkeypatch):
+    monkeypatch.setattr(today, "TODAY_MAX_CONCURRENCY", 3)
+    u = upstream(_fixtures(*range(1, 9)))
+    client.get("/today/", params={"concurrency": 50})
+    assert u.max_active == 3
+
+
+def test_ndjson_streams_in_completion_order(upstream):
+    u = upstream(_fixtures(1, 2, 3, 4))
+    r = client.get("/today/", params={"stream": "true", "concurrency": 4})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert [rec["fixture"]["fixture"]["id"] for rec in records] == [4, 3, 2, 1]
+    assert u.max_active <= 4
+
+
+def test_ndjson_via_accept_header_with_window(upstream):
+    u = upstream(_fixtures(*range(1, 7)))
+    r = client.get("/today/", params={"concurrency": 2},
+                   headers={"Accept": "application/x-ndjson"})
+    ids = sorted(json.loads(line)["fixture"]["fixture"]["id"] for line in r.text.splitlines())
+    assert ids == list(range(1, 7))
+    assert u.max_active == 2
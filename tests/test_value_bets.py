@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from smartbets_API import poisson
+from smartbets_API.value_bets import flatten, implied, rated, scan
+
+
+def _item(fixture_id, bookmaker_id, bets):
+    return {
+        "fixture": {"id": fixture_id},
+        "bookmakers": [{
+            "id": bookmaker_id,
+            "name": f"bm-{bookmaker_id}",
+            "bets": [{"id": bet_id, "name": name,
+                      "values": [{"value": v, "odd": str(o)} for v, o in values]}
+                     for bet_id, name, values in bets],
+        }],
+    }
+
+
+MATCH_WINNER = (1, "Match Winner", [("Home", 2.0), ("Draw", 3.5), ("Away", 4.0)])
+
+
+def test_overround_of_complete_market():
+    c = flatten([_item(10, 1, [MATCH_WINNER])])
+    imp = implied(c)
+    expected = 1 / 2.0 + 1 / 3.5 + 1 / 4.0
+    assert np.allclose(imp["overround"], expected)
+    assert np.isclose(imp["fair"].sum(), 1.0)
+
+
+def test_double_chance_fair_probabilities_sum_to_two():
+    dc = (12, "Double Chance", [("Home/Draw", 1.2), ("Draw/Away", 1.9), ("Home/Away", 1.3)])
+    imp = implied(flatten([_item(10, 1, [dc])]))
+    assert np.isclose(imp["fair"].sum(), 2.0)
+
+
+def test_incomplete_market_has_no_overround():
+    ou = (5, "Goals Over/Under", [("Over 2.5", 1.9)])
+    imp = implied(flatten([_item(10, 1, [ou])]))
+    assert np.isnan(imp["overround"]).all()
+    assert np.isnan(imp["fair"]).all()
+
+
+def test_overround_is_per_bookmaker():
+    cheap = (1, "Match Winner", [("Home", 2.1), ("Draw", 3.6), ("Away", 4.2)])
+    c = flatten([_item(10, 1, [MATCH_WINNER]), _item(10, 2, [cheap])])
+    over = implied(c)["overround"]
+    assert np.allclose(over[c.bookmaker_id == 1], 1 / 2.0 + 1 / 3.5 + 1 / 4.0)
+    assert np.allclose(over[c.bookmaker_id == 2], 1 / 2.1 + 1 / 3.6 + 1 / 4.2)
+
+
+def test_scan_orders_by_edge_and_applies_threshold():
+    c = flatten([_item(10, 1, [MATCH_WINNER])])
+    probs = {k: np.array([0.0]) for k in poisson.MARKETS}
+    probs.update({"1": np.array([0.6]), "x": np.array([0.3]), "2": np.array([0.1])})
+    rows = list(scan(c, np.array([10]), probs, min_edge=0.0))
+    assert [r["selection"] for r in rows] == ["Match Winner: Home", "Match Winner: Draw"]
+    assert rows[0]["edge"] == pytest.approx(0.2)
+    assert rows[1]["edge"] == pytest.approx(0.05)
+
+
+def _model(games_of_new_team):
+    # timovi 1–4 igraju svako sa svakim dvaput; tim 5 ima samo games_of_new_team mečeva
+    home, away = [], []
+    for _ in range(2):
+        for h in range(1, 5):
+            for a in range(1, 5):
+                if h != a:
+                    home.append(h)
+                    away.append(a)
+    for i in range(games_of_new_team):
+        home.append(5)
+        away.append(1 + i % 4)
+    n = len(home)
+    rng = np.random.default_rng(0)
+    return poisson.fit(np.array(home), np.array(away),
+                       rng.poisson(1.5, n).astype(float), rng.poisson(1.1, n).astype(float))
+
+
+def test_rated_skips_league_without_history():
+    empty = poisson.fit(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0), np.empty(0))
+    assert not rated(empty, np.array([1, 2]), np.array([3, 4]), min_games=0).any()
+
+
+def test_rated_skips_unseen_and_thinly_fitted_teams():
+    model = _model(games_of_new_team=2)
+    home = np.array([1, 5, 99])
+    away = np.array([2, 1, 1])
+    assert rated(model, home, away, min_games=5).tolist() == [True, False, False]
+    assert rated(model, home, away, min_games=2).tolist() == [True, True, False]
+
+
+def test_games_played_counts_home_and_away():
+    model = _model(games_of_new_team=3)
+    assert model.games_played(np.array([1, 5, 99])).tolist() == [12 + 1, 3, 0]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+value_bets.py
+
+▲ Što radi?
+    • skuplja sve pre-match kvote dana (/odds?date=…, sve stranice paralelno –
+      drugi prolaz ide iz keša odgovora) i utakmice dana (read-through)
+    • Poisson model (poisson_model.py) po ligi i sezoni daje verovatnoće
+      1X2, dvostruke šanse, GG i over/under 1.5 / 2.5 / 3.5; utakmice lige
+      bez istorije ili tima sa manje od VALUE_MIN_GAMES mečeva se preskaču
+    • poravnanje i skeniranje (NumPy) idu u thread pool, van event loop-a
+    • smartbets_API.value_bets poravna kvote svih kladionica u kolone,
+      računa implicitne verovatnoće i maržu po tržištu i vraća selekcije
+      čiji edge (p_modela · kvota − 1) prelazi prag
+    • ruta  GET /odds/value-bets  šalje ih kao NDJSON, najveći edge prvi
+
+    python value_bets.py 2025-08-16 [min_edge]
+
+▲ Zahtjevi:  DATABASE_URL, numpy
+"""
+
+import asyncio
+import os
+import sys
+import time
+import datetime as dt
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db_async import run_sync
+from db_init import engine
+from odds_loader import fetch_odds_day
+from poisson_model import get_model, market_probabilities
+from read_through import fixtures_by_date
+from smartbets_API.poisson import MARKETS
+from smartbets_API.value_bets import flatten, rated, scan
+
+MIN_EDGE    = float(os.getenv("VALUE_MIN_EDGE", "0.05"))
+CONCURRENCY = int(os.getenv("VALUE_ODDS_CONCURRENCY", "4"))
+MIN_GAMES   = int(os.getenv("VALUE_MIN_GAMES", "5"))
+
+
+async def day_probabilities(fixtures: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Verovatnoće modela za utakmice dana koje model poznaje (rated); jedan fit
+    (iz keša) po (liga, sezona).
+    """
+    groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for f in fixtures:
+        league = f.get("league") or {}
+        if league.get("id") is not None and league.get("season") is not None:
+            groups.setdefault((league["id"], league["season"]), []).append(f)
+
+    models = await asyncio.gather(*(run_sync(get_model, league, season) for league, season in groups))
+    ids: List[np.ndarray] = []
+    parts: List[Dict[str, np.ndarray]] = []
+    for model, items in zip(models, groups.values()):
+        teams = [f.get("teams", {}) for f in items]
+        home = np.array([(t.get("home") or {}).get("id") or -1 for t in teams], dtype=np.int64)
+        away = np.array([(t.get("away") or {}).get("id") or -1 for t in teams], dtype=np.int64)
+        known = rated(model, home, away, MIN_GAMES)
+        items = [f for f, ok in zip(items, known.tolist()) if ok]
+        if not items:
+            continue
+        ids.append(np.array([f["fixture"]["id"] for f in items], dtype=np.int64))
+        parts.append(market_probabilities(model, items)[2])
+    if not ids:
+        return np.empty(0, dtype=np.int64), {k: np.empty(0) for k in MARKETS}
+    return np.concatenate(ids), {k: np.concatenate([p[k] for p in parts]) for k in MARKETS}
+
+
+async def scan_day(date: str, min_edge: float = MIN_EDGE, min_prob: float = 0.0,
+                   bookmaker: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    day = dt.date.fromisoformat(date)
+    items, fixtures_payload = await asyncio.gather(
+        fetch_odds_day(day, asyncio.Semaphore(CONCURRENCY)),
+        fixtures_by_date(date),
+    )
+    fixtures = fixtures_payload.get("response", [])
+    fixture_ids, probs = await day_probabilities(fixtures)
+    columns = await asyncio.to_thread(flatten, items, bookmaker)
+    rows = await asyncio.to_thread(lambda: list(scan(columns, fixture_ids, probs, min_edge, min_prob)))
+
+    info = {f["fixture"]["id"]: {"league": {"id": f["league"].get("id"), "name": f["league"].get("name")},
+                                 "teams": {side: {"id": t.get("id"), "name": t.get("name")}
+                                           for side, t in f.get("teams", {}).items()},
+                                 "date": f["fixture"].get("date")}
+            for f in fixtures}
+    for row in rows:
+        yield {**row, **info.get(row["fixture_id"], {})}
+
+
+async def _main(date: str, min_edge: float) -> None:
+    started = time.perf_counter()
+    rows = [r async for r in scan_day(date, min_edge)]
+    for r in rows[:50]:
+        teams = r.get("teams") or {}
+        print(f"  {r['edge']:+.1%}  {(teams.get('home') or {}).get('name')} – "
+              f"{(teams.get('away') or {}).get('name')}  {r['selection']} @ {r['odd']} "
+              f"({r['bookmaker']['name']}, model {r['model']:.1%})")
+    print(f"✓ {len(rows)} selekcija sa edge ≥ {min_edge:.0%} ({time.perf_counter() - started:.2f} s)")
+
+
+if __name__ == "__main__":
+    if engine is None:
+        raise SystemExit("DATABASE_URL nije postavljen")
+    if len(sys.argv) < 2:
+        raise SystemExit("upotreba: python value_bets.py <YYYY-MM-DD> [min_edge]")
+    asyncio.run(_main(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else MIN_EDGE))